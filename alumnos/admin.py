@@ -1,8 +1,20 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from sistema_instituto.archivos import leer_filas
+from .importacion import importar_alumnos
 from .models import Alumno
 
+
+class ImportarAlumnosForm(forms.Form):
+    archivo = forms.FileField(label="Archivo CSV o XLSX")
+
+
 @admin.register(Alumno)
 class AlumnoAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/alumnos/alumno/change_list.html'
     list_display = ('codigo_alumno', 'nombres', 'apellidos', 'dni', 'email', 'estado', 'fecha_ingreso')
     list_filter = ('estado', 'genero', 'fecha_ingreso', 'created_at')
     search_fields = ('codigo_alumno', 'dni', 'nombres', 'apellidos', 'email')
@@ -26,4 +38,43 @@ class AlumnoAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         if not obj.pk:
             obj.creado_por = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+    def get_urls(self):
+        urls = [
+            path('importar/', self.admin_site.admin_view(self.importar_view), name='alumnos_alumno_importar'),
+        ]
+        return urls + super().get_urls()
+
+    def importar_view(self, request):
+        """Carga masiva de alumnos: crea los nuevos y actualiza los existentes por DNI"""
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            return redirect('admin:alumnos_alumno_changelist')
+
+        resultado = None
+        if request.method == 'POST':
+            form = ImportarAlumnosForm(request.POST, request.FILES)
+            if form.is_valid():
+                archivo = form.cleaned_data['archivo']
+                try:
+                    resultado = importar_alumnos(leer_filas(archivo.file, archivo.name), request.user)
+                except ValueError as e:
+                    self.message_user(request, str(e), messages.ERROR)
+                else:
+                    self.message_user(
+                        request,
+                        f'{resultado.creadas} alumno(s) creado(s), {resultado.actualizadas} actualizado(s), '
+                        f'{len(resultado.errores)} fila(s) con errores.',
+                        messages.WARNING if resultado.errores else messages.SUCCESS
+                    )
+        else:
+            form = ImportarAlumnosForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importar alumnos',
+            'form': form,
+            'resultado': resultado,
+        }
+        return TemplateResponse(request, 'admin/alumnos/alumno/importar.html', context)
\ No newline at end of file
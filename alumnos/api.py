@@ -0,0 +1,40 @@
+from sistema_instituto.api import Recurso, vista_api
+from .models import Alumno
+
+ALUMNOS = Recurso(
+    Alumno,
+    campos={
+        'id': 'id',
+        'dni': 'dni',
+        'codigo_alumno': 'codigo_alumno',
+        'nombres': 'nombres',
+        'apellidos': 'apellidos',
+        'fecha_nacimiento': 'fecha_nacimiento',
+        'genero': 'genero',
+        'email': 'email',
+        'telefono': 'telefono',
+        'direccion': 'direccion',
+        'fecha_ingreso': 'fecha_ingreso',
+        'estado': 'estado',
+        'observaciones': 'observaciones',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    },
+    por_defecto=['id', 'codigo_alumno', 'dni', 'apellidos', 'nombres', 'estado', 'updated_at'],
+    filtros={'estado': 'estado', 'genero': 'genero'},
+)
+
+
+@vista_api
+def lista(request):
+    return ALUMNOS.listar(request)
+
+
+@vista_api
+def detalle(request, alumno_id):
+    return ALUMNOS.detalle(request, alumno_id)
+
+
+@vista_api
+def cambios(request):
+    return ALUMNOS.cambios(request)
@@ -0,0 +1,69 @@
+"""
+Búsqueda de alumnos sobre el texto normalizado Alumno.busqueda.
+
+Un término solo con dígitos se busca como prefijo de DNI o código, que usa
+los índices existentes. El resto se divide en palabras y cada una debe
+coincidir con el inicio de alguna palabra del alumno, sin importar tildes ni
+mayúsculas: se resuelve como rango sobre el índice de PalabraAlumno (una
+fila por palabra), no con LIKE '% palabra%', que obliga a recorrer la tabla.
+"""
+from django.db.models import Case, IntegerField, Q, Value, When
+from sistema_instituto.texto import normalizar_texto
+from .models import PalabraAlumno
+
+LIMITE_RESULTADOS = 50
+
+
+def filtrar_alumnos(queryset, texto):
+    """Filtra el queryset por el texto buscado (sin ordenar)"""
+    termino = normalizar_texto(texto)
+    if not termino:
+        return queryset
+
+    prefijo_codigo = filtro_prefijo('dni', termino) | filtro_prefijo('codigo_alumno', termino.upper())
+    if termino.isdigit():
+        return queryset.filter(prefijo_codigo)
+    return queryset.filter(prefijo_codigo | filtro_palabras(termino))
+
+
+def buscar_por_relevancia(queryset, texto, limite=LIMITE_RESULTADOS):
+    """
+    Devuelve los alumnos que coinciden ordenados por relevancia: primero las
+    coincidencias exactas de DNI o código, luego las que empiezan por el
+    término (apellidos) y al final el resto.
+    """
+    termino = normalizar_texto(texto)
+    if not termino:
+        return queryset.none()
+
+    relevancia = Case(
+        When(Q(dni=termino) | Q(codigo_alumno__iexact=termino), then=Value(3)),
+        When(busqueda__startswith=f' {termino}', then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return filtrar_alumnos(queryset, texto).annotate(relevancia=relevancia).order_by(
+        '-relevancia', 'apellidos', 'nombres', 'id'
+    )[:limite]
+
+
+def filtro_palabras(termino, campo='pk'):
+    """Cada palabra del término (ya normalizado) debe iniciar una palabra del alumno; campo apunta al alumno"""
+    condicion = Q()
+    for palabra in termino.split(' '):
+        condicion &= Q(**{f'{campo}__in': alumnos_con_prefijo(palabra)})
+    return condicion
+
+
+def alumnos_con_prefijo(prefijo):
+    """Subconsulta con los ids de alumnos que tienen una palabra que empieza por prefijo"""
+    return PalabraAlumno.objects.filter(filtro_prefijo('palabra', prefijo)).values('alumno_id')
+
+
+def filtro_prefijo(campo, valor):
+    """
+    Prefijo como rango (campo >= 'abc' AND campo < 'abd') en lugar de LIKE 'abc%',
+    así cualquier motor puede resolverlo con el índice de la columna.
+    """
+    siguiente = valor[:-1] + chr(ord(valor[-1]) + 1)
+    return Q(**{f'{campo}__gte': valor, f'{campo}__lt': siguiente})
@@ -2,6 +2,20 @@ from django import forms
 from .models import Alumno
 import datetime
 
+
+def validar_dni(dni):
+    if len(dni) != 8 or not dni.isdigit():
+        raise forms.ValidationError("El DNI debe tener exactamente 8 dígitos.")
+
+
+def validar_fecha_nacimiento(fecha_nacimiento, hoy=None):
+    edad = (hoy or datetime.date.today()).year - fecha_nacimiento.year
+    if edad < 5:
+        raise forms.ValidationError("El alumno debe tener al menos 5 años.")
+    if edad > 100:
+        raise forms.ValidationError("La fecha de nacimiento no es válida.")
+
+
 class AlumnoForm(forms.ModelForm):
     class Meta:
         model = Alumno
@@ -69,8 +83,7 @@ class AlumnoForm(forms.ModelForm):
     
     def clean_dni(self):
         dni = self.cleaned_data.get('dni')
-        if len(dni) != 8 or not dni.isdigit():
-            raise forms.ValidationError("El DNI debe tener exactamente 8 dígitos.")
+        validar_dni(dni)
         
         # Verificar duplicados
         if self.instance and self.instance.pk:
@@ -94,9 +107,5 @@ class AlumnoForm(forms.ModelForm):
     def clean_fecha_nacimiento(self):
         fecha_nacimiento = self.cleaned_data.get('fecha_nacimiento')
         if fecha_nacimiento:
-            edad = datetime.date.today().year - fecha_nacimiento.year
-            if edad < 5:
-                raise forms.ValidationError("El alumno debe tener al menos 5 años.")
-            if edad > 100:
-                raise forms.ValidationError("La fecha de nacimiento no es válida.")
+            validar_fecha_nacimiento(fecha_nacimiento)
         return fecha_nacimiento
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Importación masiva de alumnos desde archivos CSV/XLSX.
+
+Las columnas corresponden a los campos del modelo (dni, codigo_alumno, nombres,
+apellidos, fecha_nacimiento, genero, email, telefono, direccion, fecha_ingreso,
+estado, observaciones). Si el DNI ya existe el alumno se actualiza; si no, se crea.
+"""
+import datetime
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from auth_app.estadisticas import sumar_creados
+from matriculas.busqueda import sincronizar_busqueda
+from matriculas.models import Matricula
+from sistema_instituto.archivos import ResultadoImportacion, en_lotes, parsear_fecha
+from .forms import validar_dni, validar_fecha_nacimiento
+from .models import Alumno, PalabraAlumno
+
+TAMANO_LOTE = 1000
+CAMPOS = [
+    'dni', 'codigo_alumno', 'nombres', 'apellidos', 'fecha_nacimiento',
+    'genero', 'email', 'telefono', 'direccion', 'fecha_ingreso',
+    'estado', 'observaciones'
+]
+CAMPOS_FECHA = ['fecha_nacimiento', 'fecha_ingreso']
+# Campos que se sobrescriben al actualizar un alumno existente
+CAMPOS_ACTUALIZABLES = [c for c in CAMPOS if c != 'dni']
+
+
+def importar_alumnos(filas, usuario, tamano_lote=TAMANO_LOTE):
+    """
+    Importa (crea o actualiza) alumnos a partir de un iterable de (numero_fila, dict).
+
+    Por cada lote se hace una única consulta para detectar DNIs y códigos ya
+    registrados, y la escritura se resuelve con bulk_create/bulk_update en una
+    transacción. Las filas inválidas se reportan sin detener la importación.
+    """
+    resultado = ResultadoImportacion()
+    hoy = datetime.date.today()
+    vistos = {'dni': set(), 'codigo_alumno': set()}
+
+    for lote in en_lotes(filas, tamano_lote):
+        resultado.procesadas += len(lote)
+        _importar_lote(lote, usuario, hoy, vistos, resultado)
+
+    return resultado
+
+
+def _importar_lote(lote, usuario, hoy, vistos, resultado):
+    validas = []
+    for numero, fila in lote:
+        try:
+            datos = _validar_fila(fila, hoy)
+        except ValidationError as e:
+            resultado.agregar_error(numero, ' '.join(e.messages))
+            continue
+        if datos['dni'] in vistos['dni']:
+            resultado.agregar_error(numero, "DNI repetido en el archivo.")
+            continue
+        if datos['codigo_alumno'] in vistos['codigo_alumno']:
+            resultado.agregar_error(numero, "Código de alumno repetido en el archivo.")
+            continue
+        vistos['dni'].add(datos['dni'])
+        vistos['codigo_alumno'].add(datos['codigo_alumno'])
+        validas.append((numero, datos))
+
+    if not validas:
+        return
+
+    dnis = [datos['dni'] for _, datos in validas]
+    codigos = [datos['codigo_alumno'] for _, datos in validas]
+    existentes_por_dni = {}
+    existentes_por_codigo = {}
+    for alumno in Alumno.objects.filter(Q(dni__in=dnis) | Q(codigo_alumno__in=codigos)):
+        existentes_por_dni[alumno.dni] = alumno
+        existentes_por_codigo[alumno.codigo_alumno] = alumno
+
+    nuevos = []
+    actualizados = []
+    for numero, datos in validas:
+        existente = existentes_por_dni.get(datos['dni'])
+        otro = existentes_por_codigo.get(datos['codigo_alumno'])
+        if otro is not None and otro is not existente:
+            resultado.agregar_error(numero, "Este código de alumno ya está en uso.")
+            continue
+
+        if existente is None:
+            nuevos.append((numero, Alumno(creado_por=usuario, **datos)))
+        else:
+            for campo in CAMPOS_ACTUALIZABLES:
+                setattr(existente, campo, datos[campo])
+            actualizados.append((numero, existente))
+
+    # bulk_create/bulk_update no llaman a save() ni envían post_save: la columna
+    # y las palabras de búsqueda, el auto_now de updated_at y las columnas
+    # copiadas en las matrículas se actualizan explícitamente
+    ahora = timezone.now()
+    for _, alumno in nuevos:
+        alumno.actualizar_busqueda()
+    for _, alumno in actualizados:
+        alumno.actualizar_busqueda()
+        alumno.updated_at = ahora
+
+    try:
+        with transaction.atomic():
+            Alumno.objects.bulk_create([alumno for _, alumno in nuevos])
+            sumar_creados(alumno for _, alumno in nuevos)
+            Alumno.objects.bulk_update(
+                [alumno for _, alumno in actualizados], CAMPOS_ACTUALIZABLES + ['busqueda', 'updated_at']
+            )
+            PalabraAlumno.sincronizar(alumno for _, alumno in nuevos + actualizados)
+            if actualizados:
+                sincronizar_busqueda(Matricula.objects.filter(alumno__in=[alumno.pk for _, alumno in actualizados]))
+    except IntegrityError:
+        # Choque con otra escritura o intercambio de códigos: se guarda fila por fila
+        _guardar_por_fila(nuevos, actualizados, resultado)
+    else:
+        resultado.creadas += len(nuevos)
+        resultado.actualizadas += len(actualizados)
+
+
+def _guardar_por_fila(nuevos, actualizados, resultado):
+    for numero, alumno in nuevos:
+        # bulk_create pudo asignar un pk antes de revertirse la transacción
+        alumno.pk, alumno._state.adding = None, True
+        if _guardar_alumno(numero, alumno, resultado):
+            resultado.creadas += 1
+    for numero, alumno in actualizados:
+        if _guardar_alumno(numero, alumno, resultado):
+            resultado.actualizadas += 1
+
+
+def _guardar_alumno(numero, alumno, resultado):
+    try:
+        with transaction.atomic():
+            alumno.save()
+    except IntegrityError:
+        resultado.agregar_error(numero, "El DNI o el código de alumno ya está registrado.")
+        return False
+    return True
+
+
+def _validar_fila(fila, hoy):
+    datos = {}
+    errores = []
+    for campo in CAMPOS:
+        valor = fila.get(campo)
+        if campo in CAMPOS_FECHA:
+            try:
+                valor = parsear_fecha(valor, campo)
+            except ValueError as e:
+                errores.append(str(e))
+                continue
+        else:
+            valor = str(valor).strip() if valor not in (None, '') else ''
+
+        modelo = Alumno._meta.get_field(campo)
+        if valor in (None, '') and not (modelo.blank or modelo.has_default()):
+            errores.append(f"El campo {campo} es obligatorio.")
+        datos[campo] = valor
+    if errores:
+        raise ValidationError(errores)
+
+    datos['genero'] = datos['genero'].upper()
+    datos['estado'] = (datos['estado'] or 'A').upper()
+    datos['observaciones'] = datos['observaciones'] or None
+
+    validar_dni(datos['dni'])
+    validar_fecha_nacimiento(datos['fecha_nacimiento'], hoy)
+    validate_email(datos['email'])
+    if datos['genero'] not in dict(Alumno.GENERO_CHOICES):
+        raise ValidationError(f"Género no válido: '{datos['genero']}'.")
+    if datos['estado'] not in dict(Alumno.ESTADO_CHOICES):
+        raise ValidationError(f"Estado no válido: '{datos['estado']}'.")
+    for campo in ['codigo_alumno', 'nombres', 'apellidos', 'telefono']:
+        max_length = Alumno._meta.get_field(campo).max_length
+        if len(datos[campo]) > max_length:
+            raise ValidationError(f"El campo {campo} supera los {max_length} caracteres.")
+    return datos
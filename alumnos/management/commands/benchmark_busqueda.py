@@ -0,0 +1,81 @@
+import statistics
+import time
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from alumnos.busqueda import buscar_por_relevancia, filtrar_alumnos
+from alumnos.models import Alumno, PalabraAlumno
+
+NOMBRES = ['José', 'María', 'Lucía', 'Andrés', 'Sofía', 'Martín', 'Valeria', 'Ángel']
+APELLIDOS = ['Pérez', 'Quispe', 'Núñez', 'Rodríguez', 'Mamani', 'Gómez', 'Ramírez', 'Peña']
+CONSULTAS = ['perez', 'Núñez Sofía', '4000012', 'BUSQ-0000', 'ramirez ang', 'zzz']
+
+
+class Command(BaseCommand):
+    help = ('Compara la búsqueda con icontains encadenados contra la tabla de palabras normalizadas '
+            'con distintos volúmenes de alumnos sintéticos (los datos se revierten al final)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--usuario', help='Usuario creador de los datos sintéticos')
+
+    def handle(self, *args, **options):
+        if options['usuario']:
+            usuario = User.objects.get(username=options['usuario'])
+        else:
+            usuario = User.objects.order_by('id').first()
+        if usuario is None:
+            usuario = User.objects.create(username='benchmark_busqueda')
+
+        with transaction.atomic():
+            existentes = 0
+            for tamano in sorted(options['tamanos']):
+                self.generar(usuario, existentes, tamano)
+                existentes = tamano
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{tamano} alumnos sintéticos'))
+                for consulta in CONSULTAS:
+                    antes = self.medir(lambda: list(self.buscar_icontains(consulta)[:50]), options['repeticiones'])
+                    lista = self.medir(lambda: list(filtrar_alumnos(Alumno.objects.all(), consulta)[:50]), options['repeticiones'])
+                    ranking = self.medir(lambda: list(buscar_por_relevancia(Alumno.objects.all(), consulta)), options['repeticiones'])
+                    self.stdout.write(
+                        f'  {consulta!r:16} icontains: {antes:8.1f}ms | '
+                        f'palabras: {lista:8.1f}ms | con relevancia: {ranking:8.1f}ms'
+                    )
+            transaction.set_rollback(True)
+
+    def buscar_icontains(self, consulta):
+        return Alumno.objects.filter(
+            Q(nombres__icontains=consulta) |
+            Q(apellidos__icontains=consulta) |
+            Q(dni__icontains=consulta) |
+            Q(codigo_alumno__icontains=consulta) |
+            Q(email__icontains=consulta)
+        )
+
+    def medir(self, funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
+
+    def generar(self, usuario, desde, hasta, lote=5000):
+        hoy = date.today()
+        for inicio in range(desde, hasta, lote):
+            alumnos = []
+            for i in range(inicio, min(inicio + lote, hasta)):
+                alumno = Alumno(
+                    dni=f'4{i:07d}', codigo_alumno=f'BUSQ-{i:07d}',
+                    nombres=NOMBRES[i % len(NOMBRES)],
+                    apellidos=f'{APELLIDOS[i % len(APELLIDOS)]} {APELLIDOS[(i // 8) % len(APELLIDOS)]}',
+                    fecha_nacimiento=date(2000, 1, 1), genero='O',
+                    email=f'busqueda{i}@example.com', telefono='999999999',
+                    direccion='-', fecha_ingreso=hoy, creado_por=usuario
+                )
+                alumno.actualizar_busqueda()
+                alumnos.append(alumno)
+            PalabraAlumno.sincronizar(Alumno.objects.bulk_create(alumnos))
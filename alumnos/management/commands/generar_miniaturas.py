@@ -0,0 +1,53 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from alumnos.miniaturas import generar_miniaturas
+from alumnos.models import Alumno
+
+TAMANO_LOTE = 200
+
+
+class Command(BaseCommand):
+    help = ('Genera las miniaturas de las fotos de alumnos que aún no las tienen (o de todas con --todas) '
+            'usando varios hilos; Pillow libera el GIL al decodificar y redimensionar')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=min(8, os.cpu_count() or 1))
+        parser.add_argument('--todas', action='store_true',
+                            help='Regenera también las miniaturas existentes (p. ej. al cambiar los tamaños)')
+
+    def handle(self, *args, **options):
+        alumnos = Alumno.objects.exclude(Q(foto='') | Q(foto__isnull=True))
+        if not options['todas']:
+            alumnos = alumnos.exclude(miniatura_de=F('foto'))
+        pendientes = list(alumnos.values_list('pk', 'foto'))
+        if not pendientes:
+            self.stdout.write('No hay fotos pendientes.')
+            return
+
+        inicio = time.perf_counter()
+        generadas = []
+        fallidas = 0
+        with ThreadPoolExecutor(max_workers=max(options['hilos'], 1)) as pool:
+            resultados = pool.map(lambda fila: (fila, generar_miniaturas(fila[1])), pendientes)
+            for numero, ((pk, foto), correcta) in enumerate(resultados, 1):
+                if correcta:
+                    generadas.append(Alumno(pk=pk, miniatura_de=foto))
+                else:
+                    fallidas += 1
+                if len(generadas) == TAMANO_LOTE:
+                    Alumno.objects.bulk_update(generadas, ['miniatura_de'])
+                    generadas = []
+                if numero % TAMANO_LOTE == 0:
+                    self.stdout.write(f'  {numero}/{len(pendientes)}')
+        Alumno.objects.bulk_update(generadas, ['miniatura_de'])
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(pendientes) - fallidas} fotos procesadas en {duracion:.1f}s '
+            f'({len(pendientes) / duracion:.1f} fotos/s)'
+        ))
+        if fallidas:
+            self.stdout.write(self.style.WARNING(f'{fallidas} fotos no se pudieron leer (ver el log).'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 10:58
+
+from django.db import migrations, models
+from sistema_instituto.texto import normalizar_texto
+
+
+def calcular_busqueda(apps, schema_editor):
+    Alumno = apps.get_model('alumnos', 'Alumno')
+    lote = []
+    for alumno in Alumno.objects.only('apellidos', 'nombres', 'dni', 'codigo_alumno', 'email').iterator(chunk_size=2000):
+        partes = [alumno.apellidos, alumno.nombres, alumno.dni, alumno.codigo_alumno, alumno.email]
+        alumno.busqueda = ' ' + normalizar_texto(' '.join(p for p in partes if p))[:498]
+        lote.append(alumno)
+        if len(lote) == 2000:
+            Alumno.objects.bulk_update(lote, ['busqueda'])
+            lote = []
+    Alumno.objects.bulk_update(lote, ['busqueda'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumno',
+            name='busqueda',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=500, verbose_name='Texto de Búsqueda'),
+        ),
+        migrations.RunPython(calcular_busqueda, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0002_alumno_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumno',
+            name='miniatura_de',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Miniaturas de'),
+        ),
+    ]
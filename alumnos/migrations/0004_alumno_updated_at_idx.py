@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0003_alumno_miniatura_de'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(fields=['updated_at', 'id'], name='alumnos_alu_updated_7e3145_idx'),
+        ),
+    ]
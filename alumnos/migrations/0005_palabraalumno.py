@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+from sistema_instituto.texto import palabras
+
+
+def llenar_palabras(apps, schema_editor):
+    Alumno = apps.get_model('alumnos', 'Alumno')
+    PalabraAlumno = apps.get_model('alumnos', 'PalabraAlumno')
+    lote = []
+    for alumno_id, busqueda in Alumno.objects.values_list('id', 'busqueda').iterator(chunk_size=2000):
+        lote.extend(PalabraAlumno(alumno_id=alumno_id, palabra=palabra) for palabra in palabras(busqueda))
+        if len(lote) >= 10000:
+            PalabraAlumno.objects.bulk_create(lote)
+            lote = []
+    PalabraAlumno.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0004_alumno_updated_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PalabraAlumno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('palabra', models.CharField(max_length=100, verbose_name='Palabra')),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='palabras', to='alumnos.alumno', verbose_name='Alumno')),
+            ],
+            options={
+                'verbose_name': 'Palabra de búsqueda',
+                'verbose_name_plural': 'Palabras de búsqueda',
+                'indexes': [models.Index(fields=['palabra', 'alumno'], name='alumnos_pal_palabra_8841f4_idx')],
+                'unique_together': {('alumno', 'palabra')},
+            },
+        ),
+        migrations.RunPython(llenar_palabras, migrations.RunPython.noop),
+    ]
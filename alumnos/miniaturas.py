@@ -0,0 +1,70 @@
+"""
+Miniaturas de Alumno.foto.
+
+Cada foto tiene variantes cuadradas de tamaño fijo guardadas junto al
+original en alumnos/fotos/miniaturas/, con un nombre derivado del de la foto
+(foto1.png -> miniaturas/foto1_png_avatar.jpg). Alumno.miniatura_de guarda para
+qué foto se generaron: si no coincide con la foto actual (fotos anteriores a
+las miniaturas o cargadas por otra vía) las plantillas usan el original hasta
+que se ejecute "manage.py generar_miniaturas".
+"""
+import io
+import logging
+import posixpath
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Lado en píxeles de cada variante: el doble de lo que ocupan en pantalla
+# (avatar de 40-60px en listas, foto de 150px en el detalle) para pantallas de alta densidad
+VARIANTES = {
+    'avatar': 120,
+    'detalle': 300,
+}
+CARPETA = 'miniaturas'
+CALIDAD_JPEG = 85
+
+
+def ruta_variante(nombre_foto, variante):
+    carpeta, archivo = posixpath.split(nombre_foto)
+    # La extensión forma parte del nombre para que foto1.png y foto1.jpg no compartan miniaturas
+    return posixpath.join(carpeta, CARPETA, f'{archivo.replace(".", "_")}_{variante}.jpg')
+
+
+def url_variante(alumno, variante):
+    """URL de la variante si está generada para la foto actual; si no, la del original"""
+    if not alumno.foto:
+        return ''
+    if alumno.miniatura_de == alumno.foto.name:
+        return default_storage.url(ruta_variante(alumno.foto.name, variante))
+    return alumno.foto.url
+
+
+def generar_miniaturas(nombre_foto, storage=default_storage):
+    """
+    Genera todas las variantes de la foto guardada con ese nombre, reemplazando
+    las que existan. Devuelve False si la imagen no se puede leer.
+    """
+    try:
+        with storage.open(nombre_foto, 'rb') as archivo:
+            imagen = Image.open(archivo)
+            # En JPEG decodifica directamente a una escala reducida, mucho más rápido
+            imagen.draft('RGB', (max(VARIANTES.values()),) * 2)
+            # Respetar la orientación de las fotos de celular antes de recortar
+            imagen = ImageOps.exif_transpose(imagen).convert('RGB')
+    except (OSError, Image.DecompressionBombError) as error:
+        logger.warning('No se pudo leer la foto %s: %s', nombre_foto, error)
+        return False
+
+    for variante, lado in VARIANTES.items():
+        miniatura = ImageOps.fit(imagen, (lado, lado), Image.Resampling.LANCZOS)
+        salida = io.BytesIO()
+        miniatura.save(salida, 'JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True)
+        ruta = ruta_variante(nombre_foto, variante)
+        # El storage renombraría el archivo si ya existe
+        if storage.exists(ruta):
+            storage.delete(ruta)
+        storage.save(ruta, ContentFile(salida.getvalue()))
+    return True
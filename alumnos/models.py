@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from sistema_instituto.texto import LARGO_PALABRA, normalizar_texto, palabras
+from .miniaturas import generar_miniaturas, url_variante
 
 class Alumno(models.Model):
     GENERO_CHOICES = [
@@ -35,6 +37,11 @@ class Alumno(models.Model):
     # Información adicional
     observaciones = models.TextField(blank=True, null=True, verbose_name="Observaciones")
     foto = models.ImageField(upload_to='alumnos/fotos/', blank=True, null=True, verbose_name="Foto")
+    # Nombre de la foto para la que existen miniaturas (ver alumnos/miniaturas.py)
+    miniatura_de = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name="Miniaturas de")
+
+    # Búsqueda: apellidos, nombres, DNI, código y email normalizados (sin tildes ni mayúsculas)
+    busqueda = models.CharField(max_length=500, blank=True, default='', editable=False, db_index=True, verbose_name="Texto de Búsqueda")
     
     # Auditoría
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
@@ -49,11 +56,48 @@ class Alumno(models.Model):
             models.Index(fields=['dni']),
             models.Index(fields=['codigo_alumno']),
             models.Index(fields=['apellidos', 'nombres']),
+            # Feed de cambios: recorre por (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
         return f"{self.codigo_alumno} - {self.apellidos}, {self.nombres}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Las palabras de búsqueda solo se reescriben si el texto cambia
+        instance._busqueda_guardada = instance.__dict__.get('busqueda')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.actualizar_busqueda()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'busqueda' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['busqueda']
+        # Una foto recién subida todavía no está en el storage; su nombre final se conoce al guardar
+        foto_nueva = bool(self.foto) and not self.foto._committed
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.busqueda != getattr(self, '_busqueda_guardada', None):
+                PalabraAlumno.sincronizar([self])
+        self._busqueda_guardada = self.busqueda
+        if foto_nueva and generar_miniaturas(self.foto.name):
+            self.miniatura_de = self.foto.name
+            Alumno.objects.filter(pk=self.pk).update(miniatura_de=self.miniatura_de)
+
+    def actualizar_busqueda(self):
+        """Recalcula la columna de búsqueda; llamar antes de bulk_create/bulk_update"""
+        partes = [self.apellidos, self.nombres, self.dni, self.codigo_alumno, self.email]
+        # El espacio inicial permite buscar por inicio de palabra con ' termino'
+        self.busqueda = ' ' + normalizar_texto(' '.join(p for p in partes if p))[:498]
+
+    def url_avatar(self):
+        return url_variante(self, 'avatar')
+
+    def url_foto_detalle(self):
+        return url_variante(self, 'detalle')
+
     def nombre_completo(self):
         return f"{self.apellidos}, {self.nombres}"
 
@@ -70,4 +114,38 @@ class Alumno(models.Model):
     def cursos_inscritos(self):
         # Esto lo conectaremos después con el modelo de matrículas
         return 0  # Por ahora retorna 0
-      
\ No newline at end of file
+      
+
+
+class PalabraAlumno(models.Model):
+    """
+    Una fila por palabra de Alumno.busqueda. Buscar "palabras que empiezan por
+    'quis'" es un rango sobre el índice de palabra, en lugar del LIKE '% quis%'
+    sobre la columna completa, que ningún índice puede resolver.
+    """
+    alumno = models.ForeignKey(Alumno, on_delete=models.CASCADE, related_name='palabras', verbose_name="Alumno")
+    palabra = models.CharField(max_length=LARGO_PALABRA, verbose_name="Palabra")
+
+    class Meta:
+        verbose_name = "Palabra de búsqueda"
+        verbose_name_plural = "Palabras de búsqueda"
+        unique_together = ['alumno', 'palabra']
+        indexes = [
+            models.Index(fields=['palabra', 'alumno']),
+        ]
+
+    @classmethod
+    def sincronizar(cls, alumnos, tamano_lote=1000):
+        """Reemplaza las palabras de alumnos ya guardados; llamar tras bulk_create/bulk_update"""
+        alumnos = list(alumnos)
+        sin_id = {alumno.dni: alumno for alumno in alumnos if alumno.pk is None}
+        if sin_id:
+            # bulk_create no asigna los ids en motores sin RETURNING (MySQL)
+            for dni, pk in Alumno.objects.filter(dni__in=list(sin_id)).values_list('dni', 'pk'):
+                sin_id[dni].pk = pk
+        for inicio in range(0, len(alumnos), tamano_lote):
+            lote = alumnos[inicio:inicio + tamano_lote]
+            cls.objects.filter(alumno__in=[alumno.pk for alumno in lote]).delete()
+            cls.objects.bulk_create(
+                cls(alumno_id=alumno.pk, palabra=palabra) for alumno in lote for palabra in palabras(alumno.busqueda)
+            )
@@ -1,3 +1,118 @@
+import io
+import zipfile
+from datetime import date, datetime
+from django.contrib.auth.models import User
 from django.test import TestCase
+from openpyxl import Workbook
+from sistema_instituto.archivos import leer_filas
+from .busqueda import buscar_por_relevancia, filtrar_alumnos
+from .importacion import CAMPOS, importar_alumnos
+from .models import Alumno
 
-# Create your tests here.
+
+class BusquedaAlumnosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user('admin', password='clave', is_staff=True)
+        datos = [
+            ('40000001', 'A0001', 'José Luis', 'Quispe Mamani'),
+            ('40000002', 'A0002', 'María', 'Quiroz'),
+            ('40000003', 'B0003', 'Ana', 'Pérez Quispe'),
+            ('40000004', 'B0004', 'Ángel', 'Ñahui'),
+            ('41000005', '40000001X', 'Pedro', 'Aguilar'),
+        ]
+        for dni, codigo, nombres, apellidos in datos:
+            Alumno.objects.create(
+                dni=dni, codigo_alumno=codigo, nombres=nombres, apellidos=apellidos,
+                fecha_nacimiento=date(2000, 1, 1), genero='F', email=f'{codigo.lower()}@example.com',
+                telefono='999999999', direccion='Lima', fecha_ingreso=date(2024, 3, 1), creado_por=usuario,
+            )
+
+    def buscar(self, texto):
+        return sorted(filtrar_alumnos(Alumno.objects.all(), texto).values_list('dni', flat=True))
+
+    def test_prefijo_de_palabra(self):
+        self.assertEqual(self.buscar('quis'), ['40000001', '40000003'])
+        self.assertEqual(self.buscar('qui'), ['40000001', '40000002', '40000003'])
+        self.assertEqual(self.buscar('ispe'), [])
+
+    def test_cada_palabra_debe_coincidir(self):
+        self.assertEqual(self.buscar('quispe ana'), ['40000003'])
+        self.assertEqual(self.buscar('  Quispe   JOSÉ '), ['40000001'])
+        self.assertEqual(self.buscar('quispe pedro'), [])
+
+    def test_sin_tildes_ni_mayusculas(self):
+        self.assertEqual(self.buscar('jose'), ['40000001'])
+        self.assertEqual(self.buscar('PÉREZ'), ['40000003'])
+        self.assertEqual(self.buscar('nahui angel'), ['40000004'])
+        self.assertEqual(self.buscar('maría'), self.buscar('maria'))
+
+    def test_dni_y_codigo(self):
+        self.assertEqual(self.buscar('4000000'), ['40000001', '40000002', '40000003', '40000004', '41000005'])
+        self.assertEqual(self.buscar('41'), ['41000005'])
+        self.assertEqual(self.buscar('b000'), ['40000003', '40000004'])
+
+    def test_palabras_se_actualizan_al_editar(self):
+        alumno = Alumno.objects.get(dni='40000002')
+        alumno.apellidos = 'Condori'
+        alumno.save()
+        self.assertEqual(self.buscar('quiroz'), [])
+        self.assertEqual(self.buscar('condo'), ['40000002'])
+
+    def test_orden_por_relevancia(self):
+        def orden(texto):
+            return [alumno.dni for alumno in buscar_por_relevancia(Alumno.objects.all(), texto)]
+
+        # Primero quien empieza por el término (apellido), aunque Pérez vaya antes alfabéticamente
+        self.assertEqual(orden('quispe'), ['40000001', '40000003'])
+        # DNI exacto antes que un código que solo empieza igual
+        self.assertEqual(orden('40000001'), ['40000001', '41000005'])
+        self.assertEqual(orden('   '), [])
+        self.assertEqual(len(buscar_por_relevancia(Alumno.objects.all(), 'a', limite=2)), 2)
+
+
+class ImportacionAlumnosTests(TestCase):
+    def xlsx(self, *filas, cientificos=()):
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(CAMPOS)
+        for fila in filas:
+            hoja.append(fila)
+        archivo = io.BytesIO()
+        libro.save(archivo)
+        # openpyxl escribe 87654321.0 como 87654321; Excel y LibreOffice pueden guardar
+        # 8.7654321E7, que se lee como float: se reescribe la hoja para reproducirlo
+        copia = io.BytesIO()
+        with zipfile.ZipFile(archivo) as origen, zipfile.ZipFile(copia, 'w') as destino:
+            for nombre in origen.namelist():
+                contenido = origen.read(nombre)
+                if nombre == 'xl/worksheets/sheet1.xml':
+                    for numero in cientificos:
+                        contenido = contenido.replace(f'<v>{numero}</v>'.encode(), f'<v>{numero / 10 ** 7}E7</v>'.encode())
+                destino.writestr(nombre, contenido)
+        copia.seek(0)
+        return copia
+
+    def test_xlsx_con_celdas_numericas(self):
+        usuario = User.objects.create_user('admin', password='clave')
+        # Excel guarda como número el DNI y el teléfono escritos sin apóstrofo
+        archivo = self.xlsx(
+            [12345678, 'A0001', 'Ana', 'Pérez', datetime(2000, 5, 1), 'F', 'ana@example.com',
+             987654321, 'Lima', datetime(2024, 3, 1), 'A', None],
+            [87654321, 'A0002', 'Luis', 'Rojas', '01/02/2001', 'm', 'luis@example.com',
+             '999 999 999', 'Cusco', '2024-03-01', None, 'Becado'],
+            cientificos=[87654321],
+        )
+        resultado = importar_alumnos(leer_filas(archivo, 'alumnos.xlsx'), usuario)
+        self.assertEqual((resultado.creadas, resultado.errores), (2, []))
+        ana = Alumno.objects.get(codigo_alumno='A0001')
+        self.assertEqual((ana.dni, ana.telefono, ana.fecha_nacimiento), ('12345678', '987654321', date(2000, 5, 1)))
+        luis = Alumno.objects.get(codigo_alumno='A0002')
+        self.assertEqual((luis.dni, luis.genero, luis.estado, luis.fecha_nacimiento), ('87654321', 'M', 'A', date(2001, 2, 1)))
+        # Los DNI numéricos también se encuentran al volver a importar: se actualiza, no se duplica
+        archivo = self.xlsx([12345678, 'A0001', 'Ana María', 'Pérez', datetime(2000, 5, 1), 'F',
+                             'ana@example.com', 987654321, 'Lima', datetime(2024, 3, 1), 'A', None],
+                            cientificos=[12345678])
+        resultado = importar_alumnos(leer_filas(archivo, 'alumnos.xlsx'), usuario)
+        self.assertEqual((resultado.creadas, resultado.actualizadas), (0, 1))
+        self.assertEqual(Alumno.objects.get(dni='12345678').nombres, 'Ana María')
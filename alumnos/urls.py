@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'alumnos'
 
@@ -16,4 +16,10 @@ urlpatterns = [
     # Búsqueda y reportes
     path('buscar/', views.buscar_alumnos, name='buscar_alumnos'),
     path('reporte/', views.reporte_alumnos, name='reporte_alumnos'),
+    path('exportar/', views.exportar_alumnos, name='exportar_alumnos'),
+
+    # API JSON de solo lectura
+    path('api/', api.lista, name='api_alumnos'),
+    path('api/cambios/', api.cambios, name='api_alumnos_cambios'),
+    path('api/<int:alumno_id>/', api.detalle, name='api_alumno'),
 ]
\ No newline at end of file
@@ -1,44 +1,82 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_date
+from datetime import date
+from sistema_instituto.exportacion import Columna, respuesta_exportacion
+from sistema_instituto.paginacion import conteo_cacheado, paginar_keyset
+from sistema_instituto.replicas import lectura_en_replica
 from .models import Alumno
 from .forms import AlumnoForm
+from .busqueda import buscar_por_relevancia, filtrar_alumnos
+
+ORDENES_LISTA_ALUMNOS = {
+    'apellidos': ['apellidos', 'nombres', 'id'],
+    'fecha_ingreso': ['fecha_ingreso', 'id'],
+    'created_at': ['created_at', 'id'],
+}
+
+COLUMNAS_EXPORTACION = [
+    Columna('Código', 'codigo_alumno'),
+    Columna('DNI', 'dni'),
+    Columna('Apellidos', 'apellidos'),
+    Columna('Nombres', 'nombres'),
+    Columna('Fecha de Nacimiento', 'fecha_nacimiento'),
+    Columna('Género', 'genero', Alumno.GENERO_CHOICES),
+    Columna('Correo Electrónico', 'email'),
+    Columna('Teléfono', 'telefono'),
+    Columna('Dirección', 'direccion'),
+    Columna('Fecha de Ingreso', 'fecha_ingreso'),
+    Columna('Estado', 'estado', Alumno.ESTADO_CHOICES),
+]
+
+
+def _fecha(valor):
+    try:
+        return parse_date(valor or '')
+    except ValueError:  # formato correcto pero fecha inexistente
+        return None
+
+
+def _filtrar(alumnos, parametros):
+    """Filtros de la lista y del reporte; la exportación acepta los de ambos"""
+    query = parametros.get('q')
+    if query:
+        alumnos = filtrar_alumnos(alumnos, query)
+    if parametros.get('estado'):
+        alumnos = alumnos.filter(estado=parametros['estado'])
+    if parametros.get('genero'):
+        alumnos = alumnos.filter(genero=parametros['genero'])
+    fecha_ingreso_desde = _fecha(parametros.get('fecha_ingreso_desde'))
+    fecha_ingreso_hasta = _fecha(parametros.get('fecha_ingreso_hasta'))
+    if fecha_ingreso_desde:
+        alumnos = alumnos.filter(fecha_ingreso__gte=fecha_ingreso_desde)
+    if fecha_ingreso_hasta:
+        alumnos = alumnos.filter(fecha_ingreso__lte=fecha_ingreso_hasta)
+    return alumnos
 
 @login_required
+@lectura_en_replica
 def lista_alumnos(request):
     """Lista todos los alumnos con filtros y búsqueda"""
-    alumnos = Alumno.objects.all()
-    
-    # Búsqueda
-    query = request.GET.get('q')
-    if query:
-        alumnos = alumnos.filter(
-            Q(nombres__icontains=query) |
-            Q(apellidos__icontains=query) |
-            Q(dni__icontains=query) |
-            Q(codigo_alumno__icontains=query) |
-            Q(email__icontains=query)
-        )
-    
-    # Filtros
-    estado = request.GET.get('estado')
-    genero = request.GET.get('genero')
-    
-    if estado:
-        alumnos = alumnos.filter(estado=estado)
-    if genero:
-        alumnos = alumnos.filter(genero=genero)
+    alumnos = _filtrar(Alumno.objects.all(), request.GET)
     
-    # Ordenamiento
-    orden = request.GET.get('orden', 'apellidos')
-    alumnos = alumnos.order_by(orden)
+    # Ordenamiento (cada orden termina en 'id' para paginar por cursor)
+    orden = ORDENES_LISTA_ALUMNOS.get(request.GET.get('orden'), ORDENES_LISTA_ALUMNOS['apellidos'])
+    pagina = paginar_keyset(alumnos, orden, request)
+    conteos = conteo_cacheado(
+        alumnos,
+        total_alumnos=Count('id'),
+        alumnos_activos=Count('id', filter=Q(estado='A')),
+    )
     
     context = {
-        'alumnos': alumnos,
+        'alumnos': pagina,
+        'pagina': pagina,
         'titulo': 'Lista de Alumnos',
-        'total_alumnos': alumnos.count(),
-        'alumnos_activos': alumnos.filter(estado='A').count(),
+        **conteos,
     }
     return render(request, 'alumnos/lista_alumnos.html', context)
 
@@ -117,18 +155,11 @@ def eliminar_alumno(request, alumno_id):
     return render(request, 'alumnos/eliminar_alumno.html', context)
 
 @login_required
+@lectura_en_replica
 def buscar_alumnos(request):
     """Búsqueda avanzada de alumnos"""
-    alumnos = Alumno.objects.all()
-    query = request.GET.get('q')
-    
-    if query:
-        alumnos = alumnos.filter(
-            Q(nombres__icontains=query) |
-            Q(apellidos__icontains=query) |
-            Q(dni__icontains=query) |
-            Q(codigo_alumno__icontains=query)
-        )
+    query = request.GET.get('q', '')
+    alumnos = buscar_por_relevancia(Alumno.objects.all(), query)
     
     context = {
         'alumnos': alumnos,
@@ -137,69 +168,62 @@ def buscar_alumnos(request):
     }
     return render(request, 'alumnos/buscar_alumnos.html', context)
 
+ALUMNOS_POR_PAGINA_REPORTE = 50
+
+
+def _restar_anios(fecha, anios):
+    try:
+        return fecha.replace(year=fecha.year - anios)
+    except ValueError:  # 29 de febrero en un año no bisiesto
+        return fecha.replace(year=fecha.year - anios, day=28)
+
+
+def _agregados_reporte(hoy):
+    """Conteos del reporte como agregados condicionales para un único aggregate()"""
+    hace_18 = _restar_anios(hoy, 18)
+    hace_25 = _restar_anios(hoy, 25)
+    hace_35 = _restar_anios(hoy, 35)
+    return {
+        'total_alumnos': Count('id'),
+        'alumnos_activos': Count('id', filter=Q(estado='A')),
+        'alumnos_inactivos': Count('id', filter=Q(estado='I')),
+        'alumnos_egresados': Count('id', filter=Q(estado='E')),
+        'alumnos_retirados': Count('id', filter=Q(estado='R')),
+        'masculinos': Count('id', filter=Q(genero='M')),
+        'femeninos': Count('id', filter=Q(genero='F')),
+        'otros': Count('id', filter=Q(genero='O')),
+        'menores_18': Count('id', filter=Q(fecha_nacimiento__gte=hace_18)),
+        'entre_18_25': Count('id', filter=Q(fecha_nacimiento__lt=hace_18, fecha_nacimiento__gte=hace_25)),
+        'entre_26_35': Count('id', filter=Q(fecha_nacimiento__lt=hace_25, fecha_nacimiento__gte=hace_35)),
+        'mayores_35': Count('id', filter=Q(fecha_nacimiento__lt=hace_35)),
+    }
+
 @login_required
+@lectura_en_replica
 def reporte_alumnos(request):
     """Genera reportes de alumnos con filtros avanzados"""
-    alumnos = Alumno.objects.all()
-    
-    # Filtros del reporte
-    estado = request.GET.get('estado')
-    genero = request.GET.get('genero')
-    fecha_ingreso_desde = request.GET.get('fecha_ingreso_desde')
-    fecha_ingreso_hasta = request.GET.get('fecha_ingreso_hasta')
-    
-    # Aplicar filtros
-    if estado:
-        alumnos = alumnos.filter(estado=estado)
-    if genero:
-        alumnos = alumnos.filter(genero=genero)
-    if fecha_ingreso_desde:
-        alumnos = alumnos.filter(fecha_ingreso__gte=fecha_ingreso_desde)
-    if fecha_ingreso_hasta:
-        alumnos = alumnos.filter(fecha_ingreso__lte=fecha_ingreso_hasta)
-    
-    # Estadísticas
-    total_alumnos = alumnos.count()
-    alumnos_activos = alumnos.filter(estado='A').count()
-    alumnos_inactivos = alumnos.filter(estado='I').count()
-    alumnos_egresados = alumnos.filter(estado='E').count()
-    alumnos_retirados = alumnos.filter(estado='R').count()
-    
-    # Distribución por género
-    masculinos = alumnos.filter(genero='M').count()
-    femeninos = alumnos.filter(genero='F').count()
-    otros = alumnos.filter(genero='O').count()
-    
-    # Distribución por edad
-    from datetime import date
-    hoy = date.today()
-    
-    menores_18 = alumnos.filter(fecha_nacimiento__gte=date(hoy.year-18, hoy.month, hoy.day)).count()
-    entre_18_25 = alumnos.filter(
-        fecha_nacimiento__lt=date(hoy.year-18, hoy.month, hoy.day),
-        fecha_nacimiento__gte=date(hoy.year-25, hoy.month, hoy.day)
-    ).count()
-    entre_26_35 = alumnos.filter(
-        fecha_nacimiento__lt=date(hoy.year-25, hoy.month, hoy.day),
-        fecha_nacimiento__gte=date(hoy.year-35, hoy.month, hoy.day)
-    ).count()
-    mayores_35 = alumnos.filter(fecha_nacimiento__lt=date(hoy.year-35, hoy.month, hoy.day)).count()
+    filtros = ['estado', 'genero', 'fecha_ingreso_desde', 'fecha_ingreso_hasta']
+    alumnos = _filtrar(Alumno.objects.all(), {clave: request.GET.get(clave) for clave in filtros})
     
+    # Todas las estadísticas salen de una sola consulta con agregación condicional
+    estadisticas = alumnos.aggregate(**_agregados_reporte(date.today()))
+
+    paginator = Paginator(alumnos, ALUMNOS_POR_PAGINA_REPORTE)
+    paginator.count = estadisticas['total_alumnos']  # evita un COUNT adicional
+    pagina = paginator.get_page(request.GET.get('page'))
+
     context = {
-        'alumnos': alumnos,
+        'alumnos': pagina,
+        'pagina': pagina,
         'titulo': 'Reporte de Alumnos',
-        'total_alumnos': total_alumnos,
-        'alumnos_activos': alumnos_activos,
-        'alumnos_inactivos': alumnos_inactivos,
-        'alumnos_egresados': alumnos_egresados,
-        'alumnos_retirados': alumnos_retirados,
-        'masculinos': masculinos,
-        'femeninos': femeninos,
-        'otros': otros,
-        'menores_18': menores_18,
-        'entre_18_25': entre_18_25,
-        'entre_26_35': entre_26_35,
-        'mayores_35': mayores_35,
-        'filtros_aplicados': any([estado, genero, fecha_ingreso_desde, fecha_ingreso_hasta])
+        **estadisticas,
+        'filtros_aplicados': any(request.GET.get(clave) for clave in filtros)
     }
-    return render(request, 'alumnos/reporte_alumnos.html', context)
\ No newline at end of file
+    return render(request, 'alumnos/reporte_alumnos.html', context)
+
+@login_required
+@lectura_en_replica
+def exportar_alumnos(request):
+    """Descarga en CSV o XLSX los alumnos con los filtros de la lista o del reporte"""
+    alumnos = _filtrar(Alumno.objects.all(), request.GET)
+    return respuesta_exportacion(alumnos, COLUMNAS_EXPORTACION, 'alumnos', request.GET.get('formato'))
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Contadores de cursos, alumnos y matrículas para el dashboard y el perfil.
+
+Se mantienen con UPDATE campo = campo ± n desde las señales de los modelos
+(y explícitamente tras cada bulk_create, que no las emite), de modo que
+mostrar los totales cuesta la lectura de una sola fila.
+
+Todas las escrituras tocan la misma fila global, así que el UPDATE se hace
+al confirmarse la transacción (on_commit) y no dentro de ella: si no, el
+bloqueo de esa fila duraría toda la transacción de la matrícula y las
+matrículas simultáneas se esperarían unas a otras. Si el proceso cae entre
+la confirmación y el UPDATE el total queda corto por uno;
+"manage.py reconstruir_estadisticas" lo recalcula.
+"""
+from collections import Counter, defaultdict
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, F
+from .models import Estadistica
+
+# Modelo contado -> columna de Estadistica
+CAMPOS = {
+    'cursos.curso': 'cursos',
+    'alumnos.alumno': 'alumnos',
+    'matriculas.matricula': 'matriculas',
+}
+
+
+def sumar(modelo, usuario_id, cantidad=1):
+    """Suma (o resta, con cantidad negativa) registros del modelo al total global y al del usuario"""
+    if cantidad:
+        _programar({usuario_id: {CAMPOS[modelo._meta.label_lower]: cantidad}})
+
+
+def sumar_creados(objetos):
+    """Suma registros creados con bulk_create, agrupados por modelo y creador"""
+    _programar(_por_usuario(objetos, 1))
+
+
+def restar_eliminados(objetos):
+    """Resta registros borrados juntos (un delete() con sus cascadas), agrupados por modelo y creador"""
+    _programar(_por_usuario(objetos, -1))
+
+
+def _por_usuario(objetos, signo):
+    cambios = defaultdict(Counter)
+    for objeto in objetos:
+        cambios[objeto.creado_por_id][CAMPOS[type(objeto)._meta.label_lower]] += signo
+    return cambios
+
+
+def _programar(cambios):
+    """cambios: {usuario_id: {campo: cantidad}}"""
+    if cambios:
+        # Fuera de una transacción on_commit ejecuta enseguida
+        transaction.on_commit(lambda: _aplicar(cambios))
+
+
+def _aplicar(cambios):
+    total = Counter()
+    for cantidades in cambios.values():
+        total.update(cantidades)
+    # Transacción propia y corta: un UPDATE para la fila global y uno por usuario
+    with transaction.atomic():
+        _incrementar(Estadistica.objects.filter(usuario__isnull=True), total)
+        for usuario_id, cantidades in cambios.items():
+            filas = Estadistica.objects.filter(usuario_id=usuario_id)
+            if not _incrementar(filas, cantidades) and any(c > 0 for c in cantidades.values()):
+                # Primer registro del usuario: crear su fila y volver a sumar
+                Estadistica.objects.get_or_create(usuario_id=usuario_id)
+                _incrementar(filas, cantidades)
+
+
+def _incrementar(filas, cantidades):
+    incrementos = {campo: F(campo) + cantidad for campo, cantidad in cantidades.items() if cantidad}
+    return filas.update(**incrementos) if incrementos else 0
+
+
+def contadores(usuario=None):
+    """Totales para el contexto de las plantillas; sin usuario, los globales"""
+    fila = Estadistica.objects.filter(usuario=usuario).values(*CAMPOS.values()).first() or {}
+    return {f'total_{campo}': fila.get(campo, 0) for campo in CAMPOS.values()}
+
+
+def reconstruir():
+    """Recalcula todas las filas desde las tablas; devuelve la cantidad de filas escritas"""
+    totales = {None: dict.fromkeys(CAMPOS.values(), 0)}
+    for etiqueta, campo in CAMPOS.items():
+        modelo = apps.get_model(etiqueta)
+        for usuario_id, total in modelo.objects.order_by().values_list('creado_por').annotate(total=Count('id')):
+            totales.setdefault(usuario_id, dict.fromkeys(CAMPOS.values(), 0))[campo] = total
+            totales[None][campo] += total
+
+    with transaction.atomic():
+        Estadistica.objects.all().delete()
+        Estadistica.objects.bulk_create(
+            Estadistica(usuario_id=usuario_id, **valores) for usuario_id, valores in totales.items()
+        )
+    return len(totales)
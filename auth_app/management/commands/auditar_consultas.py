@@ -0,0 +1,234 @@
+import json
+from collections import defaultdict
+from contextlib import ExitStack
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from alumnos.models import Alumno
+from cursos.models import Curso
+from matriculas.models import Matricula
+from sistema_instituto.auditoria import (
+    consolidar, contar_filas, cubierto, explicar, forma_consulta, indices_existentes, normalizar_sql,
+    poco_selectivas,
+)
+
+# Por debajo de este tamaño recorrer u ordenar la tabla completa cuesta pocos milisegundos
+FILAS_MINIMAS = 30000
+# Caché propia del comando: vaciarla antes de cada visita no toca la compartida
+# (sesiones, versiones del catálogo y del reporte) del entorno auditado
+CACHE_AUDITORIA = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auditar_consultas'},
+}
+
+
+class Captura:
+    """execute_wrapper que guarda cada SELECT con sus parámetros para poder explicarlo después"""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many:
+            self.consultas.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = ('Visita las vistas, agrupa las consultas por forma (columnas de WHERE y ORDER BY), las pasa por '
+            'EXPLAIN y recomienda índices compuestos. Con --verificar falla si alguna consulta recorre la tabla '
+            'completa u ordena en memoria cuando un índice selectivo podría evitarlo. Conviene sembrar datos '
+            'antes con "manage.py sembrar_datos": tanto el planificador como las recomendaciones dependen de '
+            'la cantidad y la distribución de las filas')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true',
+                            help='Termina con error si queda alguna consulta indexable sin índice')
+        parser.add_argument('--solo', nargs='+', default=[],
+                            help='Audita solo las vistas cuyo nombre contenga alguno de estos textos')
+        parser.add_argument('--sql', action='store_true', help='Muestra el SQL y el plan de cada forma')
+        parser.add_argument('--filas-minimas', type=int, default=FILAS_MINIMAS,
+                            help='Tablas más chicas solo generan advertencias')
+        parser.add_argument('--usuario', help='Usuario staff con el que se visitan las vistas')
+
+    def handle(self, *args, **options):
+        alumno = Alumno.objects.order_by('id').first()
+        curso = Curso.objects.order_by('id').first()
+        matricula = Matricula.objects.order_by('id').first()
+        if not (alumno and curso and matricula):
+            raise CommandError('Faltan datos: ejecute primero "manage.py sembrar_datos".')
+
+        # Caché propia (CACHE_AUDITORIA); el cliente de pruebas se presenta como 'testserver'
+        with override_settings(CACHES=CACHE_AUDITORIA, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            formas = self.capturar(options, alumno, curso, matricula)
+
+        existentes = {}
+        filas = {}
+        recomendados = defaultdict(set)
+        pendientes = 0
+        for datos in sorted(formas.values(), key=lambda d: (d['forma'].tabla, d['forma'].describir())):
+            forma = datos['forma']
+            if forma.tabla not in existentes:
+                existentes[forma.tabla] = indices_existentes(forma.tabla)
+                filas[forma.tabla] = contar_filas(forma.tabla)
+            plan, problemas = explicar(datos['sql'], datos['params'], forma.tabla,
+                                       filtrada=bool(forma.igualdad or forma.rango))
+            descartadas = poco_selectivas(forma, datos['params'], filas[forma.tabla]) if problemas else set()
+            indice = forma.indice_recomendado(descartadas)
+            falta = indice is not None and not cubierto(indice, existentes[forma.tabla])
+            # Ordenar lo que ya encontró un índice es barato; también lo es todo en una tabla chica
+            grave = bool(set(problemas or []) - {'orden tras búsqueda'})
+            pendiente = grave and falta and filas[forma.tabla] >= options['filas_minimas']
+
+            linea = f'{forma.tabla:24} {forma.describir()}'
+            if problemas is None:
+                estado = f'(EXPLAIN no soportado en {connection.vendor})'
+            elif not problemas or 'id' in forma.igualdad:
+                estado = 'ok'
+            elif falta:
+                estado = f'{", ".join(problemas)} -> índice ({", ".join(indice)})'
+                if not pendiente and grave:
+                    estado += f' (tabla de {filas[forma.tabla]} filas, no hace falta)'
+            elif not grave:
+                estado = ', '.join(problemas)
+            elif indice:
+                estado = f'{", ".join(problemas)} (el índice existe; revisar estadísticas del planificador)'
+            elif descartadas:
+                estado = f'{", ".join(problemas)} (filtro poco selectivo: {", ".join(sorted(descartadas))})'
+            else:
+                estado = f'{", ".join(problemas)} (no indexable)'
+
+            if pendiente:
+                pendientes += 1
+                recomendados[forma.tabla].add(tuple(indice))
+                self.stdout.write(self.style.ERROR(f'{linea}  {estado}'))
+            elif estado == 'ok':
+                self.stdout.write(f'{linea}  {estado}')
+            else:
+                self.stdout.write(self.style.WARNING(f'{linea}  {estado}'))
+            self.stdout.write(f'    vistas: {", ".join(sorted(datos["vistas"]))}')
+            if options['sql']:
+                self.stdout.write(f'    sql: {normalizar_sql(datos["sql"])}')
+                for paso in plan:
+                    self.stdout.write(f'    plan: {paso}')
+
+        if recomendados:
+            self.stdout.write('\nÍndices recomendados (Meta.indexes del modelo de cada tabla):')
+            modelos = {modelo._meta.db_table: modelo for modelo in apps.get_models()}
+            for tabla, indices in sorted(recomendados.items()):
+                modelo = modelos.get(tabla)
+                for indice in consolidar(indices):
+                    campos = [self.campo(modelo, columna) for columna in indice]
+                    destino = modelo._meta.label if modelo else tabla
+                    self.stdout.write(f'  {destino}: models.Index(fields={json.dumps(campos)})')
+        if options['verificar'] and pendientes:
+            raise CommandError(f'{pendientes} forma(s) de consulta sin índice que las cubra.')
+        if not pendientes:
+            self.stdout.write(self.style.SUCCESS(f'{len(formas)} formas de consulta revisadas, ninguna sin índice.'))
+
+    def capturar(self, options, alumno, curso, matricula):
+        """Formas de consulta de las vistas: forma -> {'vistas': set, 'sql': primer SQL visto, 'params': ...}"""
+        visitas = [
+            (nombre, visitar) for nombre, visitar in self.visitas(self.cliente(options['usuario']),
+                                                                  alumno, curso, matricula)
+            if not options['solo'] or any(texto in nombre for texto in options['solo'])
+        ]
+        if not visitas:
+            raise CommandError('Ninguna vista coincide con --solo.')
+
+        formas = {}
+        for nombre, visitar in visitas:
+            captura = Captura()
+            # Sin caché para ver también las consultas que los aciertos ocultan
+            cache.clear()
+            with ExitStack() as pila:
+                # También las consultas que las vistas de solo lectura envían a la réplica
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(captura))
+                visitar()
+            for sql, params in captura.consultas:
+                forma = forma_consulta(sql)
+                if forma is None or not forma.filtra_u_ordena():
+                    continue
+                datos = formas.setdefault(forma.clave(), {'forma': forma, 'vistas': set(), 'sql': sql,
+                                                         'params': params})
+                datos['vistas'].add(nombre)
+        return formas
+
+    def campo(self, modelo, columna):
+        if modelo is None:
+            return columna
+        for campo in modelo._meta.concrete_fields:
+            if campo.column == columna:
+                return campo.name
+        return columna
+
+    def cliente(self, username):
+        if username:
+            usuario = User.objects.get(username=username)
+        else:
+            usuario = User.objects.filter(is_staff=True, is_active=True).order_by('id').first()
+        if usuario is None:
+            raise CommandError('Se necesita un usuario staff (créelo o indíquelo con --usuario).')
+        cliente = Client()
+        cliente.force_login(usuario)
+        return cliente
+
+    def visitas(self, cliente, alumno, curso, matricula):
+        def get(nombre, *args, **params):
+            url = reverse(nombre, args=args)
+
+            def visitar():
+                respuesta = cliente.get(url, params)
+                if respuesta.status_code != 200:
+                    raise CommandError(f'{url} respondió {respuesta.status_code}')
+                if respuesta.streaming:
+                    # Las exportaciones leen por lotes mientras se consume la respuesta
+                    for _ in respuesta.streaming_content:
+                        pass
+            return visitar
+
+        def chatbot(mensaje):
+            def enviar():
+                respuesta = cliente.post(reverse('cursos:chatbot_api'), json.dumps({'message': mensaje}),
+                                         content_type='application/json')
+                if respuesta.status_code != 200:
+                    raise CommandError(f'El chatbot respondió {respuesta.status_code}')
+            return enviar
+
+        fecha = alumno.fecha_ingreso.isoformat()
+        return [
+            ('alumnos.lista', get('alumnos:lista_alumnos')),
+            ('alumnos.lista?estado', get('alumnos:lista_alumnos', estado='A')),
+            ('alumnos.lista?estado&genero', get('alumnos:lista_alumnos', estado='A', genero='F')),
+            ('alumnos.lista?orden=fecha_ingreso', get('alumnos:lista_alumnos', orden='fecha_ingreso')),
+            ('alumnos.lista?estado&orden=fecha_ingreso',
+             get('alumnos:lista_alumnos', estado='A', orden='fecha_ingreso')),
+            ('alumnos.lista?fecha_ingreso', get('alumnos:lista_alumnos', fecha_ingreso_desde=fecha)),
+            ('alumnos.detalle', get('alumnos:detalle_alumno', alumno.pk)),
+            ('alumnos.reporte?estado', get('alumnos:reporte_alumnos', estado='A')),
+            ('alumnos.exportar?estado', get('alumnos:exportar_alumnos', estado='A')),
+            ('cursos.lista', get('cursos:lista_cursos')),
+            ('cursos.lista?nivel', get('cursos:lista_cursos', nivel='B')),
+            ('cursos.lista?estado', get('cursos:lista_cursos', estado='A')),
+            ('cursos.lista?nivel&estado', get('cursos:lista_cursos', nivel='B', estado='A')),
+            ('cursos.detalle', get('cursos:detalle_curso', curso.pk)),
+            ('cursos.chatbot', chatbot('¿qué cursos hay disponibles?')),
+            ('cursos.chatbot?nivel', chatbot('¿qué cursos de nivel básico hay disponibles?')),
+            ('matriculas.lista', get('matriculas:lista_matriculas')),
+            ('matriculas.lista?estado', get('matriculas:lista_matriculas', estado='A')),
+            ('matriculas.lista?curso', get('matriculas:lista_matriculas', curso=curso.pk)),
+            ('matriculas.lista?estado&curso', get('matriculas:lista_matriculas', estado='A', curso=curso.pk)),
+            ('matriculas.historial', get('matriculas:historial_matriculas')),
+            ('matriculas.detalle', get('matriculas:detalle_matricula', matricula.pk)),
+            ('matriculas.reporte?curso', get('matriculas:reporte_matriculas', curso=curso.pk)),
+            ('dashboard', get('dashboard')),
+            ('api alumnos?estado', get('alumnos:api_alumnos', estado='A')),
+            ('api matriculas?curso', get('matriculas:api_matriculas', curso=curso.pk)),
+            ('api cambios alumnos', get('alumnos:api_alumnos_cambios', desde='2000-01-01T00:00:00Z')),
+            ('api cambios matriculas', get('matriculas:api_matriculas_cambios', desde='2000-01-01T00:00:00Z')),
+        ]
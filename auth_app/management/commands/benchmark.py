@@ -0,0 +1,224 @@
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from alumnos.forms import AlumnoForm
+from alumnos.models import Alumno
+from cursos.forms import CursoForm
+from cursos.intenciones import clasificar
+from cursos.models import Curso
+from matriculas.forms import MatriculaForm
+from matriculas.models import Matricula
+from sistema_instituto.texto import normalizar_texto
+
+# Margen absoluto para que el ruido en escenarios de pocos milisegundos no cuente como regresión
+MARGEN_MS = 1.0
+
+
+class Escenario:
+    def __init__(self, nombre, funcion):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.tiempos = []
+        self.consultas = []
+
+    def ejecutar(self, medir=True):
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            self.funcion()
+            duracion = (time.perf_counter() - inicio) * 1000
+        if medir:
+            self.tiempos.append(duracion)
+            self.consultas.append(len(capturadas))
+
+    def resumen(self):
+        tiempos = sorted(self.tiempos)
+        return {
+            'p50': round(statistics.median(tiempos), 2),
+            'p95': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 2),
+            'max': round(tiempos[-1], 2),
+            'consultas': max(self.consultas),
+        }
+
+
+class Command(BaseCommand):
+    help = ('Mide latencia (p50/p95/máx) y cantidad de consultas de las vistas, el chatbot, '
+            'los formularios y los métodos de los modelos, y falla si empeoran respecto a la línea base. '
+            'Conviene sembrar datos antes con "manage.py sembrar_datos"')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--calentamiento', type=int, default=2,
+                            help='Ejecuciones previas que no se miden (cachés, conexiones, plantillas)')
+        parser.add_argument('--baseline', default='benchmark_baseline.json',
+                            help='Archivo JSON con los resultados de referencia')
+        parser.add_argument('--guardar', action='store_true',
+                            help='Guarda los resultados como nueva línea base en lugar de comparar')
+        parser.add_argument('--tolerancia', type=float, default=0.25,
+                            help='Aumento relativo del p50 que se acepta antes de marcar regresión')
+        parser.add_argument('--solo', nargs='+', default=[],
+                            help='Ejecuta solo los escenarios cuyo nombre contenga alguno de estos textos')
+        parser.add_argument('--sin-cache', action='store_true',
+                            help='Vacía la caché antes de cada ejecución para medir el caso frío')
+        parser.add_argument('--usuario', help='Usuario staff con el que se visitan las vistas')
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser al menos 1.')
+        alumno = Alumno.objects.order_by('id').first()
+        curso = Curso.objects.order_by('id').first()
+        matricula = Matricula.objects.order_by('id').first()
+        if not (alumno and curso and matricula):
+            raise CommandError('Faltan datos: ejecute primero "manage.py sembrar_datos".')
+
+        escenarios = [
+            e for e in self.escenarios(self.cliente(options['usuario']), alumno, curso, matricula)
+            if not options['solo'] or any(texto in e.nombre for texto in options['solo'])
+        ]
+        if not escenarios:
+            raise CommandError('Ningún escenario coincide con --solo.')
+
+        for escenario in escenarios:
+            for _ in range(options['calentamiento']):
+                escenario.ejecutar(medir=False)
+            for _ in range(options['repeticiones']):
+                if options['sin_cache']:
+                    cache.clear()
+                escenario.ejecutar()
+        resultados = {e.nombre: e.resumen() for e in escenarios}
+
+        ruta = Path(options['baseline'])
+        base = {}
+        if not options['guardar'] and ruta.exists():
+            base = json.loads(ruta.read_text(encoding='utf-8'))['escenarios']
+        regresiones = self.informar(resultados, base, options['tolerancia'])
+
+        if options['guardar']:
+            ruta.write_text(json.dumps({
+                'fecha': date.today().isoformat(),
+                'motor': connection.vendor,
+                'datos': {
+                    'alumnos': Alumno.objects.count(),
+                    'cursos': Curso.objects.count(),
+                    'matriculas': Matricula.objects.count(),
+                },
+                'escenarios': resultados,
+            }, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Línea base guardada en {ruta}'))
+        elif not base:
+            self.stdout.write(self.style.WARNING(f'No hay línea base en {ruta}; use --guardar para crearla.'))
+        elif regresiones:
+            raise CommandError(f'{len(regresiones)} escenario(s) empeoraron: {", ".join(regresiones)}')
+        else:
+            self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la línea base.'))
+
+    def cliente(self, username):
+        if username:
+            usuario = User.objects.get(username=username)
+        else:
+            usuario = User.objects.filter(is_staff=True, is_active=True).order_by('id').first()
+        if usuario is None:
+            raise CommandError('Se necesita un usuario staff (créelo o indíquelo con --usuario).')
+        cliente = Client()
+        cliente.force_login(usuario)
+        return cliente
+
+    def escenarios(self, cliente, alumno, curso, matricula):
+        def get(nombre, *args, **params):
+            url = reverse(nombre, args=args)
+
+            def visitar():
+                respuesta = cliente.get(url, params)
+                if respuesta.status_code != 200:
+                    raise CommandError(f'{url} respondió {respuesta.status_code}')
+            return visitar
+
+        def chatbot(mensaje):
+            def enviar():
+                respuesta = cliente.post(reverse('cursos:chatbot_api'), json.dumps({'message': mensaje}),
+                                         content_type='application/json')
+                if respuesta.status_code != 200:
+                    raise CommandError(f'El chatbot respondió {respuesta.status_code}')
+            return enviar
+
+        def validar(formulario, datos, **kwargs):
+            def ejecutar():
+                formulario(data=datos, **kwargs).is_valid()
+            return ejecutar
+
+        hoy = date.today()
+        datos_alumno = {
+            'dni': '09999999', 'codigo_alumno': 'BENCH-0001', 'nombres': 'Ana', 'apellidos': 'Pérez Núñez',
+            'fecha_nacimiento': '2000-01-15', 'genero': 'F', 'email': 'ana@example.com',
+            'telefono': '999888777', 'direccion': 'Av. Siempre Viva 123', 'fecha_ingreso': hoy.isoformat(),
+            'estado': 'A',
+        }
+        datos_curso = {
+            'nombre': 'Curso de prueba', 'codigo': 'BENCH-C01', 'descripcion': 'Descripción', 'nivel': 'B',
+            'duracion': 40, 'precio': '150.00', 'cupo_maximo': 30, 'fecha_inicio': hoy.isoformat(),
+            'fecha_fin': (hoy + timedelta(days=60)).isoformat(), 'estado': 'A', 'profesor': 'Ana Torres',
+        }
+        datos_matricula = {
+            'alumno': matricula.alumno_id, 'curso': matricula.curso_id, 'estado': matricula.estado,
+            'fecha_inicio': matricula.fecha_inicio.isoformat(),
+            'fecha_fin': (matricula.fecha_inicio + timedelta(days=30)).isoformat(),
+        }
+        apellido = alumno.apellidos.split()[0]
+
+        return [
+            Escenario('vista alumnos.lista', get('alumnos:lista_alumnos')),
+            Escenario('vista alumnos.lista?q', get('alumnos:lista_alumnos', q=apellido)),
+            Escenario('vista alumnos.lista?orden', get('alumnos:lista_alumnos', orden='fecha_ingreso', estado='A')),
+            Escenario('vista alumnos.buscar', get('alumnos:buscar_alumnos', q=apellido)),
+            Escenario('vista alumnos.detalle', get('alumnos:detalle_alumno', alumno.pk)),
+            Escenario('vista alumnos.reporte', get('alumnos:reporte_alumnos')),
+            Escenario('vista cursos.lista', get('cursos:lista_cursos')),
+            Escenario('vista cursos.detalle', get('cursos:detalle_curso', curso.pk)),
+            Escenario('vista matriculas.lista', get('matriculas:lista_matriculas')),
+            Escenario('vista matriculas.lista?q', get('matriculas:lista_matriculas', q=alumno.dni[:5])),
+            Escenario('vista matriculas.detalle', get('matriculas:detalle_matricula', matricula.pk)),
+            Escenario('vista matriculas.historial', get('matriculas:historial_matriculas')),
+            Escenario('vista matriculas.reporte', get('matriculas:reporte_matriculas')),
+            Escenario('vista dashboard', get('dashboard')),
+            Escenario('chatbot cursos', chatbot('¿qué cursos de nivel básico hay disponibles?')),
+            Escenario('chatbot precios', chatbot('precios de los cursos avanzados')),
+            Escenario('chatbot saludo', chatbot('hola')),
+            Escenario('chatbot clasificar', lambda: clasificar('quiero inscribirme en un curso intermedio activo')),
+            Escenario('formulario AlumnoForm', validar(AlumnoForm, datos_alumno)),
+            Escenario('formulario CursoForm', validar(CursoForm, datos_curso)),
+            Escenario('formulario MatriculaForm', validar(MatriculaForm, datos_matricula, instance=matricula)),
+            Escenario('modelo Curso.cupos_disponibles', lambda: [curso.cupos_disponibles() for _ in range(1000)]),
+            Escenario('modelo Alumno.edad', lambda: [alumno.edad() for _ in range(1000)]),
+            Escenario('modelo Alumno.actualizar_busqueda', lambda: [alumno.actualizar_busqueda() for _ in range(1000)]),
+            Escenario('modelo Matricula.duracion_dias', lambda: [matricula.duracion_dias() for _ in range(1000)]),
+            Escenario('texto normalizar_texto', lambda: [normalizar_texto('José Ñúñez Ávila') for _ in range(1000)]),
+        ]
+
+    def informar(self, resultados, base, tolerancia):
+        regresiones = []
+        self.stdout.write(f'{"escenario":36} {"p50 ms":>9} {"p95 ms":>9} {"máx ms":>9} {"consultas":>9}  base p50')
+        for nombre, datos in resultados.items():
+            anterior = base.get(nombre)
+            linea = (f'{nombre:36} {datos["p50"]:9.2f} {datos["p95"]:9.2f} '
+                     f'{datos["max"]:9.2f} {datos["consultas"]:9d}')
+            if anterior is None:
+                self.stdout.write(f'{linea}  -')
+                continue
+            lento = datos['p50'] > anterior['p50'] * (1 + tolerancia) + MARGEN_MS
+            # Una consulta más siempre es regresión: suele ser un N+1 que crece con los datos
+            mas_consultas = datos['consultas'] > anterior['consultas']
+            linea = f'{linea}  {anterior["p50"]:.2f} ({anterior["consultas"]})'
+            if lento or mas_consultas:
+                regresiones.append(nombre)
+                self.stdout.write(self.style.ERROR(f'{linea}  REGRESIÓN'))
+            else:
+                self.stdout.write(linea)
+        return regresiones
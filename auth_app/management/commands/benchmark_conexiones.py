@@ -0,0 +1,134 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+from alumnos.models import Alumno
+from sistema_instituto.bd import MOTORES_CON_POOL, vaciar_pools
+
+MODOS = {
+    # Una conexión nueva por petición (CONN_MAX_AGE = 0, lo que Django hace por defecto)
+    'sin_persistencia': {'CONN_MAX_AGE': 0, 'pool': False},
+    # Una conexión por hilo que se conserva entre peticiones
+    'persistentes': {'CONN_MAX_AGE': 60, 'pool': False},
+    # Conexiones compartidas por todos los hilos del proceso (sistema_instituto.bd)
+    'pool': {'CONN_MAX_AGE': 0, 'pool': True},
+}
+
+
+class Command(BaseCommand):
+    help = ('Compara la latencia de una vista liviana con conexiones nuevas por petición, conexiones '
+            'persistentes y el pool de sistema_instituto.bd, contra la base de datos configurada '
+            '(MySQL/MariaDB o SQLite como sustituto). Cada petición simula el ciclo de un servidor real: '
+            'las conexiones vencidas se cierran al terminar')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=400)
+        parser.add_argument('--hilos', type=int, default=8)
+        parser.add_argument('--calentamiento', type=int, default=20)
+        parser.add_argument('--url', help='Ruta a pedir; por defecto el detalle de un alumno en la API')
+        parser.add_argument('--modos', nargs='+', choices=list(MODOS), default=list(MODOS))
+        parser.add_argument('--usuario', help='Usuario staff con el que se hacen las peticiones')
+
+    def handle(self, *args, **options):
+        if options['peticiones'] < 1 or options['hilos'] < 1:
+            raise CommandError('--peticiones y --hilos deben ser al menos 1.')
+        url = options['url']
+        if not url:
+            alumno = Alumno.objects.order_by('id').first()
+            if alumno is None:
+                raise CommandError('Faltan datos: ejecute primero "manage.py sembrar_datos" o indique --url.')
+            url = reverse('alumnos:api_alumno', args=[alumno.pk])
+        cookies = self.sesion(options['usuario'])
+
+        base = connections.settings['default']
+        original = {clave: base.get(clave) for clave in ('ENGINE', 'CONN_MAX_AGE')}
+        sin_pool = {con: sin for sin, con in MOTORES_CON_POOL.items()}
+        motor = sin_pool.get(original['ENGINE'], original['ENGINE'])
+        if motor not in MOTORES_CON_POOL:
+            raise CommandError(f'El pool no está disponible para {motor}.')
+
+        self.stdout.write(f'{connections["default"].display_name}, {options["hilos"]} hilos, '
+                          f'{options["peticiones"]} peticiones a {url}')
+        self.stdout.write(f'{"modo":18} {"p50 ms":>8} {"p95 ms":>8} {"pet/s":>8} {"conexiones":>11}')
+        try:
+            for nombre in options['modos']:
+                modo = MODOS[nombre]
+                base['ENGINE'] = MOTORES_CON_POOL[motor] if modo['pool'] else motor
+                base['CONN_MAX_AGE'] = modo['CONN_MAX_AGE']
+                # El cliente de pruebas se presenta como 'testserver'
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    resultado = self.medir(url, cookies, options)
+                self.stdout.write(
+                    f'{nombre:18} {resultado["p50"]:8.2f} {resultado["p95"]:8.2f} '
+                    f'{resultado["por_segundo"]:8.0f} {resultado["conexiones"]:11d}'
+                )
+        finally:
+            base.update(original)
+            vaciar_pools()
+
+    def sesion(self, username):
+        if username:
+            usuario = User.objects.get(username=username)
+        else:
+            usuario = User.objects.filter(is_staff=True, is_active=True).order_by('id').first()
+        if usuario is None:
+            raise CommandError('Se necesita un usuario staff (créelo o indíquelo con --usuario).')
+        cliente = Client()
+        cliente.force_login(usuario)
+        connections.close_all()
+        return cliente.cookies
+
+    def medir(self, url, cookies, options):
+        abiertas = []
+        candado = threading.Lock()
+
+        def contar(sender, connection, **kwargs):
+            # La señal también llega al tomar una conexión del pool: se cuentan los objetos distintos
+            # (la lista los mantiene vivos para que id() no se repita)
+            with candado:
+                abiertas.append(connection.connection)
+
+        def trabajar(cantidad):
+            cliente = Client()
+            cliente.cookies = cookies
+            tiempos = []
+            try:
+                for _ in range(cantidad):
+                    close_old_connections()
+                    inicio = time.perf_counter()
+                    respuesta = cliente.get(url)
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                    # request_finished: el servidor cierra aquí las conexiones vencidas
+                    close_old_connections()
+                    if respuesta.status_code != 200:
+                        raise CommandError(f'{url} respondió {respuesta.status_code}')
+            finally:
+                connections.close_all()
+            return tiempos
+
+        hilos = options['hilos']
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            list(pool.map(trabajar, [max(options['calentamiento'] // hilos, 1)] * hilos))
+
+        connection_created.connect(contar, weak=False)
+        try:
+            reparto = [options['peticiones'] // hilos + (i < options['peticiones'] % hilos) for i in range(hilos)]
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=hilos) as pool:
+                tiempos = sorted(t for parte in pool.map(trabajar, reparto) for t in parte)
+            total = time.perf_counter() - inicio
+        finally:
+            connection_created.disconnect(contar)
+        return {
+            'p50': statistics.median(tiempos),
+            'p95': tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+            'por_segundo': len(tiempos) / total,
+            'conexiones': len({id(conexion) for conexion in abiertas}),
+        }
@@ -0,0 +1,55 @@
+import json
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from alumnos.api import ALUMNOS
+from auth_app.models import Eliminacion
+from cursos.api import CURSOS
+from matriculas.api import MATRICULAS
+from sistema_instituto.api import ErrorApi, fin_ventana_cambios, formatear_marca, leer_marca
+
+RECURSOS = {'alumnos': ALUMNOS, 'cursos': CURSOS, 'matriculas': MATRICULAS}
+TAMANO_LOTE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Escribe en JSON Lines los registros creados o modificados y los ids eliminados desde una marca '
+            '(la "marca" del feed de la API o de una ejecución anterior); la última línea trae la nueva marca')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Marca ISO 8601; sin ella se exporta todo')
+        parser.add_argument('--modelos', nargs='+', choices=list(RECURSOS), default=list(RECURSOS))
+        parser.add_argument('--purgar-dias', type=int,
+                            help='Borra antes las eliminaciones registradas hace más de N días')
+
+    def handle(self, *args, **options):
+        if options['purgar_dias'] is not None:
+            limite = timezone.now() - timedelta(days=options['purgar_dias'])
+            borradas, _ = Eliminacion.objects.filter(eliminado_en__lt=limite).delete()
+            self.stderr.write(f'{borradas} eliminaciones purgadas.')
+
+        try:
+            desde = leer_marca(options['desde'], 'desde')
+        except ErrorApi as error:
+            raise CommandError(str(error))
+        hasta = max(filter(None, [desde, fin_ventana_cambios()]))
+
+        for modelo in options['modelos']:
+            recurso = RECURSOS[modelo]
+            campos = list(recurso.campos)
+            despues = None
+            while True:
+                lote = recurso.leer_cambios(campos, desde, hasta, despues, TAMANO_LOTE)
+                for fila in lote:
+                    self._linea({'modelo': modelo, 'tipo': 'cambio', 'datos': dict(zip(campos, fila[2:]))})
+                if len(lote) < TAMANO_LOTE:
+                    break
+                despues = lote[-1][:2]
+            for objeto_id in recurso.eliminados(desde, hasta).iterator():
+                self._linea({'modelo': modelo, 'tipo': 'eliminado', 'id': objeto_id})
+
+        self._linea({'marca': formatear_marca(hasta)})
+
+    def _linea(self, registro):
+        self.stdout.write(json.dumps(registro, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from auth_app.estadisticas import reconstruir
+
+
+class Command(BaseCommand):
+    help = ('Recalcula los contadores del dashboard y del perfil (globales y por usuario) '
+            'desde las tablas de cursos, alumnos y matrículas')
+
+    def handle(self, *args, **options):
+        filas = reconstruir()
+        self.stdout.write(self.style.SUCCESS(f'{filas} fila(s) de estadísticas reconstruida(s).'))
@@ -0,0 +1,180 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from alumnos.models import Alumno, PalabraAlumno
+from auth_app.estadisticas import reconstruir
+from cursos.catalogo import invalidar_catalogo
+from cursos.models import Curso, PalabraCurso
+from matriculas.models import Matricula
+from matriculas.reportes import invalidar_reporte
+
+# Todo lo sembrado lleva este prefijo en códigos y usuarios para poder limpiarlo
+PREFIJO = 'SEM'
+TAMANO_LOTE = 2000
+
+NOMBRES = ['José', 'María', 'Lucía', 'Andrés', 'Sofía', 'Martín', 'Valeria', 'Ángel',
+           'Camila', 'Diego', 'Renata', 'Mateo', 'Ximena', 'Joaquín', 'Belén', 'Tomás']
+APELLIDOS = ['Pérez', 'Quispe', 'Núñez', 'Rodríguez', 'Mamani', 'Gómez', 'Ramírez', 'Peña',
+             'Flores', 'Huamán', 'Chávez', 'Torres', 'Vásquez', 'Castillo', 'Ibáñez', 'Rojas']
+TEMAS = ['Programación', 'Diseño Web', 'Bases de Datos', 'Redes', 'Contabilidad', 'Inglés',
+         'Marketing Digital', 'Ofimática', 'Electricidad', 'Gastronomía', 'Fotografía', 'Robótica']
+PROFESORES = ['Ana Torres', 'Luis Rojas', 'Carla Núñez', 'Jorge Peña', 'Elena Ruiz', 'Raúl Díaz']
+
+
+class Command(BaseCommand):
+    help = ('Genera usuarios, cursos, alumnos y matrículas sintéticos y reproducibles '
+            '(misma --semilla, mismos datos) para medir el rendimiento')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=10)
+        parser.add_argument('--cursos', type=int, default=200)
+        parser.add_argument('--alumnos', type=int, default=20_000)
+        parser.add_argument('--matriculas', type=int, default=50_000)
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--limpiar', action='store_true',
+                            help='Elimina los datos sembrados antes (o en lugar) de generar nuevos')
+        parser.add_argument('--solo-limpiar', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['limpiar'] or options['solo_limpiar']:
+            self.limpiar()
+            if options['solo_limpiar']:
+                return
+        elif User.objects.filter(username__startswith=f'{PREFIJO.lower()}_').exists():
+            raise CommandError('Ya hay datos sembrados; use --limpiar para regenerarlos.')
+
+        azar = random.Random(options['semilla'])
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            usuarios = self.crear_usuarios(options['usuarios'])
+            cursos = self.crear_cursos(azar, options['cursos'], usuarios)
+            alumnos = self.crear_alumnos(azar, options['alumnos'], usuarios)
+            matriculas = self.crear_matriculas(azar, options['matriculas'], alumnos, cursos, usuarios)
+            reconstruir()
+            transaction.on_commit(invalidar_reporte)
+            transaction.on_commit(invalidar_catalogo)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(usuarios)} usuarios, {len(cursos)} cursos, {len(alumnos)} alumnos y '
+            f'{matriculas} matrículas en {time.perf_counter() - inicio:.1f}s'
+        ))
+
+    def limpiar(self):
+        # Las matrículas caen en cascada con sus alumnos y cursos
+        with transaction.atomic():
+            Alumno.objects.filter(codigo_alumno__startswith=f'{PREFIJO}-').delete()
+            Curso.objects.filter(codigo__startswith=f'{PREFIJO}-').delete()
+            User.objects.filter(username__startswith=f'{PREFIJO.lower()}_').delete()
+            reconstruir()
+            transaction.on_commit(invalidar_reporte)
+            transaction.on_commit(invalidar_catalogo)
+        self.stdout.write('Datos sembrados eliminados.')
+
+    def crear_usuarios(self, cantidad):
+        usuarios = [
+            User(username=f'{PREFIJO.lower()}_usuario_{i:03d}', password='!', email=f'usuario{i}@example.com')
+            for i in range(max(cantidad, 1))
+        ]
+        return self.insertar(User, usuarios, 'username', f'{PREFIJO.lower()}_')
+
+    def crear_cursos(self, azar, cantidad, usuarios):
+        hoy = date.today()
+        cursos = []
+        for i in range(cantidad):
+            inicio = hoy + timedelta(days=azar.randint(-180, 180))
+            cursos.append(Curso(
+                codigo=f'{PREFIJO}-C{i:05d}',
+                nombre=f'{azar.choice(TEMAS)} {i}',
+                descripcion=f'Curso sintético número {i} para pruebas de rendimiento.',
+                nivel=azar.choice('BIA'),
+                duracion=azar.choice([20, 40, 60, 120]),
+                precio=Decimal(azar.randint(50, 900)),
+                cupo_maximo=azar.randint(15, 60),
+                fecha_inicio=inicio,
+                fecha_fin=inicio + timedelta(days=azar.randint(30, 180)),
+                estado=azar.choices('AIC', weights=[70, 15, 15])[0],
+                profesor=azar.choice(PROFESORES),
+                creado_por=azar.choice(usuarios),
+            ))
+        cursos = self.insertar(Curso, cursos, 'codigo', f'{PREFIJO}-')
+        PalabraCurso.sincronizar(cursos)
+        return cursos
+
+    def crear_alumnos(self, azar, cantidad, usuarios):
+        hoy = date.today()
+        alumnos = []
+        for i in range(cantidad):
+            alumno = Alumno(
+                dni=f'7{i:07d}',
+                codigo_alumno=f'{PREFIJO}-A{i:07d}',
+                nombres=azar.choice(NOMBRES),
+                apellidos=f'{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}',
+                fecha_nacimiento=hoy - timedelta(days=azar.randint(15 * 365, 60 * 365)),
+                genero=azar.choice('MFO'),
+                email=f'alumno{i}@example.com',
+                telefono=f'9{azar.randint(0, 99_999_999):08d}',
+                direccion='Dirección de prueba',
+                fecha_ingreso=hoy - timedelta(days=azar.randint(0, 5 * 365)),
+                estado=azar.choices('AIER', weights=[75, 10, 10, 5])[0],
+                creado_por=azar.choice(usuarios),
+            )
+            alumno.actualizar_busqueda()
+            alumnos.append(alumno)
+        alumnos = self.insertar(Alumno, alumnos, 'codigo_alumno', f'{PREFIJO}-')
+        # bulk_create no pasa por Alumno.save(): las palabras de búsqueda se escriben aquí
+        PalabraAlumno.sincronizar(alumnos)
+        return alumnos
+
+    def crear_matriculas(self, azar, cantidad, alumnos, cursos, usuarios):
+        if not alumnos or not cursos:
+            return 0
+        cantidad = min(cantidad, len(alumnos) * len(cursos))
+        pares = set()
+        ocupados = dict.fromkeys((curso.pk for curso in cursos), 0)
+        lote = []
+        creadas = 0
+        while creadas + len(lote) < cantidad:
+            alumno, curso = azar.choice(alumnos), azar.choice(cursos)
+            if (alumno.pk, curso.pk) in pares:
+                continue
+            pares.add((alumno.pk, curso.pk))
+
+            # Solo ocupan cupo mientras el curso tenga lugar; el resto queda retirado o cancelado
+            if ocupados[curso.pk] < curso.cupo_maximo:
+                estado = azar.choices('PAC', weights=[20, 50, 30])[0]
+                ocupados[curso.pk] += 1
+            else:
+                estado = azar.choice('RX')
+            matricula = Matricula(
+                alumno=alumno, curso=curso, estado=estado,
+                fecha_inicio=curso.fecha_inicio, fecha_fin=curso.fecha_fin,
+                calificacion=Decimal(azar.randint(0, 200)) / 10 if estado == 'C' else None,
+                creado_por=azar.choice(usuarios),
+            )
+            matricula.actualizar_busqueda()
+            lote.append(matricula)
+            if len(lote) == TAMANO_LOTE:
+                Matricula.objects.bulk_create(lote)
+                creadas += len(lote)
+                lote = []
+        Matricula.objects.bulk_create(lote)
+        creadas += len(lote)
+
+        # bulk_create no pasa por Matricula.save(): los contadores de cupo se fijan aquí
+        for curso in cursos:
+            curso.inscritos = ocupados[curso.pk]
+        Curso.objects.bulk_update(cursos, ['inscritos'], batch_size=TAMANO_LOTE)
+        return creadas
+
+    def insertar(self, modelo, objetos, campo, prefijo):
+        for inicio in range(0, len(objetos), TAMANO_LOTE):
+            modelo.objects.bulk_create(objetos[inicio:inicio + TAMANO_LOTE])
+            self.stdout.write(f'  {modelo._meta.verbose_name_plural}: {min(inicio + TAMANO_LOTE, len(objetos))}/{len(objetos)}')
+        if objetos and objetos[0].pk is None:
+            # Motores sin RETURNING (MySQL): se releen para conocer los ids
+            return list(modelo.objects.filter(**{f'{campo}__startswith': prefijo}).order_by(campo))
+        return objetos
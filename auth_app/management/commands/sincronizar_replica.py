@@ -0,0 +1,40 @@
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from sistema_instituto.replicas import alias_replica
+
+
+class Command(BaseCommand):
+    help = ('Copia la base SQLite principal sobre la réplica (DB_REPLICA_NAME), para probar en local las lecturas '
+            'en réplica. Con --cada repite la copia cada N segundos y simula así el retraso de una réplica real. '
+            'Con MySQL la réplica se mantiene con la replicación del servidor, no con este comando')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cada', type=float, help='Segundos entre copias; sin él se copia una vez')
+
+    def handle(self, *args, **options):
+        alias = alias_replica()
+        if alias is None:
+            raise CommandError('No hay réplica configurada (defina DB_REPLICA_NAME).')
+        principal, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if principal.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('Solo se sincronizan réplicas SQLite.')
+        if principal.settings_dict['NAME'] == replica.settings_dict['NAME']:
+            raise CommandError('La réplica y la base principal son el mismo archivo.')
+
+        while True:
+            inicio = time.perf_counter()
+            replica.close()
+            principal.ensure_connection()
+            destino = sqlite3.connect(replica.settings_dict['NAME'])
+            try:
+                # La API de backup copia una instantánea consistente aunque haya escrituras en curso
+                principal.connection.backup(destino)
+            finally:
+                destino.close()
+            principal.close()
+            self.stdout.write(f'Réplica sincronizada en {(time.perf_counter() - inicio) * 1000:.0f} ms.')
+            if not options['cada']:
+                return
+            time.sleep(options['cada'])
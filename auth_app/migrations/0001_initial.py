@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 11:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def calcular_estadisticas(apps, schema_editor):
+    Estadistica = apps.get_model('auth_app', 'Estadistica')
+    campos = {'cursos': ('cursos', 'Curso'), 'alumnos': ('alumnos', 'Alumno'), 'matriculas': ('matriculas', 'Matricula')}
+    totales = {None: dict.fromkeys(campos, 0)}
+    for campo, (app, modelo) in campos.items():
+        filas = apps.get_model(app, modelo).objects.order_by().values_list('creado_por').annotate(total=Count('id'))
+        for usuario_id, total in filas:
+            totales.setdefault(usuario_id, dict.fromkeys(campos, 0))[campo] = total
+            totales[None][campo] += total
+    Estadistica.objects.bulk_create(
+        Estadistica(usuario_id=usuario_id, **valores) for usuario_id, valores in totales.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('alumnos', '0002_alumno_busqueda'),
+        ('cursos', '0002_curso_inscritos'),
+        ('matriculas', '0002_matricula_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Estadistica',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cursos', models.IntegerField(default=0, verbose_name='Cursos')),
+                ('alumnos', models.IntegerField(default=0, verbose_name='Alumnos')),
+                ('matriculas', models.IntegerField(default=0, verbose_name='Matrículas')),
+                ('usuario', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='estadistica', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Estadística',
+                'verbose_name_plural': 'Estadísticas',
+            },
+        ),
+        migrations.RunPython(calcular_estadisticas, migrations.RunPython.noop),
+    ]
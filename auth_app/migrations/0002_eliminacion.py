@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 11:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Eliminacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=50, verbose_name='Modelo')),
+                ('objeto_id', models.BigIntegerField(verbose_name='ID del Objeto')),
+                ('eliminado_en', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Eliminado en')),
+            ],
+            options={
+                'verbose_name': 'Eliminación',
+                'verbose_name_plural': 'Eliminaciones',
+                'indexes': [models.Index(fields=['modelo', 'eliminado_en'], name='auth_app_el_modelo_18c30e_idx'), models.Index(fields=['eliminado_en'], name='auth_app_el_elimina_5e40fd_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,41 @@
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
 
-# Create your models here.
+class Estadistica(models.Model):
+    """
+    Totales de cursos, alumnos y matrículas: una fila global (usuario vacío)
+    y una por usuario con lo que ese usuario registró.
+    """
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True, related_name='estadistica', verbose_name="Usuario")
+    cursos = models.IntegerField(default=0, verbose_name="Cursos")
+    alumnos = models.IntegerField(default=0, verbose_name="Alumnos")
+    matriculas = models.IntegerField(default=0, verbose_name="Matrículas")
+
+    class Meta:
+        verbose_name = "Estadística"
+        verbose_name_plural = "Estadísticas"
+
+    def __str__(self):
+        return f"Estadísticas de {self.usuario or 'todo el sistema'}"
+
+
+class Eliminacion(models.Model):
+    """
+    Registro (tombstone) de un curso, alumno o matrícula eliminado, para que
+    el feed de cambios pueda informar las bajas a los sistemas que sincronizan.
+    """
+    modelo = models.CharField(max_length=50, verbose_name="Modelo")  # _meta.label_lower
+    objeto_id = models.BigIntegerField(verbose_name="ID del Objeto")
+    eliminado_en = models.DateTimeField(default=timezone.now, verbose_name="Eliminado en")
+
+    class Meta:
+        verbose_name = "Eliminación"
+        verbose_name_plural = "Eliminaciones"
+        indexes = [
+            models.Index(fields=['modelo', 'eliminado_en']),
+            models.Index(fields=['eliminado_en']),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} ({self.eliminado_en:%Y-%m-%d %H:%M})"
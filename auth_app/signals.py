@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from alumnos.models import Alumno
+from cursos.models import Curso
+from matriculas.models import Matricula
+from sistema_instituto.bajas import borrado, seguir
+from .estadisticas import restar_eliminados, sumar
+from .models import Eliminacion
+
+MODELOS = (Curso, Alumno, Matricula)
+seguir(*MODELOS)
+
+@receiver(post_save, sender=Curso)
+@receiver(post_save, sender=Alumno)
+@receiver(post_save, sender=Matricula)
+def contar_alta(sender, instance, created, raw=False, **kwargs):
+    """Suma el registro nuevo a los contadores global y de su creador"""
+    if created and not raw:
+        sumar(sender, instance.creado_por_id)
+
+@receiver(borrado)
+def registrar_bajas(sender, eliminados, **kwargs):
+    """
+    Resta los registros eliminados de los contadores y deja los tombstones que
+    el feed de cambios informa como bajas (vistas eliminar_*, admin y cascadas)
+    """
+    objetos = [objeto for modelo, objetos in eliminados.items() if modelo in MODELOS for objeto in objetos]
+    restar_eliminados(objetos)
+    Eliminacion.objects.bulk_create(
+        Eliminacion(modelo=type(objeto)._meta.label_lower, objeto_id=objeto.pk) for objeto in objetos
+    )
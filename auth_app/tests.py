@@ -1,3 +1,166 @@
-from django.test import TestCase
+import tempfile
+from datetime import date
+from pathlib import Path
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from cursos.forms import CursoForm
+from cursos.models import Curso
+from matriculas.models import Matricula
+from sistema_instituto import metricas
+from sistema_instituto.auditoria import explicar, forma_consulta
+from sistema_instituto.replicas import COOKIE
 
-# Create your tests here.
+
+class AuditoriaConsultasTests(TestCase):
+    def auditar(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        forma = forma_consulta(sql)
+        plan, problemas = explicar(sql, params, forma.tabla, filtrada=bool(forma.igualdad or forma.rango))
+        return forma, problemas
+
+    def test_detecta_recorrido_completo(self):
+        # observaciones no tiene índice
+        forma, problemas = self.auditar(Matricula.objects.filter(observaciones='x').order_by())
+        self.assertIn('recorrido completo', problemas)
+        self.assertEqual(forma.indice_recomendado(), ['observaciones'])
+
+    def test_consulta_con_indice(self):
+        forma, problemas = self.auditar(Matricula.objects.filter(estado='A').order_by('-fecha_matricula'))
+        self.assertEqual(problemas, [])
+        self.assertEqual(forma.indice_recomendado(), ['estado', 'fecha_matricula'])
+
+
+@override_settings(MIDDLEWARE=['sistema_instituto.metricas.MetricasMiddleware'] + settings.MIDDLEWARE)
+class MetricasTests(TestCase):
+    def setUp(self):
+        metricas.reiniciar()
+        self.client.force_login(User.objects.create_user('admin', password='clave', is_staff=True))
+
+    def test_cuenta_las_consultas_del_cuerpo_en_streaming(self):
+        respuesta = self.client.get(reverse('matriculas:exportar_matriculas'), {'formato': 'csv'})
+        self.assertTrue(respuesta.streaming)
+        # Hasta que se cierra la respuesta la petición sigue abierta
+        self.assertEqual(metricas.resumen()['vistas'], {})
+        with CaptureQueriesContext(connection) as consultas:
+            b''.join(respuesta.streaming_content)
+        self.assertGreater(len(consultas), 0)
+        datos = metricas.resumen()['vistas']['matriculas:exportar_matriculas']
+        self.assertEqual(datos['solicitudes'], 1)
+        self.assertGreater(datos['consultas']['max'], len(consultas))
+
+    def test_atiende_vistas_asincronas_sin_hilo(self):
+        async def vista(request):
+            return HttpResponse()
+
+        middleware = metricas.MetricasMiddleware(vista)
+        self.assertTrue(iscoroutinefunction(middleware))
+        respuesta = async_to_sync(middleware)(RequestFactory().get('/'))
+        self.assertEqual(metricas.resumen()['vistas'], {})
+        respuesta.close()
+        self.assertEqual(metricas.resumen()['vistas']['(sin vista)']['solicitudes'], 1)
+
+
+ALIAS_PRUEBAS = 'replica_pruebas'
+MIDDLEWARE_REPLICA = 'sistema_instituto.replicas.ReplicaMiddleware'
+
+
+@override_settings(
+    REPLICA_ALIAS=ALIAS_PRUEBAS,
+    DATABASE_ROUTERS=['sistema_instituto.replicas.RouterReplica'],
+    MIDDLEWARE=[m for m in settings.MIDDLEWARE if m != MIDDLEWARE_REPLICA] + [MIDDLEWARE_REPLICA],
+)
+class ReplicaTests(TransactionTestCase):
+    """
+    La réplica es un segundo archivo SQLite que solo recibe los datos al
+    llamar a sincronizar(), así que lo escrito después queda "con retraso".
+    TransactionTestCase: dentro de una transacción todo se lee de la principal.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.carpeta = tempfile.TemporaryDirectory()
+        connections.settings[ALIAS_PRUEBAS] = {
+            **connections.settings['default'],
+            'NAME': str(Path(cls.carpeta.name) / 'replica.sqlite3'),
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[ALIAS_PRUEBAS].close()
+        del connections[ALIAS_PRUEBAS]
+        del connections.settings[ALIAS_PRUEBAS]
+        cls.carpeta.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('admin', password='clave', is_staff=True)
+        self.curso = self.crear_curso('CUR1', 'Curso replicado')
+        self.sincronizar()
+        self.client.force_login(self.usuario)
+
+    def crear_curso(self, codigo, nombre):
+        return Curso.objects.create(
+            nombre=nombre, codigo=codigo, descripcion='Descripción', nivel='B', duracion=40, precio=100,
+            cupo_maximo=10, fecha_inicio=date(2025, 3, 1), fecha_fin=date(2025, 7, 1), estado='A',
+            profesor='Profesor', creado_por=self.usuario,
+        )
+
+    def sincronizar(self):
+        # Lo mismo que "manage.py sincronizar_replica"
+        principal, replica = connections['default'], connections[ALIAS_PRUEBAS]
+        principal.ensure_connection()
+        if replica.connection is None:
+            # connect() y no ensure_connection(): el ejecutor de pruebas solo deja
+            # abrir las bases que conocía al empezar
+            replica.connect()
+        principal.connection.backup(replica.connection)
+
+    def lista_cursos(self):
+        respuesta = self.client.get(reverse('cursos:lista_cursos'))
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta
+
+    def test_vista_de_lectura_usa_la_replica(self):
+        nuevo = self.crear_curso('CUR2', 'Curso sin replicar')
+        respuesta = self.lista_cursos()
+        pagina = list(respuesta.context['cursos'])
+        self.assertEqual([curso.pk for curso in pagina], [self.curso.pk])
+        self.assertEqual(pagina[0]._state.db, ALIAS_PRUEBAS)
+        self.assertNotIn(COOKIE, respuesta.cookies)
+        # Fuera de las vistas marcadas se lee de la principal
+        self.assertTrue(Curso.objects.filter(pk=nuevo.pk).exists())
+
+    def test_cache_se_llena_desde_la_principal(self):
+        Curso.objects.filter(pk=self.curso.pk).update(nombre='Curso renombrado')
+        respuesta = self.lista_cursos()
+        self.assertContains(respuesta, 'Curso renombrado')
+        self.assertNotContains(respuesta, 'Curso replicado')
+
+    def test_cookie_lee_de_la_principal(self):
+        nuevo = self.crear_curso('CUR2', 'Curso sin replicar')
+        self.client.cookies[COOKIE] = '1'
+        pagina = list(self.lista_cursos().context['cursos'])
+        self.assertEqual({curso.pk for curso in pagina}, {self.curso.pk, nuevo.pk})
+        self.assertEqual({curso._state.db for curso in pagina}, {'default'})
+
+    def test_lee_lo_que_escribio(self):
+        datos = {**CursoForm(instance=self.curso).initial, 'nombre': 'Curso editado', 'codigo': 'CUR9'}
+        respuesta = self.client.post(reverse('cursos:editar_curso', args=[self.curso.pk]), datos)
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(respuesta.cookies[COOKIE]['max-age'], 10)
+        # El cliente de pruebas reenvía la cookie, como el navegador tras la redirección
+        pagina = list(self.lista_cursos().context['cursos'])
+        self.assertEqual(pagina[0]._state.db, 'default')
+        # Los demás clientes siguen en la réplica
+        self.client.cookies.pop(COOKIE)
+        pagina = list(self.lista_cursos().context['cursos'])
+        self.assertEqual(pagina[0]._state.db, ALIAS_PRUEBAS)
@@ -4,9 +4,8 @@ from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import update_session_auth_hash
-from cursos.models import Curso
-from alumnos.models import Alumno
-from matriculas.models import Matricula
+from .estadisticas import contadores
+from sistema_instituto.replicas import lectura_en_replica
 
 def home(request):
     return render(request, 'home.html')
@@ -61,31 +60,16 @@ def register(request):
     return render(request, 'registration/register.html', {'form': form})
 
 @login_required
+@lectura_en_replica
 def dashboard(request):
-    # Obtener estadísticas para el dashboard
-    total_cursos = Curso.objects.count()
-    total_alumnos = Alumno.objects.count()
-    total_matriculas = Matricula.objects.count()
-    
-    context = {
-        'total_cursos': total_cursos,
-        'total_alumnos': total_alumnos,
-        'total_matriculas': total_matriculas,
-    }
+    # Estadísticas para el dashboard (una fila precalculada)
+    context = contadores()
     return render(request, 'dashboard.html', context)
 
 @login_required
 def profile(request):
-    # Obtener estadísticas del usuario
-    total_cursos = Curso.objects.filter(creado_por=request.user).count()
-    total_alumnos = Alumno.objects.filter(creado_por=request.user).count()
-    total_matriculas = Matricula.objects.filter(creado_por=request.user).count()
-    
-    context = {
-        'total_cursos': total_cursos,
-        'total_alumnos': total_alumnos,
-        'total_matriculas': total_matriculas,
-    }
+    # Estadísticas del usuario (una fila precalculada)
+    context = contadores(request.user)
     return render(request, 'auth_app/profile.html', context)
 
 @login_required
@@ -0,0 +1,40 @@
+from sistema_instituto.api import Recurso, vista_api
+from .models import Curso
+
+CURSOS = Recurso(
+    Curso,
+    campos={
+        'id': 'id',
+        'codigo': 'codigo',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'nivel': 'nivel',
+        'duracion': 'duracion',
+        'precio': 'precio',
+        'cupo_maximo': 'cupo_maximo',
+        'inscritos': 'inscritos',
+        'fecha_inicio': 'fecha_inicio',
+        'fecha_fin': 'fecha_fin',
+        'estado': 'estado',
+        'profesor': 'profesor',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    },
+    por_defecto=['id', 'codigo', 'nombre', 'nivel', 'estado', 'cupo_maximo', 'inscritos', 'updated_at'],
+    filtros={'nivel': 'nivel', 'estado': 'estado'},
+)
+
+
+@vista_api
+def lista(request):
+    return CURSOS.listar(request)
+
+
+@vista_api
+def detalle(request, curso_id):
+    return CURSOS.detalle(request, curso_id)
+
+
+@vista_api
+def cambios(request):
+    return CURSOS.cambios(request)
@@ -0,0 +1,170 @@
+"""
+Caché del catálogo de cursos: objetos Curso, filas ya renderizadas de la
+lista de cursos y respuestas del chatbot.
+
+Todo se guarda bajo una versión del catálogo que se incrementa con cualquier
+escritura de cursos o matrículas (formularios, admin, importaciones), así
+que nada se borra uno por uno. Funciona con cualquier backend de caché de
+Django; sin CACHES configurado se usa la memoria local de cada proceso,
+que no ve las invalidaciones de los demás workers: por eso con locmem las
+entradas duran poco (CATALOGO_DURACION_CACHE).
+Lo que falta en la caché se lee de la base principal aunque la vista lea de
+la réplica (ver sistema_instituto.replicas).
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from sistema_instituto.replicas import en_principal
+from .models import Curso
+
+CLAVE_VERSION = 'catalogo_cursos:version'
+DURACION_CACHE = 3600
+
+# Respuestas en cálculo por (event loop, clave), para que mensajes simultáneos
+# con la misma intención esperen una única consulta en lugar de repetirla
+_PENDIENTES = {}
+
+# Aciertos y fallos por tipo de entrada, en este proceso
+_CONTADORES = Counter()
+_CANDADO_CONTADORES = threading.Lock()
+
+
+def invalidar_catalogo():
+    """Descarta todas las respuestas cacheadas incrementando la versión"""
+    # Si la versión se perdió (expulsada de la caché) se siembra con la hora en
+    # nanosegundos y no con 1: un contador que volviera a empezar repetiría
+    # versiones ya usadas y daría por válidas respuestas y filas obsoletas
+    cache.add(CLAVE_VERSION, time.time_ns(), None)
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, time.time_ns(), None)
+
+
+def duracion_cache():
+    return getattr(settings, 'CATALOGO_DURACION_CACHE', DURACION_CACHE)
+
+
+def version_catalogo():
+    return cache.get_or_set(CLAVE_VERSION, time.time_ns, None)
+
+
+def obtener_curso(curso_id):
+    """Curso (con su creador) desde la caché; None si no existe"""
+    clave = f'catalogo_cursos:{version_catalogo()}:curso:{curso_id}'
+    curso = cache.get(clave)
+    _contar('curso', aciertos=int(curso is not None), fallos=int(curso is None))
+    if curso is None:
+        with en_principal():
+            curso = Curso.objects.select_related('creado_por').filter(pk=curso_id).first()
+        if curso is not None:
+            cache.set(clave, curso, duracion_cache())
+    return curso
+
+
+def filas_cursos(cursos):
+    """
+    HTML de la fila de cada curso en la lista. cursos puede traer solo id:
+    los cursos completos se consultan únicamente para las filas que faltan.
+    """
+    version = version_catalogo()
+    claves = {curso.pk: f'catalogo_cursos:{version}:fila:{curso.pk}' for curso in cursos}
+    filas = cache.get_many(claves.values())
+    faltantes = [pk for pk, clave in claves.items() if clave not in filas]
+    _contar('fila', aciertos=len(claves) - len(faltantes), fallos=len(faltantes))
+
+    if faltantes:
+        with en_principal():
+            nuevas = {
+                claves[curso.pk]: render_to_string('cursos/fila_curso.html', {'curso': curso})
+                for curso in Curso.objects.filter(pk__in=faltantes)
+            }
+        cache.set_many(nuevas, duracion_cache())
+        filas.update(nuevas)
+    return [mark_safe(filas[claves[curso.pk]]) for curso in cursos if claves[curso.pk] in filas]
+
+
+def contadores_cache():
+    """Aciertos, fallos y tasa de aciertos por tipo de entrada, en este proceso"""
+    with _CANDADO_CONTADORES:
+        copia = dict(_CONTADORES)
+    resultado = {}
+    for tipo in ('curso', 'fila', 'chatbot'):
+        aciertos, fallos = copia.get((tipo, 'aciertos'), 0), copia.get((tipo, 'fallos'), 0)
+        total = aciertos + fallos
+        resultado[tipo] = {
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': round(aciertos / total, 4) if total else None,
+        }
+    return resultado
+
+
+def _contar(tipo, aciertos=0, fallos=0):
+    with _CANDADO_CONTADORES:
+        _CONTADORES[(tipo, 'aciertos')] += aciertos
+        _CONTADORES[(tipo, 'fallos')] += fallos
+
+
+def respuesta_cacheada(intencion, generar):
+    """Devuelve la respuesta para la intención, llamando a generar(intencion) solo si no está cacheada"""
+    clave = _clave(intencion, version_catalogo())
+    respuesta = cache.get(clave)
+    _contar('chatbot', aciertos=int(respuesta is not None), fallos=int(respuesta is None))
+    if respuesta is None:
+        with en_principal():
+            respuesta = generar(intencion)
+        cache.set(clave, respuesta, duracion_cache())
+    return respuesta
+
+
+async def aobtener_respuesta(intencion):
+    """Devuelve (clave, respuesta cacheada o None) para la intención"""
+    clave = _clave(intencion, await cache.aget_or_set(CLAVE_VERSION, time.time_ns, None))
+    respuesta = await cache.aget(clave)
+    _contar('chatbot', aciertos=int(respuesta is not None), fallos=int(respuesta is None))
+    return clave, respuesta
+
+
+async def aguardar_respuesta(clave, respuesta):
+    """Guarda una respuesta armada fuera de arespuesta_cacheada() (por ejemplo, transmitida)"""
+    await cache.aset(clave, respuesta, duracion_cache())
+
+
+async def arespuesta_cacheada(intencion, agenerar):
+    """Versión asíncrona de respuesta_cacheada(); agenerar es una corrutina"""
+    clave, respuesta = await aobtener_respuesta(intencion)
+    if respuesta is not None:
+        return respuesta
+
+    pendiente = (asyncio.get_running_loop(), clave)
+    tarea = _PENDIENTES.get(pendiente)
+    if tarea is None:
+        tarea = asyncio.ensure_future(_agenerar_y_guardar(clave, intencion, agenerar))
+        _PENDIENTES[pendiente] = tarea
+        tarea.add_done_callback(lambda _: _PENDIENTES.pop(pendiente, None))
+    # shield: si un cliente se desconecta, la consulta sigue para los demás
+    return await asyncio.shield(tarea)
+
+
+async def _agenerar_y_guardar(clave, intencion, agenerar):
+    with en_principal():
+        respuesta = await agenerar(intencion)
+    await aguardar_respuesta(clave, respuesta)
+    return respuesta
+
+
+def _clave(intencion, version):
+    filtros = intencion['filtros']
+    return 'chatbot:{}:{}:{}:{}:{}'.format(
+        version,
+        intencion['accion'] or '',
+        filtros.get('nivel', ''),
+        filtros.get('estado', ''),
+        ','.join(intencion['detalles']),
+    )
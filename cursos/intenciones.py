@@ -0,0 +1,108 @@
+"""
+Clasificador de intenciones del chatbot de cursos.
+
+El vocabulario se indexa una sola vez al importar el módulo: cada palabra o
+frase (ya sin tildes) apunta a la categoría y el valor que representa, y
+clasificar un mensaje es recorrer sus palabras consultando ese diccionario.
+"""
+import re
+from sistema_instituto.texto import normalizar_texto
+
+# Por categoría, los valores en orden de prioridad con sus palabras o frases
+VOCABULARIO = {
+    'cortesia': [
+        ('saludo', ['hola', 'buenos dias', 'buenas tardes', 'buenas noches',
+                    'saludos', 'hey', 'hi', 'hello']),
+        ('agradecimiento', ['gracias', 'agradezco', 'thank you', 'thanks']),
+    ],
+    'tema': [
+        ('cursos', ['curso', 'cursos', 'materia', 'materias', 'asignatura', 'asignaturas',
+                    'clase', 'clases', 'talleres', 'formacion', 'educacion']),
+    ],
+    'accion': [
+        ('listar', ['listar', 'ver', 'mostrar', 'consultar', 'buscar']),
+        ('disponibilidad', ['disponible', 'disponibles', 'habra', 'hay', 'quedan']),
+    ],
+    'nivel': [
+        ('B', ['basico', 'basicos', 'inicial', 'principiante']),
+        ('I', ['intermedio', 'intermedios', 'medio']),
+        ('A', ['avanzado', 'avanzados', 'experto']),
+    ],
+    'estado': [
+        ('A', ['activo', 'activos', 'disponible', 'disponibles', 'abierto', 'abiertos']),
+        ('C', ['completado', 'completados', 'terminado', 'terminados', 'finalizado', 'finalizados']),
+        ('I', ['inactivo', 'inactivos', 'cerrado', 'cerrados']),
+    ],
+    'detalles': [
+        ('precio', ['precio', 'costo', 'valor', 'tarifa']),
+        ('profesor', ['profesor', 'docente', 'instructor', 'maestro']),
+        ('duración', ['duracion', 'horas', 'tiempo', 'semana', 'semanas', 'meses']),
+        ('fecha', ['fecha', 'inicio', 'comienzo', 'empezar']),
+        ('descripción', ['descripcion', 'que es', 'en que consiste']),
+    ],
+}
+
+_PALABRA = re.compile(r'\w+')
+
+
+def _indexar(vocabulario):
+    """Construye {palabra o frase: ((categoria, prioridad, valor), ...)}"""
+    indice = {}
+    for categoria, valores in vocabulario.items():
+        for prioridad, (valor, terminos) in enumerate(valores):
+            for termino in terminos:
+                indice.setdefault(termino, []).append((categoria, prioridad, valor))
+    return {termino: tuple(entradas) for termino, entradas in indice.items()}
+
+
+def _indexar_frases(indice):
+    """Construye {primera palabra: (largos de las frases que empiezan con ella)}"""
+    frases = {}
+    for termino in indice:
+        palabras = termino.split()
+        if len(palabras) > 1:
+            frases.setdefault(palabras[0], set()).add(len(palabras))
+    return {palabra: tuple(sorted(largos)) for palabra, largos in frases.items()}
+
+
+_INDICE = _indexar(VOCABULARIO)
+_FRASES = _indexar_frases(_INDICE)
+
+
+def clasificar(mensaje):
+    """
+    Clasifica un mensaje libre. Devuelve un diccionario con:
+    cortesia ('saludo', 'agradecimiento' o None), tema ('cursos' o None),
+    accion ('listar', 'disponibilidad' o None), filtros ({'nivel', 'estado'})
+    y detalles (lista en el orden de VOCABULARIO).
+    """
+    palabras = _PALABRA.findall(normalizar_texto(mensaje))
+    terminos = list(palabras)
+    for inicio, palabra in enumerate(palabras):
+        for largo in _FRASES.get(palabra, ()):
+            if inicio + largo <= len(palabras):
+                terminos.append(' '.join(palabras[inicio:inicio + largo]))
+
+    encontrados = {}
+    for termino in terminos:
+        for categoria, prioridad, valor in _INDICE.get(termino, ()):
+            encontrados.setdefault(categoria, {})[prioridad] = valor
+
+    def mejor(categoria):
+        valores = encontrados.get(categoria)
+        return valores[min(valores)] if valores else None
+
+    filtros = {}
+    for categoria in ('nivel', 'estado'):
+        valor = mejor(categoria)
+        if valor:
+            filtros[categoria] = valor
+
+    detalles = encontrados.get('detalles', {})
+    return {
+        'cortesia': mejor('cortesia'),
+        'tema': mejor('tema'),
+        'accion': mejor('accion'),
+        'filtros': filtros,
+        'detalles': [detalles[prioridad] for prioridad in sorted(detalles)],
+    }
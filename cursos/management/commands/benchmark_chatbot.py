@@ -0,0 +1,96 @@
+import re
+import time
+from django.core.management.base import BaseCommand
+from cursos.intenciones import clasificar
+
+MENSAJES = [
+    'hola', 'buenas tardes, que cursos hay?', 'muchas gracias!',
+    'quiero ver los cursos basicos', 'hay cupos en los talleres avanzados?',
+    'cual es el precio y la duracion de los cursos intermedios',
+    'mostrar cursos completados con su profesor',
+    'que es el curso de programacion y en que consiste',
+    'fecha de inicio de las clases activas', 'necesito informacion',
+    'Quiero ver los cursos básicos con su duración', '¿Qué cursos están disponibles?',
+]
+
+
+class Command(BaseCommand):
+    help = ('Mide mensajes por segundo del clasificador del chatbot: la versión anterior '
+            '(listas de regex construidas y evaluadas en cada mensaje) contra el índice precompilado')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mensajes', type=int, default=100_000, help='Mensajes a clasificar por variante')
+
+    def handle(self, *args, **options):
+        cantidad = options['mensajes']
+        mensajes = [MENSAJES[i % len(MENSAJES)] for i in range(cantidad)]
+
+        antes = self.medir(clasificar_con_regex, mensajes)
+        despues = self.medir(clasificar, mensajes)
+        self.stdout.write(f'Regex por mensaje:    {cantidad / antes:12,.0f} mensajes/s')
+        self.stdout.write(f'Índice precompilado: {cantidad / despues:12,.0f} mensajes/s')
+        self.stdout.write(self.style.SUCCESS(f'Aceleración: x{antes / despues:.1f}'))
+
+        # Sin tildes ambos clasificadores deben coincidir; con tildes la versión
+        # anterior no reconocía palabras como "básicos" o "duración"
+        for mensaje in MENSAJES:
+            if clasificar_con_regex(mensaje) != clasificar(mensaje):
+                self.stdout.write(self.style.WARNING(f'  Difiere: {mensaje!r}'))
+
+    def medir(self, funcion, mensajes):
+        inicio = time.perf_counter()
+        for mensaje in mensajes:
+            funcion(mensaje)
+        return time.perf_counter() - inicio
+
+
+def clasificar_con_regex(mensaje):
+    """Réplica del clasificador anterior, con el mismo formato de salida que clasificar()"""
+    mensaje = mensaje.strip().lower()
+    saludos = [
+        r'\bhola\b', r'\bbuenos dias\b', r'\bbuenas tardes\b', r'\bbuenas noches\b',
+        r'\bsaludos\b', r'\bhey\b', r'\bhi\b', r'\bhello\b'
+    ]
+    agradecimientos = [r'\bgracias\b', r'\bagradezco\b', r'\bthank you\b', r'\bthanks\b']
+    curso_patterns = [
+        r'\bcursos?\b', r'\bmaterias?\b', r'\basignaturas?\b', r'\bclases?\b',
+        r'\btalleres?\b', r'\bformacion\b', r'\beducacion\b',
+    ]
+    nivel_patterns = {
+        'B': r'\bbasicos?\b|\binicial\b|\bprincipiante\b',
+        'I': r'\bintermedios?\b|\bmedio\b',
+        'A': r'\bavanzados?\b|\bexperto\b',
+    }
+    estado_patterns = {
+        'A': r'\bactivos?\b|\bdisponibles?\b|\babiertos?\b',
+        'C': r'\bcompletados?\b|\bterminados?\b|\bfinalizados?\b',
+        'I': r'\binactivos?\b|\bcerrados?\b',
+    }
+    detalle_patterns = {
+        'precio': r'\bprecio\b|\bcosto\b|\bvalor\b|\btarifa\b',
+        'profesor': r'\bprofesor\b|\bdocente\b|\binstructor\b|\bmaestro\b',
+        'duración': r'\bduracion\b|\bhoras\b|\btiempo\b|\bsemanas?\b|\bmeses?\b',
+        'fecha': r'\bfecha\b|\binicio\b|\bcomienzo\b|\bempezar\b',
+        'descripción': r'\bdescripcion\b|\bque es\b|\ben que consiste\b',
+    }
+
+    intencion = {'cortesia': None, 'tema': None, 'accion': None, 'filtros': {}, 'detalles': []}
+    if any(re.search(patron, mensaje) for patron in saludos):
+        intencion['cortesia'] = 'saludo'
+    elif any(re.search(patron, mensaje) for patron in agradecimientos):
+        intencion['cortesia'] = 'agradecimiento'
+    if any(re.search(patron, mensaje) for patron in curso_patterns):
+        intencion['tema'] = 'cursos'
+    if re.search(r'\blistar\b|\bver\b|\bmostrar\b|\bconsultar\b|\bbuscar\b', mensaje):
+        intencion['accion'] = 'listar'
+    elif re.search(r'\bdisponibles?\b|\bhabra\b|\bhay\b|\bquedan\b', mensaje):
+        intencion['accion'] = 'disponibilidad'
+    for filtro, patrones in (('nivel', nivel_patterns), ('estado', estado_patterns)):
+        for valor, patron in patrones.items():
+            if re.search(patron, mensaje):
+                intencion['filtros'][filtro] = valor
+                break
+    for detalle, patron in detalle_patterns.items():
+        if re.search(patron, mensaje):
+            intencion['detalles'].append(detalle)
+    return intencion
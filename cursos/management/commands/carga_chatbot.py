@@ -0,0 +1,62 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+
+MENSAJES = [
+    'hola', 'que cursos hay?', 'hay cupos en los cursos basicos?',
+    'precio de los cursos avanzados', 'profesor y duracion de los cursos',
+    'cursos intermedios activos', 'gracias',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga del chatbot contra un servidor en ejecución. Para comparar '
+        'WSGI con ASGI, levantar el proyecto con cada uno y repetir la prueba:\n'
+        '  gunicorn sistema_instituto.wsgi -w 4\n'
+        '  uvicorn sistema_instituto.asgi:application --workers 4'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/cursos/api/chatbot/')
+        parser.add_argument('--solicitudes', type=int, default=2000)
+        parser.add_argument('--concurrencia', type=int, default=64, help='Clientes simultáneos')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        total = options['solicitudes']
+
+        def enviar(i):
+            cuerpo = json.dumps({'message': MENSAJES[i % len(MENSAJES)]}).encode()
+            solicitud = urllib.request.Request(
+                options['url'], data=cuerpo, headers={'Content-Type': 'application/json'}
+            )
+            inicio = time.perf_counter()
+            try:
+                with urllib.request.urlopen(solicitud, timeout=options['timeout']) as respuesta:
+                    respuesta.read()
+                    estado = respuesta.status
+            except urllib.error.HTTPError as error:
+                estado = error.code
+            except OSError:
+                estado = None
+            return estado, (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrencia']) as ejecutor:
+            resultados = list(ejecutor.map(enviar, range(total)))
+        duracion = time.perf_counter() - inicio
+
+        tiempos = sorted(ms for estado, ms in resultados if estado == 200)
+        fallidas = total - len(tiempos)
+        self.stdout.write(f'Solicitudes: {total} ({options["concurrencia"]} concurrentes), fallidas: {fallidas}')
+        self.stdout.write(self.style.SUCCESS(f'Rendimiento: {total / duracion:,.0f} solicitudes/s'))
+        if len(tiempos) >= 2:
+            percentiles = statistics.quantiles(tiempos, n=100)
+            self.stdout.write(
+                f'Latencia p50: {percentiles[49]:.1f}ms | p95: {percentiles[94]:.1f}ms | máx: {tiempos[-1]:.1f}ms'
+            )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from cursos.models import Curso
+from matriculas.services import recalcular_inscritos
+
+
+class Command(BaseCommand):
+    help = 'Reconcilia el contador de inscritos de cada curso con sus matrículas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', action='append', dest='codigos', metavar='CODIGO',
+                            help='Código del curso a revisar (se puede repetir)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo muestra las diferencias sin corregirlas')
+
+    def handle(self, *args, **options):
+        cursos = Curso.objects.all()
+        if options['codigos']:
+            cursos = cursos.filter(codigo__in=options['codigos'])
+
+        desincronizados = recalcular_inscritos(cursos, aplicar=not options['dry_run'])
+
+        for curso, guardados, reales in desincronizados:
+            self.stdout.write(f'{curso.codigo}: {guardados} -> {reales}')
+
+        if not desincronizados:
+            self.stdout.write(self.style.SUCCESS('Todos los contadores están sincronizados.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(desincronizados)} curso(s) desincronizado(s).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(desincronizados)} curso(s) corregido(s).'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 10:49
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def calcular_inscritos(apps, schema_editor):
+    Curso = apps.get_model('cursos', 'Curso')
+    cursos = Curso.objects.annotate(
+        total=Count('matricula', filter=Q(matricula__estado__in=['P', 'A', 'C']))
+    )
+    for curso in cursos:
+        Curso.objects.filter(pk=curso.pk).update(inscritos=curso.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0001_initial'),
+        ('matriculas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='inscritos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Alumnos Inscritos'),
+        ),
+        migrations.RunPython(calcular_inscritos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0002_curso_inscritos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['updated_at', 'id'], name='cursos_curs_updated_3faa57_idx'),
+        ),
+    ]
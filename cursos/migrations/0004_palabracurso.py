@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+from sistema_instituto.texto import normalizar_texto, palabras
+
+
+def llenar_palabras(apps, schema_editor):
+    Curso = apps.get_model('cursos', 'Curso')
+    PalabraCurso = apps.get_model('cursos', 'PalabraCurso')
+    PalabraCurso.objects.bulk_create(
+        PalabraCurso(curso_id=curso_id, palabra=palabra)
+        for curso_id, codigo, nombre in Curso.objects.values_list('id', 'codigo', 'nombre').iterator(chunk_size=2000)
+        for palabra in palabras(normalizar_texto(f'{codigo} {nombre}'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0003_curso_updated_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PalabraCurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('palabra', models.CharField(max_length=100, verbose_name='Palabra')),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='palabras', to='cursos.curso', verbose_name='Curso')),
+            ],
+            options={
+                'verbose_name': 'Palabra de búsqueda',
+                'verbose_name_plural': 'Palabras de búsqueda',
+                'indexes': [models.Index(fields=['palabra', 'curso'], name='cursos_pala_palabra_c1ba32_idx')],
+                'unique_together': {('curso', 'palabra')},
+            },
+        ),
+        migrations.RunPython(llenar_palabras, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from sistema_instituto.texto import LARGO_PALABRA, normalizar_texto, palabras
 
 class Curso(models.Model):
 
@@ -26,6 +27,7 @@ class Curso(models.Model):
     fecha_fin = models.DateField(verbose_name="Fecha de Fin")
     estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='A', verbose_name="Estado")
     profesor = models.CharField(max_length=100, verbose_name="Profesor")
+    inscritos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Alumnos Inscritos")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
     creado_por = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Creado por")
@@ -34,12 +36,44 @@ class Curso(models.Model):
         verbose_name = "Curso"
         verbose_name_plural = "Cursos"
         ordering = ['-created_at']
+        indexes = [
+            # Feed de cambios: recorre por (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Las palabras de búsqueda solo se reescriben si el código o el nombre cambian
+        if 'codigo' in instance.__dict__ and 'nombre' in instance.__dict__:
+            instance._texto_guardado = instance.texto_busqueda()
+        # Las matrículas publican el código en la API (ver matriculas.signals)
+        instance._codigo_guardado = instance.__dict__.get('codigo')
+        return instance
+
+    def texto_busqueda(self):
+        return normalizar_texto(f'{self.codigo} {self.nombre}')
+
+    def save(self, *args, **kwargs):
+        # El contador de inscritos lo mantienen las matrículas con updates
+        # atómicos; no se debe sobrescribir con el valor leído al cargar el curso
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'inscritos'
+            ]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.texto_busqueda() != getattr(self, '_texto_guardado', None):
+                PalabraCurso.sincronizar([self])
+        self._texto_guardado = self.texto_busqueda()
+        self._codigo_guardado = self.codigo
+
     def alumnos_inscritos(self):
-        return self.matricula_set.count()
+        return self.inscritos
 
     def cupos_disponibles(self):
         return self.cupo_maximo - self.alumnos_inscritos()
@@ -49,5 +83,31 @@ class Curso(models.Model):
     
 
 
+class PalabraCurso(models.Model):
+    """Una fila por palabra del código y el nombre del curso (ver alumnos.models.PalabraAlumno)"""
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='palabras', verbose_name="Curso")
+    palabra = models.CharField(max_length=LARGO_PALABRA, verbose_name="Palabra")
 
+    class Meta:
+        verbose_name = "Palabra de búsqueda"
+        verbose_name_plural = "Palabras de búsqueda"
+        unique_together = ['curso', 'palabra']
+        indexes = [
+            models.Index(fields=['palabra', 'curso']),
+        ]
 
+    @classmethod
+    def sincronizar(cls, cursos, tamano_lote=1000):
+        """Reemplaza las palabras de cursos ya guardados; llamar tras bulk_create/bulk_update"""
+        cursos = list(cursos)
+        sin_id = {curso.codigo: curso for curso in cursos if curso.pk is None}
+        if sin_id:
+            # bulk_create no asigna los ids en motores sin RETURNING (MySQL)
+            for codigo, pk in Curso.objects.filter(codigo__in=list(sin_id)).values_list('codigo', 'pk'):
+                sin_id[codigo].pk = pk
+        for inicio in range(0, len(cursos), tamano_lote):
+            lote = cursos[inicio:inicio + tamano_lote]
+            cls.objects.filter(curso__in=[curso.pk for curso in lote]).delete()
+            cls.objects.bulk_create(
+                cls(curso_id=curso.pk, palabra=palabra) for curso in lote for palabra in palabras(curso.texto_busqueda())
+            )
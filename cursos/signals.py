@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from sistema_instituto.bajas import borrado, seguir
+from .catalogo import invalidar_catalogo
+from .models import Curso
+
+seguir(Curso)
+
+@receiver(post_save, sender=Curso)
+def invalidar_catalogo_cursos(sender, **kwargs):
+    """Cualquier cambio de un curso deja obsoletas las respuestas cacheadas del chatbot"""
+    transaction.on_commit(invalidar_catalogo)
+
+@receiver(borrado)
+def invalidar_catalogo_bajas(sender, eliminados, **kwargs):
+    """Borrar cursos (uno o varios en un delete()) también las deja obsoletas"""
+    if Curso in eliminados:
+        transaction.on_commit(invalidar_catalogo)
@@ -1,3 +1,162 @@
+import re
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from alumnos.models import Alumno
+from matriculas.models import Matricula
+from sistema_instituto.texto import normalizar_texto
+from .catalogo import filas_cursos, obtener_curso
+from .intenciones import clasificar
+from .models import Curso
+from .views import generate_course_response
 
-# Create your tests here.
+
+class CatalogoCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='clave', is_staff=True)
+        cls.curso = Curso.objects.create(
+            nombre='Python desde cero', codigo='PY01', descripcion='Descripción', nivel='B', duracion=40,
+            precio=100, cupo_maximo=2, fecha_inicio=date(2025, 3, 1), fecha_fin=date(2025, 7, 1),
+            estado='A', profesor='Profesor', creado_por=cls.usuario,
+        )
+        cls.alumno = Alumno.objects.create(
+            dni='40000000', codigo_alumno='A0000', nombres='Ana', apellidos='Quispe',
+            fecha_nacimiento=date(2000, 1, 1), genero='F', email='ana@example.com',
+            telefono='999999999', direccion='Lima', fecha_ingreso=date(2024, 3, 1), creado_por=cls.usuario,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def fila(self):
+        return filas_cursos([self.curso])[0]
+
+    def test_editar_curso_invalida_objeto_y_fila(self):
+        self.assertEqual(obtener_curso(self.curso.pk).nombre, 'Python desde cero')
+        self.assertIn('Python desde cero', self.fila())
+        with self.assertNumQueries(0):
+            obtener_curso(self.curso.pk)
+            self.fila()
+
+        curso = Curso.objects.get(pk=self.curso.pk)
+        curso.nombre = 'Python avanzado'
+        with self.captureOnCommitCallbacks(execute=True):
+            curso.save()
+        self.assertEqual(obtener_curso(self.curso.pk).nombre, 'Python avanzado')
+        self.assertIn('Python avanzado', self.fila())
+
+    def test_matricula_invalida_cupos_y_chatbot(self):
+        mensaje = 'qué cursos hay disponibles'
+        self.assertIn('Cupos disponibles: 2/2', generate_course_response(mensaje))
+        self.assertEqual(obtener_curso(self.curso.pk).cupos_disponibles(), 2)
+        self.assertIn('0/2', self.fila())
+        with self.assertNumQueries(0):
+            generate_course_response(mensaje)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Matricula.objects.create(
+                alumno=self.alumno, curso=self.curso, fecha_inicio=date(2025, 3, 1), estado='A',
+                creado_por=self.usuario,
+            )
+        self.assertIn('Cupos disponibles: 1/2', generate_course_response(mensaje))
+        self.assertEqual(obtener_curso(self.curso.pk).cupos_disponibles(), 1)
+        self.assertIn('1/2', self.fila())
+
+
+# Expresiones del clasificador anterior, que recorría el mensaje una vez por patrón;
+# el índice de intenciones debe clasificar igual
+PATRONES_ANTERIORES = {
+    'cortesia': [
+        ('saludo', r'\bhola\b|\bbuenos dias\b|\bbuenas tardes\b|\bbuenas noches\b|\bsaludos\b|\bhey\b|\bhi\b|\bhello\b'),
+        ('agradecimiento', r'\bgracias\b|\bagradezco\b|\bthank you\b|\bthanks\b'),
+    ],
+    'tema': [
+        ('cursos', r'\bcursos?\b|\bmaterias?\b|\basignaturas?\b|\bclases?\b|\btalleres?\b|\bformacion\b|\beducacion\b'),
+    ],
+    'accion': [
+        ('listar', r'\blistar\b|\bver\b|\bmostrar\b|\bconsultar\b|\bbuscar\b'),
+        ('disponibilidad', r'\bdisponibles?\b|\bhabra\b|\bhay\b|\bquedan\b'),
+    ],
+    'nivel': [
+        ('B', r'\bbasicos?\b|\binicial\b|\bprincipiante\b'),
+        ('I', r'\bintermedios?\b|\bmedio\b'),
+        ('A', r'\bavanzados?\b|\bexperto\b'),
+    ],
+    'estado': [
+        ('A', r'\bactivos?\b|\bdisponibles?\b|\babiertos?\b'),
+        ('C', r'\bcompletados?\b|\bterminados?\b|\bfinalizados?\b'),
+        ('I', r'\binactivos?\b|\bcerrados?\b'),
+    ],
+    'detalles': [
+        ('precio', r'\bprecio\b|\bcosto\b|\bvalor\b|\btarifa\b'),
+        ('profesor', r'\bprofesor\b|\bdocente\b|\binstructor\b|\bmaestro\b'),
+        ('duración', r'\bduracion\b|\bhoras\b|\btiempo\b|\bsemanas?\b|\bmeses?\b'),
+        ('fecha', r'\bfecha\b|\binicio\b|\bcomienzo\b|\bempezar\b'),
+        ('descripción', r'\bdescripcion\b|\bque es\b|\ben que consiste\b'),
+    ],
+}
+
+FRASES_CHATBOT = [
+    '¡Hola! ¿Qué cursos hay disponibles?',
+    'Buenos días, ¿habrá asignaturas de educación inicial?',
+    'Buenas tardes',
+    'hey, quiero ver los talleres avanzados',
+    'Gracias por la información',
+    'thank you',
+    '¿Qué cursos tienen cupos libres?',
+    '¿Qué cursos hay por nivel básico, intermedio o avanzado?',
+    'Muéstrame los cursos de nivel intermedio',
+    '¿Cuáles son los precios de los cursos?',
+    '¿Quién es el profesor o docente del curso de Python?',
+    '¿Cuántas horas o semanas dura la clase? ¿Y cuántos meses?',
+    '¿El taller dura un mes?',
+    '¿Cuándo es la fecha de inicio de las materias?',
+    '¿Qué es el taller de formación básica?',
+    '¿En qué consiste el curso para principiante y cuál es su duración y costo?',
+    'Listar cursos cerrados o inactivos',
+    'Cursos completados, terminados y finalizados',
+    '¿Quedan vacantes en los cursos activos?',
+    'Buscar clases abiertas para experto',
+    'Consultar la tarifa del instructor',
+    'Descripción y comienzo del curso de nivel medio',
+    '¿Qué tal?',
+]
+
+
+def clasificar_con_patrones(mensaje):
+    texto = normalizar_texto(mensaje)
+    encontrados = {
+        categoria: [valor for valor, patron in patrones if re.search(patron, texto)]
+        for categoria, patrones in PATRONES_ANTERIORES.items()
+    }
+    primero = lambda categoria: encontrados[categoria][0] if encontrados[categoria] else None
+    return {
+        'cortesia': primero('cortesia'),
+        'tema': primero('tema'),
+        'accion': primero('accion'),
+        'filtros': {categoria: primero(categoria) for categoria in ('nivel', 'estado') if primero(categoria)},
+        'detalles': encontrados['detalles'],
+    }
+
+
+class IntencionesTests(TestCase):
+    def test_clasifica_como_los_patrones_anteriores(self):
+        for frase in FRASES_CHATBOT:
+            esperado = clasificar_con_patrones(frase)
+            # Con y sin tildes, en minúsculas o mayúsculas
+            for variante in (frase, normalizar_texto(frase), frase.upper()):
+                with self.subTest(variante=variante):
+                    self.assertEqual(clasificar(variante), esperado)
+
+    def test_las_frases_cubren_todos_los_valores(self):
+        encontrados = set()
+        for frase in FRASES_CHATBOT:
+            intencion = clasificar_con_patrones(frase)
+            encontrados.update((categoria, intencion[categoria]) for categoria in ('cortesia', 'tema', 'accion'))
+            encontrados.update(intencion['filtros'].items())
+            encontrados.update(('detalles', detalle) for detalle in intencion['detalles'])
+        for categoria, patrones in PATRONES_ANTERIORES.items():
+            for valor, _ in patrones:
+                self.assertIn((categoria, valor), encontrados)
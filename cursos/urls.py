@@ -1,14 +1,20 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'cursos'
 
 urlpatterns = [
     path('', views.lista_cursos, name='lista_cursos'),
     path('nuevo/', views.nuevo_curso, name='nuevo_curso'),
+    path('exportar/', views.exportar_cursos, name='exportar_cursos'),
     path('<int:curso_id>/', views.detalle_curso, name='detalle_curso'),
     path('<int:curso_id>/editar/', views.editar_curso, name='editar_curso'),
     path('<int:curso_id>/eliminar/', views.eliminar_curso, name='eliminar_curso'),
     path('<int:curso_id>/alumnos/', views.alumnos_curso, name='alumnos_curso'),
     path('api/chatbot/', views.chatbot_api, name='chatbot_api'),
+    path('api/chatbot/stream/', views.chatbot_stream, name='chatbot_stream'),
+    path('api/', api.lista, name='api_cursos'),
+    path('api/cambios/', api.cambios, name='api_cursos_cambios'),
+    path('api/<int:curso_id>/', api.detalle, name='api_curso'),
+    path('cache/', views.estadisticas_cache, name='estadisticas_cache'),
 ]
\ No newline at end of file
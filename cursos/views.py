@@ -1,20 +1,52 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from .models import Curso
 from .forms import CursoForm
+from .catalogo import (
+    aguardar_respuesta, aobtener_respuesta, arespuesta_cacheada, contadores_cache,
+    filas_cursos, obtener_curso, respuesta_cacheada,
+)
+from .intenciones import clasificar
+from sistema_instituto.exportacion import Columna, respuesta_exportacion
+from sistema_instituto.paginacion import paginar_keyset
+from sistema_instituto.replicas import en_principal, lectura_en_replica
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 import json
+import logging
 from datetime import date
-import re
 import random
 
+logger = logging.getLogger(__name__)
+
+# Cursos leídos por consulta al transmitir una respuesta
+TAMANO_LOTE_CHATBOT = 50
+
+COLUMNAS_EXPORTACION = [
+    Columna('Código', 'codigo'),
+    Columna('Nombre', 'nombre'),
+    Columna('Nivel', 'nivel', Curso.NIVEL_CHOICES),
+    Columna('Duración (horas)', 'duracion'),
+    Columna('Precio', 'precio'),
+    Columna('Cupo Máximo', 'cupo_maximo'),
+    Columna('Inscritos', 'inscritos'),
+    Columna('Fecha de Inicio', 'fecha_inicio'),
+    Columna('Fecha de Fin', 'fecha_fin'),
+    Columna('Estado', 'estado', Curso.ESTADO_CHOICES),
+    Columna('Profesor', 'profesor'),
+]
+
 @csrf_exempt
 @require_POST
-def chatbot_api(request):
+@lectura_en_replica
+async def chatbot_api(request):
+    # Vista asíncrona: bajo ASGI no ocupa un hilo por mensaje mientras espera
+    # la caché o la base de datos
     try:
         # Parsear el mensaje del usuario
         data = json.loads(request.body)
@@ -24,143 +56,123 @@ def chatbot_api(request):
             return JsonResponse({'reply': 'Por favor, escribe tu pregunta.'})
         
         # Detectar intención
-        reply = generate_course_response(user_message)
+        reply = await agenerate_course_response(user_message)
         
         return JsonResponse({'reply': reply})
         
     except json.JSONDecodeError:
         return JsonResponse({'reply': 'Error al procesar tu mensaje.'}, status=400)
-    except Exception as e:
-        print(f"Error en chatbot: {e}")
+    except Exception:
+        logger.exception("Error en chatbot")
         return JsonResponse({'reply': 'Hubo un error procesando tu solicitud.'}, status=500)
 
-def detect_intention(user_message):
-    """Detecta la intención del usuario basado en palabras clave"""
-    
-    # Patrones para cursos
-    curso_patterns = [
-        r'\bcursos?\b',
-        r'\bmaterias?\b',
-        r'\basignaturas?\b',
-        r'\bclases?\b',
-        r'\btalleres?\b',
-        r'\bformacion\b',
-        r'\beducacion\b',
-    ]
-    
-    # Patrones para disponibilidad
-    disponibilidad_patterns = [
-        r'\bdisponibles?\b',
-        r'\bdisponibilidad\b',
-        r'\bhabra\b',
-        r'\bhay\b',
-        r'\bexisten\b',
-        r'\bquedan\b',
-        r'\bcupos?\b',
-        r'\blugares?\b',
-        r'\bvacantes?\b',
-    ]
-    
-    # Patrones para nivel
-    nivel_patterns = {
-        'básico': r'\bbasicos?\b|\binicial\b|\bprincipiante\b',
-        'intermedio': r'\bintermedios?\b|\bmedio\b',
-        'avanzado': r'\bavanzados?\b|\bexperto\b',
-    }
-    
-    # Patrones para estado
-    estado_patterns = {
-        'activo': r'\bactivos?\b|\bdisponibles?\b|\babiertos?\b',
-        'completado': r'\bcompletados?\b|\bterminados?\b|\bfinalizados?\b',
-        'inactivo': r'\binactivos?\b|\bcerrados?\b',
-    }
-    
-    # Patrones para detalles específicos
-    detalle_patterns = {
-        'precio': r'\bprecio\b|\bcosto\b|\bvalor\b|\btarifa\b',
-        'profesor': r'\bprofesor\b|\bdocente\b|\binstructor\b|\bmaestro\b',
-        'duración': r'\bduracion\b|\bhoras\b|\btiempo\b|\bsemanas?\b|\bmeses?\b',
-        'fecha': r'\bfecha\b|\binicio\b|\bcomienzo\b|\bempezar\b',
-        'descripción': r'\bdescripcion\b|\bque es\b|\ben que consiste\b',
-    }
-    
-    intention = {
-        'tema': None,
-        'accion': None,
-        'filtros': {},
-        'detalles': []
-    }
-    
-    # Detectar si habla de cursos
-    for pattern in curso_patterns:
-        if re.search(pattern, user_message):
-            intention['tema'] = 'cursos'
-            break
-    
-    # Detectar acción (listar, consultar, etc.)
-    if re.search(r'\blistar\b|\bver\b|\bmostrar\b|\bconsultar\b|\bbuscar\b', user_message):
-        intention['accion'] = 'listar'
-    elif re.search(r'\bdisponibles?\b|\bhabra\b|\bhay\b|\bquedan\b', user_message):
-        intention['accion'] = 'disponibilidad'
-    
-    # Detectar filtros de nivel
-    for nivel, pattern in nivel_patterns.items():
-        if re.search(pattern, user_message):
-            intention['filtros']['nivel'] = nivel[0].upper()  # 'B', 'I', 'A'
-            break
-    
-    # Detectar filtros de estado
-    for estado, pattern in estado_patterns.items():
-        if re.search(pattern, user_message):
-            intention['filtros']['estado'] = estado[0].upper()  # 'A', 'C', 'I'
-            break
-    
-    # Detectar detalles solicitados
-    for detalle, pattern in detalle_patterns.items():
-        if re.search(pattern, user_message):
-            intention['detalles'].append(detalle)
+@csrf_exempt
+@require_POST
+@lectura_en_replica
+async def chatbot_stream(request):
+    """
+    Variante de chatbot_api que responde con eventos SSE: un evento por
+    línea de la respuesta, enviado apenas se lee cada curso, y un evento
+    "fin" al terminar. Bajo WSGI Django acumula el iterador asíncrono
+    antes de enviarlo; el envío incremental requiere ASGI.
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'reply': 'Error al procesar tu mensaje.'}, status=400)
     
-    return intention
+    user_message = data.get('message', '').strip().lower()
+    response = StreamingHttpResponse(eventos_chatbot(user_message), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # evita que nginx acumule la respuesta
+    return response
+
+async def eventos_chatbot(user_message):
+    """Genera los eventos SSE de la respuesta al mensaje"""
+    try:
+        if not user_message:
+            yield evento_sse('Por favor, escribe tu pregunta.')
+        else:
+            async for linea in alineas_respuesta(user_message):
+                yield evento_sse(linea)
+    except Exception:
+        logger.exception("Error en chatbot")
+        yield evento_sse('Hubo un error procesando tu solicitud.')
+    yield 'event: fin\ndata: {}\n\n'
+
+def evento_sse(texto):
+    return f"data: {json.dumps({'texto': texto})}\n\n"
+
+async def alineas_respuesta(user_message):
+    """
+    Líneas de la respuesta (unidas con saltos de línea forman la misma respuesta
+    de chatbot_api). Si no está cacheada se recorre el catálogo por lotes en
+    la base principal y al terminar se guarda en la caché.
+    """
+    intention = clasificar(user_message)
+    respuesta = respuesta_sin_catalogo(intention)
+    if respuesta is None:
+        clave, respuesta = await aobtener_respuesta(intention)
+    if respuesta is not None:
+        yield respuesta
+        return
+    
+    partes = []
+    hubo_cursos = False
+    with en_principal():
+        async for curso in filtrar_cursos(intention).aiterator(chunk_size=TAMANO_LOTE_CHATBOT):
+            hubo_cursos = True
+            linea = linea_curso(intention, curso)
+            if not linea:
+                continue
+            if not partes:
+                partes.append(encabezado_cursos(intention))
+                yield partes[0]
+            partes.append(linea)
+            yield linea
+    
+    if partes:
+        partes.append(PIE_RESPUESTA_CURSOS)
+    else:
+        partes.append(respuesta_sin_cursos(intention, hubo_cursos))
+    yield partes[-1]
+    await aguardar_respuesta(clave, "\n".join(partes))
 
 def generate_course_response(user_message):
     """Genera respuesta basada en los cursos disponibles"""
+    intention = clasificar(user_message)
+    return respuesta_sin_catalogo(intention) or respuesta_cacheada(intention, respuesta_cursos)
+
+async def agenerate_course_response(user_message):
+    """Versión asíncrona de generate_course_response"""
+    intention = clasificar(user_message)
+    return respuesta_sin_catalogo(intention) or await arespuesta_cacheada(intention, arespuesta_cursos)
+
+def respuesta_sin_catalogo(intention):
+    """Respuestas que no consultan cursos; None si la pregunta necesita el catálogo"""
     
     # Respuestas para saludos y agradecimientos
-    saludos = [
-        r'\bhola\b', r'\bbuenos dias\b', r'\bbuenas tardes\b', r'\bbuenas noches\b',
-        r'\bsaludos\b', r'\bhey\b', r'\bhi\b', r'\bhello\b'
-    ]
-    
-    agradecimientos = [
-        r'\bgracias\b', r'\bagradezco\b', r'\bthank you\b', r'\bthanks\b'
-    ]
-    
-    for patron in saludos:
-        if re.search(patron, user_message):
-            return (
-                "¡Hola! 👋 Soy el asistente virtual de cursos del sistema.\n\n"
-                "Puedo ayudarte con información sobre:\n"
-                "• Lista de cursos disponibles\n"
-                "• Cursos por nivel (Básico, Intermedio, Avanzado)\n"
-                "• Cupos disponibles\n"
-                "• Precios y duración\n"
-                "• Fechas de inicio\n"
-                "• Profesores\n\n"
-                "¿En qué puedo ayudarte hoy?"
-            )
-    
-    for patron in agradecimientos:
-        if re.search(patron, user_message):
-            respuestas = [
-                "¡De nada! Estoy aquí para ayudarte con cualquier consulta sobre cursos. 😊",
-                "¡Es un placer ayudarte! No dudes en preguntar si necesitas más información.",
-                "¡Gracias a ti! Que tengas un excelente día de aprendizaje.",
-                "¡Con gusto! Recuerda que puedes consultarme sobre cursos en cualquier momento."
-            ]
-            return random.choice(respuestas)
+    if intention['cortesia'] == 'saludo':
+        return (
+            "¡Hola! 👋 Soy el asistente virtual de cursos del sistema.\n\n"
+            "Puedo ayudarte con información sobre:\n"
+            "• Lista de cursos disponibles\n"
+            "• Cursos por nivel (Básico, Intermedio, Avanzado)\n"
+            "• Cupos disponibles\n"
+            "• Precios y duración\n"
+            "• Fechas de inicio\n"
+            "• Profesores\n\n"
+            "¿En qué puedo ayudarte hoy?"
+        )
     
-    # Detectar intención
-    intention = detect_intention(user_message)
+    if intention['cortesia'] == 'agradecimiento':
+        respuestas = [
+            "¡De nada! Estoy aquí para ayudarte con cualquier consulta sobre cursos. 😊",
+            "¡Es un placer ayudarte! No dudes en preguntar si necesitas más información.",
+            "¡Gracias a ti! Que tengas un excelente día de aprendizaje.",
+            "¡Con gusto! Recuerda que puedes consultarme sobre cursos en cualquier momento."
+        ]
+        return random.choice(respuestas)
     
     # Si no se detecta tema de cursos
     if not intention['tema']:
@@ -173,6 +185,19 @@ def generate_course_response(user_message):
             "Por favor, especifica tu pregunta."
         )
     
+    return None
+
+def respuesta_cursos(intention):
+    """Arma la respuesta consultando el catálogo; el resultado se cachea por intención"""
+    return formatear_cursos(intention, list(filtrar_cursos(intention)))
+
+async def arespuesta_cursos(intention):
+    """Versión asíncrona de respuesta_cursos, con el ORM asíncrono"""
+    return formatear_cursos(intention, [curso async for curso in filtrar_cursos(intention)])
+
+def filtrar_cursos(intention):
+    """Cursos que corresponden a los filtros de la intención"""
+    
     # Consultar cursos según filtros
     cursos = Curso.objects.all()
     
@@ -186,100 +211,114 @@ def generate_course_response(user_message):
         # Por defecto, mostrar solo cursos activos
         cursos = cursos.filter(estado='A')
     
-    # Ordenar por fecha de inicio
-    cursos = cursos.order_by('fecha_inicio')
+    # Ordenar por fecha de inicio (una sola consulta; los cupos salen de la columna inscritos)
+    return cursos.order_by('fecha_inicio')
+
+PIE_RESPUESTA_CURSOS = "\n💡 *Puedes preguntar por: precios, profesores, duración o descripción específica de algún curso.*"
+
+def formatear_cursos(intention, cursos):
+    """Texto de la respuesta para la lista de cursos ya consultada"""
+    lineas = [linea for linea in (linea_curso(intention, curso) for curso in cursos) if linea]
+    if not lineas:
+        return respuesta_sin_cursos(intention, hubo_cursos=bool(cursos))
+    return "\n".join([encabezado_cursos(intention), *lineas, PIE_RESPUESTA_CURSOS])
+
+def encabezado_cursos(intention):
+    """Primera línea de la respuesta según la acción y los detalles pedidos"""
+    if intention['accion'] == 'disponibilidad':
+        return "📚 **Cursos disponibles con cupos:**\n"
+    if 'precio' in intention['detalles']:
+        return "💰 **Cursos disponibles con precios:**\n"
+    if 'profesor' in intention['detalles']:
+        return "👨‍🏫 **Cursos por profesor:**\n"
+    return "📖 **Cursos disponibles:**\n"
+
+def respuesta_sin_cursos(intention, hubo_cursos):
+    """Respuesta cuando ningún curso produjo una línea"""
+    if hubo_cursos and intention['accion'] == 'disponibilidad':
+        return "Actualmente no hay cursos con cupos disponibles. Te sugerimos revisar otros cursos o contactarnos para más información."
+    return "No hay cursos disponibles con esos criterios en este momento."
+
+def linea_curso(intention, curso):
+    """Línea de un curso en la respuesta; None si el curso no debe aparecer"""
+    cupos = curso.cupos_disponibles()
+    
+    if intention['accion'] == 'disponibilidad':
+        if cupos <= 0:
+            return None
+        return (
+            f"• **{curso.nombre}** ({curso.get_nivel_display()})\n"
+            f"  Código: {curso.codigo}\n"
+            f"  Cupos disponibles: {cupos}/{curso.cupo_maximo}\n"
+            f"  Inicia: {curso.fecha_inicio}\n"
+            f"  Precio: ${curso.precio}\n"
+            f"  Profesor: {curso.profesor}\n"
+        )
+    
+    # Listar cursos normalmente
+    cupo_info = f" ({cupos} cupos disponibles)" if cupos > 0 else " (CUPO COMPLETO)"
     
-    # Generar respuesta
-    if not cursos.exists():
-        return "No hay cursos disponibles con esos criterios en este momento."
+    line = f"• **{curso.nombre}**"
     
-    # Formatear respuesta
-    response_parts = []
+    if 'nivel' not in intention['filtros']:
+        line += f" [{curso.get_nivel_display()[0]}]"
     
-    if intention['accion'] == 'disponibilidad':
-        response_parts.append("📚 **Cursos disponibles con cupos:**\n")
-        cursos_con_cupos = [c for c in cursos if c.cupos_disponibles() > 0]
-        
-        if not cursos_con_cupos:
-            return "Actualmente no hay cursos con cupos disponibles. Te sugerimos revisar otros cursos o contactarnos para más información."
-        
-        for curso in cursos_con_cupos:
-            cupos = curso.cupos_disponibles()
-            response_parts.append(
-                f"• **{curso.nombre}** ({curso.get_nivel_display()})\n"
-                f"  Código: {curso.codigo}\n"
-                f"  Cupos disponibles: {cupos}/{curso.cupo_maximo}\n"
-                f"  Inicia: {curso.fecha_inicio}\n"
-                f"  Precio: ${curso.precio}\n"
-                f"  Profesor: {curso.profesor}\n"
-            )
+    line += cupo_info
     
-    else:  # Listar cursos normalmente
-        if 'precio' in intention['detalles']:
-            response_parts.append("💰 **Cursos disponibles con precios:**\n")
-        elif 'profesor' in intention['detalles']:
-            response_parts.append("👨‍🏫 **Cursos por profesor:**\n")
-        else:
-            response_parts.append("📖 **Cursos disponibles:**\n")
-        
-        for curso in cursos:
-            cupos = curso.cupos_disponibles()
-            cupo_info = f" ({cupos} cupos disponibles)" if cupos > 0 else " (CUPO COMPLETO)"
-            
-            line = f"• **{curso.nombre}**"
-            
-            if 'nivel' not in intention['filtros']:
-                line += f" [{curso.get_nivel_display()[0]}]"
-            
-            line += cupo_info
-            
-            if 'precio' in intention['detalles']:
-                line += f" - ${curso.precio}"
-            
-            if 'duración' in intention['detalles']:
-                line += f" - {curso.duracion} horas"
-            
-            if 'fecha' in intention['detalles']:
-                line += f" - Inicia: {curso.fecha_inicio}"
-            
-            if 'profesor' in intention['detalles']:
-                line += f" - Prof: {curso.profesor}"
-            
-            if 'descripción' in intention['detalles'] and curso.descripcion:
-                line += f"\n  📝 {curso.descripcion[:100]}..."
-            
-            response_parts.append(line)
+    if 'precio' in intention['detalles']:
+        line += f" - ${curso.precio}"
+    
+    if 'duración' in intention['detalles']:
+        line += f" - {curso.duracion} horas"
+    
+    if 'fecha' in intention['detalles']:
+        line += f" - Inicia: {curso.fecha_inicio}"
     
-    # Agregar información adicional
-    if len(response_parts) > 1:
-        response_parts.append("\n💡 *Puedes preguntar por: precios, profesores, duración o descripción específica de algún curso.*")
+    if 'profesor' in intention['detalles']:
+        line += f" - Prof: {curso.profesor}"
     
-    return "\n".join(response_parts)
+    if 'descripción' in intention['detalles'] and curso.descripcion:
+        line += f"\n  📝 {curso.descripcion[:100]}..."
+    
+    return line
+
+def _filtrar(cursos, parametros):
+    if parametros.get('nivel'):
+        cursos = cursos.filter(nivel=parametros['nivel'])
+    if parametros.get('estado'):
+        cursos = cursos.filter(estado=parametros['estado'])
+    return cursos
 
 @login_required
+@lectura_en_replica
 def lista_cursos(request):
     """Lista todos los cursos"""
-    cursos = Curso.objects.all()
-    
-    # Filtros
-    nivel = request.GET.get('nivel')
-    estado = request.GET.get('estado')
+    # Solo se leen las columnas de paginación: las filas salen de la caché
+    cursos = _filtrar(Curso.objects.only('id', 'created_at'), request.GET)
     
-    if nivel:
-        cursos = cursos.filter(nivel=nivel)
-    if estado:
-        cursos = cursos.filter(estado=estado)
+    pagina = paginar_keyset(cursos, ['-created_at', '-id'], request)
     
     context = {
-        'cursos': cursos,
+        'cursos': pagina,
+        'filas': filas_cursos(pagina),
+        'pagina': pagina,
         'titulo': 'Lista de Cursos'
     }
     return render(request, 'cursos/lista_cursos.html', context)
 
+@login_required
+@lectura_en_replica
+def exportar_cursos(request):
+    """Descarga en CSV o XLSX los cursos con los filtros de la lista"""
+    cursos = _filtrar(Curso.objects.all(), request.GET)
+    return respuesta_exportacion(cursos, COLUMNAS_EXPORTACION, 'cursos', request.GET.get('formato'))
+
 @login_required
 def detalle_curso(request, curso_id):
     """Muestra los detalles de un curso específico"""
-    curso = get_object_or_404(Curso, id=curso_id)
+    curso = obtener_curso(curso_id)
+    if curso is None:
+        raise Http404("No existe el curso.")
     context = {
         'curso': curso,
         'titulo': f'Detalle - {curso.nombre}'
@@ -351,6 +390,7 @@ def eliminar_curso(request, curso_id):
     return render(request, 'cursos/eliminar_curso.html', context)
 
 @login_required
+@lectura_en_replica
 def alumnos_curso(request, curso_id):
     """Muestra los alumnos inscritos en un curso"""
     curso = get_object_or_404(Curso, id=curso_id)
@@ -359,4 +399,12 @@ def alumnos_curso(request, curso_id):
         'curso': curso,
         'titulo': f'Alumnos de {curso.nombre}'
     }
-    return render(request, 'cursos/alumnos_curso.html', context)
\ No newline at end of file
+    return render(request, 'cursos/alumnos_curso.html', context)
+
+@staff_member_required
+def estadisticas_cache(request):
+    """Aciertos y fallos de la caché del catálogo en el proceso que atiende la petición"""
+    return JsonResponse({
+        'backend': settings.CACHES['default']['BACKEND'],
+        'contadores': contadores_cache(),
+    })
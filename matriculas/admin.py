@@ -1,8 +1,11 @@
 from django.contrib import admin
-from .models import Matricula
+from .forms import MatriculaAdminForm
+from .models import Matricula, CursoSinCupos
+from .services import con_reintentos
 
 @admin.register(Matricula)
 class MatriculaAdmin(admin.ModelAdmin):
+    form = MatriculaAdminForm
     list_display = ('id', 'alumno', 'curso', 'fecha_matricula', 'estado', 'calificacion')
     list_filter = ('estado', 'fecha_matricula', 'curso')
     search_fields = ('alumno__nombres', 'alumno__apellidos', 'alumno__dni', 'curso__nombre')
@@ -26,4 +29,17 @@ class MatriculaAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         if not obj.pk:
             obj.creado_por = request.user
-        super().save_model(request, obj, form, change)
+        obj.save()
+
+    def changeform_view(self, request, *args, **kwargs):
+        # El admin valida y guarda dentro de una transacción: los reintentos ante
+        # bloqueos envuelven la vista completa y no solo el save()
+        def vista():
+            return super(MatriculaAdmin, self).changeform_view(request, *args, **kwargs)
+        try:
+            return con_reintentos(vista)
+        except CursoSinCupos:
+            # Otra matrícula tomó el último cupo entre la validación y el guardado.
+            # Con todo revertido se procesa de nuevo el envío: ahora el formulario
+            # no pasa la validación y se muestra con los datos ingresados
+            return con_reintentos(vista)
@@ -0,0 +1,38 @@
+from sistema_instituto.api import Recurso, vista_api
+from .models import Matricula
+
+MATRICULAS = Recurso(
+    Matricula,
+    campos={
+        'id': 'id',
+        'alumno': 'alumno_id',
+        'alumno_dni': 'alumno_dni',
+        'curso': 'curso_id',
+        'curso_codigo': 'curso__codigo',
+        'fecha_matricula': 'fecha_matricula',
+        'fecha_inicio': 'fecha_inicio',
+        'fecha_fin': 'fecha_fin',
+        'estado': 'estado',
+        'calificacion': 'calificacion',
+        'observaciones': 'observaciones',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    },
+    por_defecto=['id', 'alumno', 'curso', 'estado', 'fecha_inicio', 'calificacion', 'updated_at'],
+    filtros={'estado': 'estado', 'curso': 'curso_id', 'alumno': 'alumno_id'},
+)
+
+
+@vista_api
+def lista(request):
+    return MATRICULAS.listar(request)
+
+
+@vista_api
+def detalle(request, matricula_id):
+    return MATRICULAS.detalle(request, matricula_id)
+
+
+@vista_api
+def cambios(request):
+    return MATRICULAS.cambios(request)
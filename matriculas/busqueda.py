@@ -0,0 +1,41 @@
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+from alumnos.busqueda import alumnos_con_prefijo, filtro_prefijo
+from alumnos.models import Alumno
+from cursos.models import PalabraCurso
+from sistema_instituto.texto import normalizar_texto
+
+
+def buscar_matriculas(queryset, texto):
+    """
+    Filtra matrículas por alumno (nombres, apellidos, DNI, código) o por
+    curso (código, nombre): cada palabra debe iniciar una palabra del alumno o
+    del curso, buscada en las tablas de palabras (PalabraAlumno, PalabraCurso).
+    Un término solo numérico se resuelve como prefijo de la columna indexada
+    alumno_dni.
+    """
+    termino = normalizar_texto(texto)
+    if not termino:
+        return queryset
+
+    prefijo_dni = filtro_prefijo('alumno_dni', termino)
+    if termino.isdigit():
+        return queryset.filter(prefijo_dni)
+    palabras = Q()
+    for palabra in termino.split(' '):
+        palabras &= Q(alumno_id__in=alumnos_con_prefijo(palabra)) | Q(curso_id__in=cursos_con_prefijo(palabra))
+    return queryset.filter(prefijo_dni | palabras)
+
+
+def cursos_con_prefijo(prefijo):
+    """Subconsulta con los ids de cursos que tienen una palabra que empieza por prefijo"""
+    return PalabraCurso.objects.filter(filtro_prefijo('palabra', prefijo)).values('curso_id')
+
+
+def sincronizar_busqueda(matriculas):
+    """Copia el DNI actual del alumno en las matrículas que lo tienen desactualizado; devuelve cuántas"""
+    return matriculas.exclude(alumno_dni=F('alumno__dni')).update(
+        alumno_dni=Subquery(Alumno.objects.filter(pk=OuterRef('alumno_id')).values('dni')[:1]),
+        # alumno_dni se publica en la API, así que su cambio debe reflejarse en updated_at
+        updated_at=timezone.now(),
+    )
@@ -4,6 +4,15 @@ from alumnos.models import Alumno
 from cursos.models import Curso
 import datetime
 
+
+def validar_cupo(matricula, curso, estado):
+    """Rechaza ocupar un cupo de un curso lleno; la reserva definitiva se hace al guardar"""
+    if curso and estado in Matricula.ESTADOS_CON_CUPO:
+        ya_ocupa_cupo = getattr(matricula, '_curso_con_cupo', None) == curso.pk
+        if not ya_ocupa_cupo and curso.cupos_disponibles() <= 0:
+            raise forms.ValidationError("El curso no tiene cupos disponibles.")
+
+
 class MatriculaForm(forms.ModelForm):
     class Meta:
         model = Matricula
@@ -75,9 +84,7 @@ class MatriculaForm(forms.ModelForm):
                 raise forms.ValidationError("La fecha de fin debe ser posterior a la fecha de inicio.")
 
         # Verificar cupos disponibles en el curso
-        if curso and estado in ['P', 'A']:
-            if curso.cupos_disponibles() <= 0:
-                raise forms.ValidationError("El curso no tiene cupos disponibles.")
+        validar_cupo(self.instance, curso, estado)
 
         # Validar calificación
         calificacion = cleaned_data.get('calificacion')
@@ -87,3 +94,31 @@ class MatriculaForm(forms.ModelForm):
 
         return cleaned_data
 
+
+
+class MatriculaAdminForm(forms.ModelForm):
+    class Meta:
+        model = Matricula
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        validar_cupo(self.instance, cleaned_data.get('curso'), cleaned_data.get('estado'))
+        return cleaned_data
+
+
+class ImportarMatriculasForm(forms.Form):
+    archivo = forms.FileField(
+        label="Archivo",
+        help_text="CSV o XLSX con las columnas alumno, curso, fecha_inicio, fecha_fin, estado, calificacion y observaciones",
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.xlsx'
+        })
+    )
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data.get('archivo')
+        if not archivo.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("El archivo debe ser CSV o XLSX.")
+        return archivo
@@ -0,0 +1,201 @@
+"""
+Importación masiva de matrículas desde archivos CSV/XLSX.
+
+Columnas esperadas: alumno (DNI o código de alumno), curso (código del curso),
+fecha_inicio, fecha_fin, estado, calificacion y observaciones. Solo alumno y
+curso son obligatorias; si falta fecha_inicio se usa la del curso.
+"""
+from decimal import Decimal, InvalidOperation
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from alumnos.models import Alumno
+from auth_app.estadisticas import sumar_creados
+from cursos.catalogo import invalidar_catalogo
+from cursos.models import Curso
+from sistema_instituto.archivos import ResultadoImportacion, en_lotes, parsear_fecha
+from .models import Matricula, CursoSinCupos
+from .reportes import invalidar_reporte
+from .services import guardar_matricula
+
+TAMANO_LOTE = 1000
+DUPLICADA = "Este alumno ya está matriculado en este curso."
+
+
+def importar_matriculas(filas, usuario, tamano_lote=TAMANO_LOTE):
+    """
+    Importa matrículas a partir de un iterable de (numero_fila, dict).
+
+    Cada lote se valida contra la base de datos con un número fijo de consultas
+    y se inserta con bulk_create en su propia transacción. Las filas inválidas
+    se reportan en el resultado sin detener la importación.
+    """
+    resultado = ResultadoImportacion()
+    # El catálogo de cursos es pequeño: se carga una sola vez para todo el archivo
+    cursos = {
+        curso.codigo.upper(): curso
+        for curso in Curso.objects.only('id', 'codigo', 'nombre', 'estado', 'fecha_inicio')
+    }
+    vistas = set()
+
+    for lote in en_lotes(filas, tamano_lote):
+        resultado.procesadas += len(lote)
+        _importar_lote(lote, cursos, vistas, usuario, resultado)
+
+    return resultado
+
+
+def _importar_lote(lote, cursos, vistas, usuario, resultado):
+    claves = {str(fila.get('alumno') or '').strip() for _, fila in lote} - {''}
+    alumnos = {}
+    for alumno in Alumno.objects.filter(
+        Q(dni__in=claves) | Q(codigo_alumno__in=claves)
+    ).only('id', 'dni', 'codigo_alumno', 'estado'):
+        alumnos[alumno.dni] = alumno
+        alumnos[alumno.codigo_alumno] = alumno
+
+    existentes = set(Matricula.objects.filter(
+        alumno_id__in={a.id for a in alumnos.values()}
+    ).values_list('alumno_id', 'curso_id'))
+
+    candidatas = []
+    for numero, fila in lote:
+        try:
+            matricula = _construir_matricula(fila, alumnos, cursos, usuario)
+        except ValueError as e:
+            resultado.agregar_error(numero, str(e))
+            continue
+
+        if (matricula.alumno_id, matricula.curso_id) in existentes:
+            resultado.agregar_error(numero, DUPLICADA)
+            continue
+        candidatas.append((numero, matricula))
+
+    if candidatas:
+        try:
+            _guardar_lote(candidatas, vistas, resultado)
+        except IntegrityError:
+            # Otra escritura concurrente chocó con el lote: se reintenta fila por fila
+            _guardar_por_fila(candidatas, vistas, resultado)
+
+
+def _par(matricula):
+    return matricula.alumno_id, matricula.curso_id
+
+
+def _guardar_lote(candidatas, vistas, resultado):
+    """vistas: pares (alumno, curso) ya importados del archivo; solo se agregan los de filas aceptadas"""
+    errores = []
+    aceptados = set()
+    with transaction.atomic():
+        curso_ids = {m.curso_id for _, m in candidatas if m.ocupa_cupo()}
+        libres = {
+            curso['id']: curso['cupo_maximo'] - curso['inscritos']
+            for curso in Curso.objects.select_for_update().filter(
+                pk__in=curso_ids
+            ).values('id', 'cupo_maximo', 'inscritos')
+        }
+
+        aceptadas = []
+        ocupados = {}
+        for numero, matricula in candidatas:
+            # Repetida en el archivo: cuenta solo si la fila anterior se aceptó
+            if _par(matricula) in vistas or _par(matricula) in aceptados:
+                errores.append((numero, DUPLICADA))
+                continue
+            if matricula.ocupa_cupo():
+                if libres[matricula.curso_id] <= 0:
+                    errores.append((numero, "El curso no tiene cupos disponibles."))
+                    continue
+                libres[matricula.curso_id] -= 1
+                ocupados[matricula.curso_id] = ocupados.get(matricula.curso_id, 0) + 1
+            aceptadas.append(matricula)
+            aceptados.add(_par(matricula))
+
+        # bulk_create no pasa por Matricula.save(): el contador y el DNI copiado se calculan aquí
+        for matricula in aceptadas:
+            matricula.actualizar_busqueda()
+        Matricula.objects.bulk_create(aceptadas)
+        sumar_creados(aceptadas)
+        for curso_id, cantidad in ocupados.items():
+            Curso.objects.filter(pk=curso_id).update(
+                inscritos=F('inscritos') + cantidad, updated_at=timezone.now()
+            )
+        # Tampoco se envían señales: estadísticas y cachés se actualizan a mano
+        transaction.on_commit(invalidar_reporte)
+        transaction.on_commit(invalidar_catalogo)
+
+    # Confirmado el lote: recién ahora sus pares cuentan como importados
+    vistas.update(aceptados)
+    resultado.creadas += len(aceptadas)
+    for numero, mensaje in errores:
+        resultado.agregar_error(numero, mensaje)
+
+
+def _guardar_por_fila(candidatas, vistas, resultado):
+    for numero, matricula in candidatas:
+        if _par(matricula) in vistas:
+            resultado.agregar_error(numero, DUPLICADA)
+            continue
+        try:
+            guardar_matricula(matricula)
+        except CursoSinCupos as e:
+            resultado.agregar_error(numero, str(e))
+        except IntegrityError:
+            resultado.agregar_error(numero, DUPLICADA)
+        else:
+            vistas.add(_par(matricula))
+            resultado.creadas += 1
+
+
+def _construir_matricula(fila, alumnos, cursos, usuario):
+    clave_alumno = str(fila.get('alumno') or '').strip()
+    codigo_curso = str(fila.get('curso') or '').strip().upper()
+    if not clave_alumno or not codigo_curso:
+        raise ValueError("Las columnas alumno y curso son obligatorias.")
+
+    alumno = alumnos.get(clave_alumno)
+    if alumno is None:
+        raise ValueError(f"No existe un alumno con DNI o código '{clave_alumno}'.")
+    if not alumno.esta_activo():
+        raise ValueError(f"El alumno '{clave_alumno}' no está activo.")
+
+    curso = cursos.get(codigo_curso)
+    if curso is None:
+        raise ValueError(f"No existe un curso con código '{codigo_curso}'.")
+    if not curso.esta_activo():
+        raise ValueError(f"El curso '{codigo_curso}' no está activo.")
+
+    estado = str(fila.get('estado') or 'P').strip().upper()
+    if estado not in dict(Matricula.ESTADO_CHOICES):
+        raise ValueError(f"Estado de matrícula no válido: '{estado}'.")
+
+    fecha_inicio = parsear_fecha(fila.get('fecha_inicio'), 'fecha_inicio') or curso.fecha_inicio
+    fecha_fin = parsear_fecha(fila.get('fecha_fin'), 'fecha_fin')
+    if fecha_fin and fecha_fin <= fecha_inicio:
+        raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio.")
+
+    calificacion = _parsear_calificacion(fila.get('calificacion'))
+
+    return Matricula(
+        alumno=alumno,
+        curso=curso,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        estado=estado,
+        calificacion=calificacion,
+        observaciones=str(fila.get('observaciones') or '').strip() or None,
+        creado_por=usuario,
+    )
+
+
+def _parsear_calificacion(valor):
+    if valor in (None, ''):
+        return None
+    try:
+        calificacion = Decimal(str(valor).replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError(f"Calificación no válida: '{valor}'.")
+    if calificacion < 0 or calificacion > 20:
+        raise ValueError("La calificación debe estar entre 0 y 20.")
+    return calificacion
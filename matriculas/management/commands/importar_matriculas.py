@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from matriculas.importacion import importar_matriculas, TAMANO_LOTE
+from sistema_instituto.archivos import leer_filas
+
+
+class Command(BaseCommand):
+    help = ('Importa matrículas desde un archivo CSV o XLSX con las columnas '
+            'alumno (DNI o código), curso (código), fecha_inicio, fecha_fin, '
+            'estado, calificacion y observaciones')
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo .csv o .xlsx')
+        parser.add_argument('--usuario', required=True,
+                            help='Nombre de usuario que figurará como creador')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                            help='Filas por lote y transacción')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario '{options['usuario']}'.")
+
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                resultado = importar_matriculas(
+                    leer_filas(archivo, options['archivo']), usuario, options['lote']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for fila, mensaje in resultado.errores:
+            self.stderr.write(f'Fila {fila}: {mensaje}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.creadas} matrícula(s) creada(s) de {resultado.procesadas} fila(s); '
+            f'{len(resultado.errores)} con errores.'
+        ))
@@ -0,0 +1,111 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from alumnos.models import Alumno, PalabraAlumno
+from auth_app.estadisticas import sumar_creados
+from cursos.models import Curso
+from matriculas.models import Matricula, CursoSinCupos
+from matriculas.services import guardar_matricula
+
+PREFIJO = 'ESTRES'
+
+
+class Command(BaseCommand):
+    help = ('Prueba de estrés: lanza matrículas concurrentes contra un mismo curso '
+            'y verifica que no se sobrepase el cupo')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=300,
+                            help='Número de matrículas simultáneas a intentar')
+        parser.add_argument('--cupo', type=int, default=50,
+                            help='Cupo máximo del curso de prueba')
+        parser.add_argument('--hilos', type=int, default=32,
+                            help='Número de hilos concurrentes')
+        parser.add_argument('--latencia-max', type=float, default=2.0,
+                            help='Latencia p95 máxima aceptada en segundos')
+        parser.add_argument('--conservar', action='store_true',
+                            help='No eliminar los datos de prueba al terminar')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] == ':memory:':
+            raise CommandError('Se necesita una base de datos compartida entre hilos.')
+
+        usuario, _ = User.objects.get_or_create(username=f'{PREFIJO.lower()}_matriculas')
+        curso, alumnos = self.crear_datos(usuario, options['solicitudes'], options['cupo'])
+
+        def matricular(alumno):
+            inicio = time.perf_counter()
+            try:
+                guardar_matricula(Matricula(
+                    alumno=alumno, curso=curso, fecha_inicio=curso.fecha_inicio,
+                    estado='P', creado_por=usuario
+                ))
+                aceptada = True
+            except CursoSinCupos:
+                aceptada = False
+            finally:
+                connection.close()
+            return aceptada, time.perf_counter() - inicio
+
+        try:
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['hilos']) as pool:
+                resultados = list(pool.map(matricular, alumnos))
+            total = time.perf_counter() - inicio
+
+            curso.refresh_from_db()
+            aceptadas = sum(1 for aceptada, _ in resultados if aceptada)
+            en_bd = Matricula.objects.filter(curso=curso).count()
+            latencias = sorted(latencia for _, latencia in resultados)
+            p95 = latencias[int(len(latencias) * 0.95) - 1]
+
+            self.stdout.write(f'Solicitudes: {len(resultados)} en {total:.2f}s '
+                              f'({len(resultados) / total:.1f} matrículas/s)')
+            self.stdout.write(f'Aceptadas: {aceptadas} | Rechazadas: {len(resultados) - aceptadas}')
+            self.stdout.write(f'Cupo: {curso.cupo_maximo} | Inscritos: {curso.inscritos} | En BD: {en_bd}')
+            self.stdout.write(f'Latencia p50: {statistics.median(latencias) * 1000:.1f}ms | '
+                              f'p95: {p95 * 1000:.1f}ms | máx: {latencias[-1] * 1000:.1f}ms')
+
+            if en_bd > curso.cupo_maximo or curso.inscritos != en_bd or aceptadas != en_bd:
+                raise CommandError('Sobreventa o contador desincronizado.')
+            if p95 > options['latencia_max']:
+                raise CommandError(f'La latencia p95 supera {options["latencia_max"]}s.')
+            self.stdout.write(self.style.SUCCESS('Sin sobreventa de cupos.'))
+        finally:
+            if not options['conservar']:
+                curso.delete()
+                Alumno.objects.filter(codigo_alumno__startswith=f'{PREFIJO}-').delete()
+
+    def crear_datos(self, usuario, solicitudes, cupo):
+        Curso.objects.filter(codigo=f'{PREFIJO}-CURSO').delete()
+        Alumno.objects.filter(codigo_alumno__startswith=f'{PREFIJO}-').delete()
+
+        hoy = date.today()
+        curso = Curso.objects.create(
+            nombre='Curso de prueba de estrés', codigo=f'{PREFIJO}-CURSO',
+            descripcion='Generado por simular_matriculas_concurrentes', duracion=10,
+            precio=0, cupo_maximo=cupo, fecha_inicio=hoy, fecha_fin=hoy + timedelta(days=30),
+            profesor='Prueba', creado_por=usuario
+        )
+        # DNIs que empiezan en 9 para no chocar con alumnos reales de prueba
+        alumnos = [
+            Alumno(
+                dni=f'9{i:07d}', codigo_alumno=f'{PREFIJO}-{i:06d}', nombres='Alumno',
+                apellidos=f'Estrés {i}', fecha_nacimiento=date(2000, 1, 1), genero='O',
+                email=f'estres{i}@example.com', telefono='000000000', direccion='-',
+                fecha_ingreso=hoy, creado_por=usuario
+            )
+            for i in range(solicitudes)
+        ]
+        for alumno in alumnos:
+            alumno.actualizar_busqueda()
+        alumnos = Alumno.objects.bulk_create(alumnos)
+        sumar_creados(alumnos)
+        if not alumnos[0].pk:
+            alumnos = list(Alumno.objects.filter(codigo_alumno__startswith=f'{PREFIJO}-'))
+        PalabraAlumno.sincronizar(alumnos)
+        return curso, alumnos
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 12:10
+
+from django.db import migrations, models
+from sistema_instituto.texto import normalizar_texto
+
+
+def calcular_busqueda(apps, schema_editor):
+    Matricula = apps.get_model('matriculas', 'Matricula')
+    lote = []
+    matriculas = Matricula.objects.select_related('alumno', 'curso').only(
+        'alumno__dni', 'alumno__busqueda', 'curso__codigo', 'curso__nombre'
+    )
+    for matricula in matriculas.iterator(chunk_size=2000):
+        curso = normalizar_texto(f'{matricula.curso.codigo} {matricula.curso.nombre}')
+        matricula.alumno_dni = matricula.alumno.dni
+        matricula.busqueda = f'{matricula.alumno.busqueda} {curso}'[:500]
+        lote.append(matricula)
+        if len(lote) == 2000:
+            Matricula.objects.bulk_update(lote, ['alumno_dni', 'busqueda'])
+            lote = []
+    Matricula.objects.bulk_update(lote, ['alumno_dni', 'busqueda'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0002_alumno_busqueda'),
+        ('matriculas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matricula',
+            name='alumno_dni',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=8, verbose_name='DNI del Alumno'),
+        ),
+        migrations.AddField(
+            model_name='matricula',
+            name='busqueda',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=500, verbose_name='Texto de Búsqueda'),
+        ),
+        migrations.RunPython(calcular_busqueda, migrations.RunPython.noop),
+    ]
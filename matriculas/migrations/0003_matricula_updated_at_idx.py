@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0004_alumno_updated_at_idx'),
+        ('cursos', '0003_curso_updated_at_idx'),
+        ('matriculas', '0002_matricula_busqueda'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(fields=['updated_at', 'id'], name='matriculas__updated_c4827f_idx'),
+        ),
+    ]
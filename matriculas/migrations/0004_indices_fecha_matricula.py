@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0004_alumno_updated_at_idx'),
+        ('cursos', '0003_curso_updated_at_idx'),
+        ('matriculas', '0003_matricula_updated_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(fields=['fecha_matricula'], name='matriculas__fecha_m_e499ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(fields=['estado', 'fecha_matricula'], name='matriculas__estado_12bfc4_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matriculas', '0004_indices_fecha_matricula'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='matricula',
+            name='busqueda',
+        ),
+    ]
@@ -1,8 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.utils import timezone
 from alumnos.models import Alumno
 from cursos.models import Curso
 
+class CursoSinCupos(Exception):
+    """El curso ya no tiene cupos para una nueva matrícula"""
+
+
 class Matricula(models.Model):
     ESTADO_CHOICES = [
         ('P', 'Pendiente'),
@@ -12,6 +18,9 @@ class Matricula(models.Model):
         ('X', 'Cancelada'),
     ]
 
+    # Estados que ocupan un cupo del curso (los retirados y cancelados lo liberan)
+    ESTADOS_CON_CUPO = ['P', 'A', 'C']
+
     alumno = models.ForeignKey(Alumno, on_delete=models.CASCADE, verbose_name="Alumno")
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, verbose_name="Curso")
     fecha_matricula = models.DateField(auto_now_add=True, verbose_name="Fecha de Matrícula")
@@ -20,6 +29,9 @@ class Matricula(models.Model):
     estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='P', verbose_name="Estado")
     calificacion = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, verbose_name="Calificación")
     observaciones = models.TextField(blank=True, null=True, verbose_name="Observaciones")
+
+    # Búsqueda: copia del DNI del alumno (los nombres se buscan en las tablas de palabras)
+    alumno_dni = models.CharField(max_length=8, blank=True, default='', editable=False, db_index=True, verbose_name="DNI del Alumno")
     
     # Auditoría
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
@@ -31,10 +43,47 @@ class Matricula(models.Model):
         verbose_name_plural = "Matrículas"
         unique_together = ['alumno', 'curso']  # Un alumno no puede matricularse dos veces al mismo curso
         ordering = ['-fecha_matricula']
+        indexes = [
+            # Lista e historial ordenados por -fecha_matricula, también filtrados por estado (auditar_consultas)
+            models.Index(fields=['fecha_matricula']),
+            models.Index(fields=['estado', 'fecha_matricula']),
+            # Feed de cambios: recorre por (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.alumno} - {self.curso}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Recordar qué cupo ocupaba la matrícula al cargarse; sin estado o curso
+        # (.only()/.defer()) no se leen aquí fila por fila, sino al guardar
+        if 'estado' in instance.__dict__ and 'curso_id' in instance.__dict__:
+            instance._curso_con_cupo = instance._curso_que_ocupa()
+        # y de qué alumno es la copia del DNI
+        instance._alumno_del_dni = instance.__dict__.get('alumno_id')
+        return instance
+
+    def actualizar_busqueda(self):
+        """Copia el DNI del alumno; llamar antes de bulk_create/bulk_update"""
+        self.alumno_dni = self.alumno.dni
+
+    def ocupa_cupo(self):
+        return self.estado in self.ESTADOS_CON_CUPO
+
+    def _curso_que_ocupa(self):
+        return self.curso_id if self.ocupa_cupo() else None
+
+    def _cupo_guardado(self):
+        """Curso cuyo cupo ocupa la fila guardada; None si es nueva o no ocupa cupo"""
+        if self._state.adding:
+            return None
+        if not hasattr(self, '_curso_con_cupo'):
+            fila = Matricula.objects.filter(pk=self.pk).values_list('estado', 'curso_id').first()
+            self._curso_con_cupo = fila[1] if fila and fila[0] in self.ESTADOS_CON_CUPO else None
+        return self._curso_con_cupo
+
     def esta_activa(self):
         return self.estado == 'A'
 
@@ -51,5 +100,31 @@ class Matricula(models.Model):
         if self.estado == 'A' and not self.fecha_inicio:
             from datetime import date
             self.fecha_inicio = date.today()
-        super().save(*args, **kwargs)
+
+        # Solo al crearla o cambiar de alumno: los cambios de DNI los propaga la señal del alumno
+        if self._state.adding or self.alumno_id != getattr(self, '_alumno_del_dni', None):
+            self.actualizar_busqueda()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'alumno_dni'}
+
+        anterior = self._cupo_guardado()
+        actual = self._curso_que_ocupa()
+        with transaction.atomic():
+            if anterior != actual:
+                # La reserva es un UPDATE condicional: solo incrementa si aún
+                # queda cupo, así dos matrículas simultáneas no pueden sobrepasarlo
+                if actual:
+                    reservado = Curso.objects.filter(
+                        pk=actual, inscritos__lt=F('cupo_maximo')
+                    ).update(inscritos=F('inscritos') + 1, updated_at=timezone.now())
+                    if not reservado:
+                        raise CursoSinCupos("El curso no tiene cupos disponibles.")
+                if anterior:
+                    Curso.objects.filter(pk=anterior, inscritos__gt=0).update(
+                        inscritos=F('inscritos') - 1, updated_at=timezone.now()
+                    )
+            super().save(*args, **kwargs)
+        self._curso_con_cupo = actual
+        self._alumno_del_dni = self.alumno_id
 
@@ -0,0 +1,131 @@
+"""
+Estadísticas del reporte de matrículas, calculadas con agregados SQL y cacheadas.
+
+Cada combinación de filtros se guarda en la caché bajo una versión global que
+se incrementa con cualquier escritura de matrículas o cursos, de modo que los
+resultados obsoletos dejan de usarse sin tener que borrarlos uno por uno.
+"""
+import hashlib
+import time
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import TruncDay, TruncMonth
+from sistema_instituto.replicas import en_principal
+from .models import Matricula
+
+CLAVE_VERSION = 'reporte_matriculas:version'
+DURACION_CACHE = 300
+DIAS_SERIE_DIARIA = 30
+RANGOS_CALIFICACION = [
+    ('0 - 9.99', 0, 10),
+    ('10 - 12.99', 10, 13),
+    ('13 - 16.99', 13, 17),
+    ('17 - 20', 17, None),
+]
+FILTROS = ['estado', 'curso', 'fecha_desde', 'fecha_hasta']
+
+
+def invalidar_reporte():
+    """Descarta todos los reportes cacheados incrementando la versión"""
+    # Misma semilla que cursos.catalogo: si la versión fue expulsada no vuelve a un número ya usado
+    cache.add(CLAVE_VERSION, time.time_ns(), None)
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, time.time_ns(), None)
+
+
+def obtener_reporte(filtros):
+    """Devuelve el reporte para los filtros dados, desde la caché si es posible"""
+    filtros = {clave: filtros.get(clave) or '' for clave in FILTROS}
+    version = cache.get_or_set(CLAVE_VERSION, time.time_ns, None)
+    firma = hashlib.md5(repr(sorted(filtros.items())).encode()).hexdigest()
+    clave = f'reporte_matriculas:{version}:{firma}'
+
+    reporte = cache.get(clave)
+    if reporte is None:
+        with en_principal():
+            reporte = generar_reporte(filtros)
+        cache.set(clave, reporte, DURACION_CACHE)
+    return reporte
+
+
+def filtrar_matriculas(filtros):
+    matriculas = Matricula.objects.all()
+    if filtros.get('estado'):
+        matriculas = matriculas.filter(estado=filtros['estado'])
+    if filtros.get('curso'):
+        matriculas = matriculas.filter(curso_id=filtros['curso'])
+    if filtros.get('fecha_desde'):
+        matriculas = matriculas.filter(fecha_matricula__gte=filtros['fecha_desde'])
+    if filtros.get('fecha_hasta'):
+        matriculas = matriculas.filter(fecha_matricula__lte=filtros['fecha_hasta'])
+    return matriculas.order_by()
+
+
+def generar_reporte(filtros):
+    matriculas = filtrar_matriculas(filtros)
+
+    # Conteos por estado y estadísticas de calificación en una sola consulta
+    agregados = {
+        'total': Count('id'),
+        'promedio': Avg('calificacion'),
+        'minima': Min('calificacion'),
+        'maxima': Max('calificacion'),
+        'calificadas': Count('calificacion'),
+    }
+    for codigo, _ in Matricula.ESTADO_CHOICES:
+        agregados[f'estado_{codigo}'] = Count('id', filter=Q(estado=codigo))
+    for i, (_, desde, hasta) in enumerate(RANGOS_CALIFICACION):
+        rango = Q(calificacion__gte=desde)
+        if hasta is not None:
+            rango &= Q(calificacion__lt=hasta)
+        agregados[f'rango_{i}'] = Count('id', filter=rango)
+    resumen = matriculas.aggregate(**agregados)
+
+    por_curso = [
+        {
+            **fila,
+            'ocupacion': round(100 * fila['curso__inscritos'] / fila['curso__cupo_maximo'], 1)
+            if fila['curso__cupo_maximo'] else 0,
+        }
+        for fila in matriculas.values(
+            'curso_id', 'curso__codigo', 'curso__nombre', 'curso__cupo_maximo', 'curso__inscritos'
+        ).annotate(
+            total=Count('id'),
+            activas=Count('id', filter=Q(estado='A')),
+            promedio=Avg('calificacion'),
+        ).order_by('curso__codigo')
+    ]
+
+    por_mes = list(
+        matriculas.annotate(mes=TruncMonth('fecha_matricula'))
+        .values('mes').annotate(total=Count('id')).order_by('mes')
+    )
+    por_dia = list(
+        matriculas.filter(fecha_matricula__gte=date.today() - timedelta(days=DIAS_SERIE_DIARIA))
+        .annotate(dia=TruncDay('fecha_matricula'))
+        .values('dia').annotate(total=Count('id')).order_by('dia')
+    )
+
+    return {
+        'total': resumen['total'],
+        'por_estado': [
+            {'estado': codigo, 'nombre': nombre, 'total': resumen[f'estado_{codigo}']}
+            for codigo, nombre in Matricula.ESTADO_CHOICES
+        ],
+        'calificaciones': {
+            'promedio': resumen['promedio'],
+            'minima': resumen['minima'],
+            'maxima': resumen['maxima'],
+            'calificadas': resumen['calificadas'],
+            'rangos': [
+                {'rango': nombre, 'total': resumen[f'rango_{i}']}
+                for i, (nombre, _, _) in enumerate(RANGOS_CALIFICACION)
+            ],
+        },
+        'por_curso': por_curso,
+        'por_mes': por_mes,
+        'por_dia': por_dia,
+    }
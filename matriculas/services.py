@@ -0,0 +1,79 @@
+import time
+from django.db import OperationalError, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from cursos.catalogo import invalidar_catalogo
+from cursos.models import Curso
+from .models import Matricula
+from .reportes import invalidar_reporte
+
+# Reintentos ante bloqueos de la base de datos (deadlocks, "database is locked")
+REINTENTOS_MATRICULA = 5
+ESPERA_REINTENTO = 0.02
+
+
+def guardar_matricula(matricula, reintentos=REINTENTOS_MATRICULA):
+    """
+    Guarda una matrícula reservando su cupo de forma atómica.
+
+    Reintenta con espera exponencial cuando la base de datos reporta contención
+    sobre la fila del curso. Si el curso se quedó sin cupos lanza CursoSinCupos
+    y no se guarda nada.
+    """
+    pk, adding = matricula.pk, matricula._state.adding
+
+    def guardar():
+        # Restaurar el estado previo para que un reintento vuelva a insertar
+        matricula.pk, matricula._state.adding = pk, adding
+        matricula.save()
+        return matricula
+
+    return con_reintentos(guardar, reintentos)
+
+
+def con_reintentos(funcion, reintentos=REINTENTOS_MATRICULA):
+    """
+    Llama a funcion() y la repite ante bloqueos de la base de datos. Dentro de
+    una transacción no reintenta: el error la dejó inservible, así que el
+    reintento debe envolver la transacción completa.
+    """
+    for intento in range(reintentos):
+        try:
+            return funcion()
+        except OperationalError:
+            if intento == reintentos - 1 or transaction.get_connection().in_atomic_block:
+                raise
+            time.sleep(ESPERA_REINTENTO * 2 ** intento)
+
+
+def recalcular_inscritos(cursos=None, aplicar=True):
+    """
+    Recalcula el contador de inscritos a partir de las matrículas que ocupan cupo.
+
+    Devuelve una lista de tuplas (curso, inscritos_guardados, inscritos_reales)
+    con los cursos cuyo contador estaba desincronizado.
+    """
+    if cursos is None:
+        cursos = Curso.objects.all()
+
+    cursos = cursos.annotate(
+        inscritos_reales=Count(
+            'matricula',
+            filter=Q(matricula__estado__in=Matricula.ESTADOS_CON_CUPO)
+        )
+    ).order_by()
+
+    desincronizados = [
+        (curso, curso.inscritos, curso.inscritos_reales)
+        for curso in cursos.only('id', 'codigo', 'nombre', 'inscritos')
+        if curso.inscritos != curso.inscritos_reales
+    ]
+
+    if aplicar and desincronizados:
+        with transaction.atomic():
+            for curso, _, reales in desincronizados:
+                Curso.objects.filter(pk=curso.pk).update(inscritos=reales, updated_at=timezone.now())
+            transaction.on_commit(invalidar_reporte)
+            transaction.on_commit(invalidar_catalogo)
+
+    return desincronizados
@@ -0,0 +1,64 @@
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from alumnos.models import Alumno
+from cursos.catalogo import invalidar_catalogo
+from cursos.models import Curso
+from sistema_instituto.bajas import borrado, seguir
+from .busqueda import sincronizar_busqueda
+from .models import Matricula
+from .reportes import invalidar_reporte
+
+seguir(Matricula, Curso)
+
+@receiver(borrado)
+def liberar_cupos(sender, eliminados, **kwargs):
+    """Libera los cupos de las matrículas eliminadas (incluye borrados en cascada), un UPDATE por cantidad liberada"""
+    cursos_eliminados = {curso.pk for curso in eliminados.get(Curso, [])}
+    liberados = Counter(
+        matricula._curso_con_cupo if hasattr(matricula, '_curso_con_cupo') else matricula._curso_que_ocupa()
+        for matricula in eliminados.get(Matricula, [])
+    )
+    por_cantidad = defaultdict(list)
+    for curso_id, cantidad in liberados.items():
+        if curso_id and curso_id not in cursos_eliminados:
+            por_cantidad[cantidad].append(curso_id)
+    for cantidad, cursos in por_cantidad.items():
+        Curso.objects.filter(pk__in=cursos, inscritos__gt=0).update(
+            inscritos=Case(When(inscritos__gte=cantidad, then=F('inscritos') - cantidad), default=Value(0)),
+            updated_at=timezone.now(),
+        )
+
+@receiver(post_save, sender=Alumno)
+def sincronizar_busqueda_alumno(sender, instance, created, raw=False, **kwargs):
+    """Propaga un cambio de DNI del alumno a sus matrículas"""
+    if not created and not raw:
+        sincronizar_busqueda(Matricula.objects.filter(alumno=instance))
+
+@receiver(post_save, sender=Curso)
+def publicar_codigo_curso(sender, instance, created, raw=False, **kwargs):
+    """La API de matrículas publica curso_codigo: un cambio de código debe reflejarse en su updated_at"""
+    if not created and not raw and instance.codigo != getattr(instance, '_codigo_guardado', None):
+        Matricula.objects.filter(curso=instance).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Matricula)
+@receiver(post_save, sender=Curso)
+def invalidar_reporte_matriculas(sender, **kwargs):
+    """Cualquier escritura de matrículas o cursos deja obsoleto el reporte cacheado"""
+    transaction.on_commit(invalidar_reporte)
+
+@receiver(post_save, sender=Matricula)
+def invalidar_catalogo_matriculas(sender, **kwargs):
+    """Las matrículas cambian los cupos que muestra el chatbot"""
+    transaction.on_commit(invalidar_catalogo)
+
+@receiver(borrado)
+def invalidar_caches_bajas(sender, eliminados, **kwargs):
+    """Una sola invalidación por borrado, aunque la cascada se lleve muchas matrículas"""
+    if Matricula in eliminados or Curso in eliminados:
+        transaction.on_commit(invalidar_reporte)
+    if Matricula in eliminados:
+        transaction.on_commit(invalidar_catalogo)
@@ -1,3 +1,384 @@
-from django.test import TestCase
+import io
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from alumnos.models import Alumno
+from auth_app.estadisticas import contadores, reconstruir
+from auth_app.models import Eliminacion
+from cursos.models import Curso
+from sistema_instituto.archivos import leer_filas
+from .importacion import importar_matriculas
+from .models import CursoSinCupos, Matricula
+from .services import guardar_matricula, recalcular_inscritos
 
-# Create your tests here.
+
+def crear_curso(usuario, n, cupo_maximo=50):
+    return Curso.objects.create(
+        nombre=f'Curso {n}', codigo=f'CUR{n}', descripcion='Descripción', nivel='B', duracion=40,
+        precio=100, cupo_maximo=cupo_maximo, fecha_inicio=date(2025, 3, 1), fecha_fin=date(2025, 7, 1),
+        estado='A', profesor='Profesor', creado_por=usuario,
+    )
+
+
+def crear_alumno(usuario, n):
+    return Alumno.objects.create(
+        dni=f'{40000000 + n}', codigo_alumno=f'A{n:04d}', nombres=f'Nombre {n}', apellidos=f'Apellido {n}',
+        fecha_nacimiento=date(2000, 1, 1), genero='F', email=f'alumno{n}@example.com',
+        telefono='999999999', direccion='Lima', fecha_ingreso=date(2024, 3, 1), estado='A',
+        creado_por=usuario,
+    )
+
+
+class ListaMatriculasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='clave', is_staff=True)
+        cursos = [crear_curso(cls.usuario, n) for n in range(3)]
+        for n in range(30):
+            Matricula.objects.create(
+                alumno=crear_alumno(cls.usuario, n), curso=cursos[n % len(cursos)], fecha_inicio=date(2025, 3, 1),
+                estado='AP'[n % 2], creado_por=cls.usuario,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def consultas_lista(self, por_pagina):
+        # Sin caché, para contar también la consulta de los totales
+        cache.clear()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('matriculas:lista_matriculas'), {'por_pagina': por_pagina})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.context['matriculas']), por_pagina)
+        return len(consultas)
+
+    def test_consultas_no_dependen_del_tamano_de_pagina(self):
+        esperadas = self.consultas_lista(5)
+        cache.clear()
+        with self.assertNumQueries(esperadas):
+            respuesta = self.client.get(reverse('matriculas:lista_matriculas'), {'por_pagina': 25})
+        self.assertEqual(len(respuesta.context['matriculas']), 25)
+
+    def buscar(self, texto):
+        respuesta = self.client.get(reverse('matriculas:lista_matriculas'), {'q': texto, 'por_pagina': 200})
+        self.assertEqual(respuesta.status_code, 200)
+        return sorted(matricula.alumno.dni for matricula in respuesta.context['matriculas'])
+
+    def test_busqueda_por_alumno_curso_y_dni(self):
+        # Antes la búsqueda filtraba por campos inexistentes del alumno (alumno__nombre) y fallaba
+        self.assertEqual(self.buscar('Nombre 12'), ['40000012'])
+        self.assertEqual(self.buscar('ápellido 12'), ['40000012'])
+        self.assertEqual(self.buscar('apel 29'), ['40000029'])
+        self.assertEqual(self.buscar('4000001'), [f'400000{n}' for n in range(10, 20)])
+        self.assertEqual(self.buscar('cur1'), [f'{40000000 + n}' for n in range(1, 30, 3)])
+        self.assertEqual(self.buscar('zzz'), [])
+
+    def test_cambio_de_dni_llega_a_las_matriculas(self):
+        alumno = Alumno.objects.get(dni='40000005')
+        alumno.dni = '49999999'
+        alumno.save()
+        self.assertEqual(Matricula.objects.get(alumno=alumno).alumno_dni, '49999999')
+        self.assertEqual(self.buscar('4999'), ['49999999'])
+
+
+class ApiMatriculasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='clave', is_staff=True)
+        cls.curso = crear_curso(cls.usuario, 1)
+        cls.matricula = Matricula.objects.create(
+            alumno=crear_alumno(cls.usuario, 1), curso=cls.curso, fecha_inicio=date(2025, 3, 1),
+            creado_por=cls.usuario,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def revalidar(self, url, etag):
+        return self.client.get(url, {'campos': 'id,curso_codigo'}, HTTP_IF_NONE_MATCH=etag)
+
+    def test_etag_cambia_con_el_codigo_del_curso(self):
+        for url in (reverse('matriculas:api_matriculas'), reverse('matriculas:api_matricula', args=[self.matricula.pk])):
+            with self.subTest(url=url):
+                respuesta = self.client.get(url, {'campos': 'id,curso_codigo'})
+                self.assertEqual(respuesta.status_code, 200)
+                etag = respuesta['ETag']
+                self.assertEqual(self.revalidar(url, etag).status_code, 304)
+
+                curso = Curso.objects.get(pk=self.curso.pk)
+                curso.codigo = f'{curso.codigo}X'
+                curso.save()
+                respuesta = self.revalidar(url, etag)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertIn(curso.codigo, respuesta.content.decode())
+                self.assertEqual(self.revalidar(url, respuesta['ETag']).status_code, 304)
+
+    def test_otros_cambios_del_curso_no_tocan_las_matriculas(self):
+        antes = Matricula.objects.get(pk=self.matricula.pk).updated_at
+        curso = Curso.objects.get(pk=self.curso.pk)
+        curso.profesor = 'Otro profesor'
+        curso.save()
+        self.assertEqual(Matricula.objects.get(pk=self.matricula.pk).updated_at, antes)
+
+
+@override_settings(CAMBIOS_MARGEN_SEGUNDOS=0)
+class CambiosMatriculasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='clave', is_staff=True)
+        cls.cursos = [crear_curso(cls.usuario, n) for n in range(2)]
+        cls.matriculas = [
+            Matricula.objects.create(
+                alumno=crear_alumno(cls.usuario, n), curso=cls.cursos[n % 2], fecha_inicio=date(2025, 3, 1),
+                creado_por=cls.usuario,
+            )
+            for n in range(5)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def recorrer(self, **parametros):
+        """Sigue "siguiente" hasta el final; devuelve (filas, eliminados, marca)"""
+        respuesta = self.client.get(reverse('matriculas:api_matriculas_cambios'), {'campos': 'id,curso_codigo', **parametros})
+        filas, eliminados = [], []
+        while True:
+            self.assertEqual(respuesta.status_code, 200)
+            pagina = respuesta.json()
+            filas += pagina['datos']
+            eliminados += pagina['eliminados']
+            if not pagina['siguiente']:
+                return filas, eliminados, pagina['marca']
+            respuesta = self.client.get(pagina['siguiente'])
+
+    def test_paginas_con_el_mismo_updated_at(self):
+        # Todas con la misma marca: el cursor desempata por id sin repetir ni saltarse filas
+        Matricula.objects.update(updated_at=timezone.now())
+        filas, eliminados, _ = self.recorrer(por_pagina=2)
+        self.assertEqual([fila[0] for fila in filas], sorted(m.pk for m in self.matriculas))
+        self.assertEqual(eliminados, [])
+
+    def test_desde_la_marca_solo_llega_lo_nuevo(self):
+        _, _, marca = self.recorrer()
+        self.assertEqual(self.recorrer(desde=marca)[:2], ([], []))
+
+        matricula = Matricula.objects.get(pk=self.matriculas[0].pk)
+        matricula.estado = 'A'
+        matricula.save()
+        filas, _, nueva_marca = self.recorrer(desde=marca)
+        self.assertEqual([fila[0] for fila in filas], [matricula.pk])
+        self.assertGreater(nueva_marca, marca)
+
+    def test_cambio_de_codigo_del_curso_reenvia_sus_matriculas(self):
+        _, _, marca = self.recorrer()
+        curso = Curso.objects.get(pk=self.cursos[1].pk)
+        curso.codigo = 'NUEVO1'
+        curso.save()
+        filas, _, _ = self.recorrer(desde=marca)
+        esperadas = sorted([m.pk, 'NUEVO1'] for m in self.matriculas if m.curso_id == curso.pk)
+        self.assertEqual(sorted(filas), esperadas)
+
+    def test_eliminaciones(self):
+        _, _, marca = self.recorrer()
+        eliminada = self.matriculas[2]
+        Matricula.objects.get(pk=eliminada.pk).delete()
+        # En cascada: las matrículas del curso eliminado también dejan su registro
+        Curso.objects.get(pk=self.cursos[1].pk).delete()
+        filas, eliminados, _ = self.recorrer(desde=marca, por_pagina=1)
+        self.assertEqual(filas, [])
+        self.assertEqual(sorted(eliminados), sorted(
+            {eliminada.pk} | {m.pk for m in self.matriculas if m.curso_id == self.cursos[1].pk}
+        ))
+        # Ya informadas, no se repiten desde la marca siguiente
+        _, _, marca = self.recorrer()
+        self.assertEqual(self.recorrer(desde=marca)[1], [])
+
+
+class ImportacionMatriculasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', password='clave')
+        cls.curso = crear_curso(cls.usuario, 1)
+        cls.lleno = crear_curso(cls.usuario, 2, cupo_maximo=1)
+        cls.alumnos = [crear_alumno(cls.usuario, n) for n in range(4)]
+
+    def importar(self, csv, tamano_lote=1000):
+        return importar_matriculas(leer_filas(io.BytesIO(csv.encode()), 'matriculas.csv'), self.usuario, tamano_lote)
+
+    def test_filas_validas(self):
+        resultado = self.importar(
+            'alumno;curso;fecha_inicio;estado;calificacion\n'
+            '40000000;cur1;01/04/2025;a;15,5\n'
+            'A0001;CUR1;;P;\n'
+        )
+        self.assertEqual((resultado.procesadas, resultado.creadas, resultado.errores), (2, 2, []))
+        primera = Matricula.objects.get(alumno=self.alumnos[0])
+        self.assertEqual((primera.estado, primera.fecha_inicio, str(primera.calificacion)), ('A', date(2025, 4, 1), '15.50'))
+        self.assertEqual(primera.alumno_dni, '40000000')
+        # Sin fecha_inicio se usa la del curso
+        self.assertEqual(Matricula.objects.get(alumno=self.alumnos[1]).fecha_inicio, self.curso.fecha_inicio)
+        self.assertEqual(Curso.objects.get(pk=self.curso.pk).inscritos, 2)
+
+    def test_duplicadas(self):
+        Matricula.objects.create(alumno=self.alumnos[0], curso=self.curso, fecha_inicio=date(2025, 3, 1), creado_por=self.usuario)
+        resultado = self.importar(
+            'alumno,curso\n'
+            '40000000,CUR1\n'
+            '40000001,CUR1\n'
+            'A0001,CUR1\n',
+            tamano_lote=2,
+        )
+        self.assertEqual(resultado.creadas, 1)
+        self.assertEqual(resultado.errores, [
+            (2, 'Este alumno ya está matriculado en este curso.'),
+            (4, 'Este alumno ya está matriculado en este curso.'),
+        ])
+
+    def test_filas_invalidas_no_detienen_la_importacion(self):
+        Alumno.objects.filter(pk=self.alumnos[3].pk).update(estado='I')
+        resultado = self.importar(
+            'alumno,curso,fecha_inicio,fecha_fin,estado,calificacion\n'
+            ',CUR1,,,,\n'
+            '99999999,CUR1,,,,\n'
+            '40000003,CUR1,,,,\n'
+            '40000000,CUR9,,,,\n'
+            '40000000,CUR1,,,Z,\n'
+            '40000000,CUR1,2025-13-01,,,\n'
+            '40000000,CUR1,2025-04-01,2025-03-01,,\n'
+            '40000000,CUR1,,,,25\n'
+            '40000000,CUR1,,,,\n'
+        )
+        self.assertEqual(resultado.creadas, 1)
+        self.assertEqual([numero for numero, _ in resultado.errores], [2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertTrue(Matricula.objects.filter(alumno=self.alumnos[0], curso=self.curso).exists())
+
+    def test_fila_rechazada_no_bloquea_la_siguiente_del_mismo_par(self):
+        Matricula.objects.create(alumno=self.alumnos[0], curso=self.lleno, fecha_inicio=date(2025, 3, 1), estado='A', creado_por=self.usuario)
+        for tamano_lote in (1000, 1):
+            with self.subTest(tamano_lote=tamano_lote):
+                Matricula.objects.filter(alumno=self.alumnos[1]).delete()
+                # La primera no tiene cupo; la retirada no lo necesita y debe importarse
+                resultado = self.importar('alumno,curso,estado\n40000001,CUR2,A\n40000001,CUR2,R\n', tamano_lote)
+                self.assertEqual(resultado.creadas, 1)
+                self.assertEqual(resultado.errores, [(2, 'El curso no tiene cupos disponibles.')])
+                self.assertEqual(Matricula.objects.get(alumno=self.alumnos[1]).estado, 'R')
+
+
+class CuposTests(TransactionTestCase):
+    """Sin la transacción de TestCase: cada reserva confirma como en producción"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_superuser('admin', password='clave')
+        self.curso = crear_curso(self.usuario, 1, cupo_maximo=2)
+        self.otro_curso = crear_curso(self.usuario, 2, cupo_maximo=5)
+        self.alumnos = [crear_alumno(self.usuario, n) for n in range(4)]
+
+    def matricular(self, alumno, curso=None, estado='A'):
+        return guardar_matricula(Matricula(
+            alumno=alumno, curso=curso or self.curso, fecha_inicio=date(2025, 3, 1), estado=estado,
+            creado_por=self.usuario,
+        ))
+
+    def inscritos(self, curso):
+        return Curso.objects.get(pk=curso.pk).inscritos
+
+    def test_no_se_sobrepasa_el_cupo_maximo(self):
+        self.matricular(self.alumnos[0])
+        self.matricular(self.alumnos[1], estado='P')
+        with self.assertRaises(CursoSinCupos):
+            self.matricular(self.alumnos[2])
+        self.assertEqual(self.inscritos(self.curso), 2)
+        self.assertFalse(Matricula.objects.filter(alumno=self.alumnos[2]).exists())
+        # Retirada no ocupa cupo: se puede registrar con el curso lleno
+        self.matricular(self.alumnos[2], estado='R')
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+    def test_inscritos_sigue_estado_curso_y_bajas(self):
+        primera = self.matricular(self.alumnos[0])
+        segunda = self.matricular(self.alumnos[1])
+
+        primera.estado = 'X'
+        guardar_matricula(primera)
+        self.assertEqual(self.inscritos(self.curso), 1)
+        primera = Matricula.objects.get(pk=primera.pk)
+        primera.estado = 'P'
+        guardar_matricula(primera)
+        self.assertEqual(self.inscritos(self.curso), 2)
+
+        segunda = Matricula.objects.get(pk=segunda.pk)
+        segunda.curso = self.otro_curso
+        guardar_matricula(segunda)
+        self.assertEqual((self.inscritos(self.curso), self.inscritos(self.otro_curso)), (1, 1))
+
+        # Volver a un curso lleno no pierde el cupo que ya tenía
+        tercera = self.matricular(self.alumnos[2])
+        segunda.curso = self.curso
+        with self.assertRaises(CursoSinCupos):
+            guardar_matricula(segunda)
+        self.assertEqual((self.inscritos(self.curso), self.inscritos(self.otro_curso)), (2, 1))
+
+        Matricula.objects.get(pk=tercera.pk).delete()
+        self.assertEqual(self.inscritos(self.curso), 1)
+        self.alumnos[0].delete()  # en cascada
+        self.assertEqual(self.inscritos(self.curso), 0)
+        self.assertEqual(recalcular_inscritos(aplicar=False), [])
+
+    def test_baja_en_cascada_no_trabaja_por_fila(self):
+        cursos = [self.otro_curso] + [crear_curso(self.usuario, n) for n in range(3, 7)]
+        for curso in cursos:
+            self.matricular(self.alumnos[0], curso)
+        self.matricular(self.alumnos[1], self.otro_curso)
+        self.matricular(self.alumnos[1], self.curso, estado='R')
+        self.matricular(self.alumnos[2], self.otro_curso, estado='P')
+        # TransactionTestCase vacía las tablas, también la fila global de Estadistica
+        reconstruir()
+        antes = contadores()
+
+        # Mismas consultas con dos matrículas que con cinco, incluidas las de on_commit
+        with CaptureQueriesContext(connection) as con_dos:
+            self.alumnos[1].delete()
+        with CaptureQueriesContext(connection) as con_cinco:
+            self.alumnos[0].delete()
+        self.assertEqual(len(con_cinco), len(con_dos))
+
+        # En otro_curso sigue el cupo de la matrícula pendiente; la retirada no liberó nada
+        self.assertEqual([self.inscritos(curso) for curso in cursos], [1, 0, 0, 0, 0])
+        self.assertEqual(self.inscritos(self.curso), 0)
+        self.assertEqual(contadores()['total_matriculas'], antes['total_matriculas'] - 7)
+        self.assertEqual(contadores()['total_alumnos'], antes['total_alumnos'] - 2)
+        self.assertEqual(contadores(self.usuario)['total_matriculas'], antes['total_matriculas'] - 7)
+        self.assertEqual(Eliminacion.objects.filter(modelo='matriculas.matricula').count(), 7)
+        self.assertEqual(Eliminacion.objects.filter(modelo='alumnos.alumno').count(), 2)
+        self.assertEqual(recalcular_inscritos(aplicar=False), [])
+
+    def test_carga_parcial_no_consulta_fila_por_fila(self):
+        primera = self.matricular(self.alumnos[0])
+        self.matricular(self.alumnos[1], estado='P')
+        with self.assertNumQueries(1):
+            matriculas = list(Matricula.objects.only('id', 'observaciones'))
+        # El cupo que ocupaba se consulta al guardar: no se reserva otra vez
+        matriculas[0].observaciones = 'Sin cambios de cupo'
+        matriculas[0].save()
+        self.assertEqual(self.inscritos(self.curso), 2)
+        diferida = Matricula.objects.only('id').get(pk=primera.pk)
+        diferida.estado = 'R'
+        diferida.save()
+        self.assertEqual(self.inscritos(self.curso), 1)
+
+    def test_admin_muestra_el_curso_lleno_en_el_formulario(self):
+        self.matricular(self.alumnos[0])
+        self.matricular(self.alumnos[1])
+        self.client.force_login(self.usuario)
+        respuesta = self.client.post(reverse('admin:matriculas_matricula_add'), {
+            'alumno': self.alumnos[2].pk, 'curso': self.curso.pk, 'fecha_inicio': '2025-03-01',
+            'estado': 'A', 'creado_por': self.usuario.pk,
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('El curso no tiene cupos disponibles.', respuesta.context['adminform'].form.non_field_errors())
+        self.assertEqual(self.inscritos(self.curso), 2)
+        self.assertFalse(Matricula.objects.filter(alumno=self.alumnos[2]).exists())
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'matriculas'
 
@@ -7,6 +7,7 @@ urlpatterns = [
     # Lista y creación de matrículas
     path('', views.lista_matriculas, name='lista_matriculas'),
     path('nueva/', views.nueva_matricula, name='nueva_matricula'),
+    path('importar/', views.importar_matriculas, name='importar_matriculas'),
     
     # Detalle, edición y eliminación
     path('<int:matricula_id>/', views.detalle_matricula, name='detalle_matricula'),
@@ -17,4 +18,10 @@ urlpatterns = [
     path('procesar/<int:matricula_id>/', views.procesar_matricula, name='procesar_matricula'),
     path('historial/', views.historial_matriculas, name='historial_matriculas'),
     path('reporte/', views.reporte_matriculas, name='reporte_matriculas'),
+    path('exportar/', views.exportar_matriculas, name='exportar_matriculas'),
+
+    # API JSON de solo lectura
+    path('api/', api.lista, name='api_matriculas'),
+    path('api/cambios/', api.cambios, name='api_matriculas_cambios'),
+    path('api/<int:matricula_id>/', api.detalle, name='api_matricula'),
 ]
\ No newline at end of file
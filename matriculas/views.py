@@ -1,15 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from .models import Matricula
-from .forms import MatriculaForm
+from django.db.models import Count, Q
+from django.http import HttpResponse
+from django.utils.dateparse import parse_date
+import csv
+from .models import Matricula, CursoSinCupos
+from .forms import MatriculaForm, ImportarMatriculasForm
+from .busqueda import buscar_matriculas
+from .importacion import importar_matriculas as importar_archivo_matriculas
+from .reportes import filtrar_matriculas, obtener_reporte
+from .services import guardar_matricula
+from sistema_instituto.archivos import leer_filas
+from sistema_instituto.exportacion import Columna, respuesta_exportacion
+from sistema_instituto.paginacion import conteo_cacheado, paginar_keyset
+from sistema_instituto.replicas import lectura_en_replica
+
+ORDEN_MATRICULAS = ['-fecha_matricula', '-id']
+
+COLUMNAS_EXPORTACION = [
+    Columna('DNI', 'alumno__dni'),
+    Columna('Código de Alumno', 'alumno__codigo_alumno'),
+    Columna('Apellidos', 'alumno__apellidos'),
+    Columna('Nombres', 'alumno__nombres'),
+    Columna('Código del Curso', 'curso__codigo'),
+    Columna('Curso', 'curso__nombre'),
+    Columna('Fecha de Matrícula', 'fecha_matricula'),
+    Columna('Fecha de Inicio', 'fecha_inicio'),
+    Columna('Fecha de Fin', 'fecha_fin'),
+    Columna('Estado', 'estado', Matricula.ESTADO_CHOICES),
+    Columna('Calificación', 'calificacion'),
+]
 
 @login_required
+@lectura_en_replica
 def lista_matriculas(request):
     
     """Lista todas las matrículas con filtros y búsqueda"""
-    matriculas = Matricula.objects.select_related('alumno', 'curso').all()
+    # Todo lo que la plantilla muestra por fila sale de este único JOIN:
+    # los cupos del curso se leen de la columna Curso.inscritos
+    matriculas = Matricula.objects.select_related('alumno', 'curso', 'creado_por').all()
     
     # Filtros
     estado = request.GET.get('estado')
@@ -23,38 +53,34 @@ def lista_matriculas(request):
     # Búsqueda
     query = request.GET.get('q')
     if query:
-        matriculas = matriculas.filter(
-            Q(alumno__nombre__icontains=query) |
-            Q(alumno__apellido_paterno__icontains=query) |
-            Q(alumno__apellido_materno__icontains=query) |
-            Q(alumno__dni__icontains=query) |
-            Q(curso__nombre__icontains=query) |
-            Q(curso__codigo__icontains=query)
-        )
+        matriculas = buscar_matriculas(matriculas, query)
     
     # Obtener cursos para el filtro
     from cursos.models import Curso
     cursos = Curso.objects.all()
     
-    # Estadísticas
-    total_matriculas = matriculas.count()
-    matriculas_activas = matriculas.filter(estado='A').count()
-    matriculas_pendientes = matriculas.filter(estado='P').count()
+    # Estadísticas (una sola consulta, cacheada por filtros)
+    conteos = conteo_cacheado(
+        matriculas,
+        total_matriculas=Count('id'),
+        matriculas_activas=Count('id', filter=Q(estado='A')),
+        matriculas_pendientes=Count('id', filter=Q(estado='P')),
+    )
+    pagina = paginar_keyset(matriculas, ORDEN_MATRICULAS, request)
     
     context = {
-        'matriculas': matriculas,
+        'matriculas': pagina,
+        'pagina': pagina,
         'cursos': cursos,  # Agregar cursos al contexto
         'titulo': 'Lista de Matrículas',
-        'total_matriculas': total_matriculas,
-        'matriculas_activas': matriculas_activas,
-        'matriculas_pendientes': matriculas_pendientes,
+        **conteos,
     }
     return render(request, 'matriculas/lista_matriculas.html', context)
 
 @login_required
 def detalle_matricula(request, matricula_id):
     """Muestra los detalles de una matrícula específica"""
-    matricula = get_object_or_404(Matricula.objects.select_related('alumno', 'curso'), id=matricula_id)
+    matricula = get_object_or_404(Matricula.objects.select_related('alumno', 'curso', 'creado_por'), id=matricula_id)
     context = {
         'matricula': matricula,
         'titulo': f'Detalle - Matrícula #{matricula.id}'
@@ -69,9 +95,14 @@ def nueva_matricula(request):
         if form.is_valid():
             matricula = form.save(commit=False)
             matricula.creado_por = request.user
-            matricula.save()
-            messages.success(request, f'Matrícula creada exitosamente para {matricula.alumno.nombre_completo()} en {matricula.curso.nombre}!')
-            return redirect('matriculas:lista_matriculas')
+            try:
+                guardar_matricula(matricula)
+            except CursoSinCupos as e:
+                form.add_error('curso', str(e))
+                messages.error(request, 'Por favor corrige los errores en el formulario.')
+            else:
+                messages.success(request, f'Matrícula creada exitosamente para {matricula.alumno.nombre_completo()} en {matricula.curso.nombre}!')
+                return redirect('matriculas:lista_matriculas')
         else:
             messages.error(request, 'Por favor corrige los errores en el formulario.')
     else:
@@ -84,6 +115,37 @@ def nueva_matricula(request):
     }
     return render(request, 'matriculas/form_matricula.html', context)
 
+@login_required
+def importar_matriculas(request):
+    """Importa matrículas masivamente desde un archivo CSV o XLSX"""
+    resultado = None
+    if request.method == 'POST':
+        form = ImportarMatriculasForm(request.POST, request.FILES)
+        if form.is_valid():
+            archivo = form.cleaned_data['archivo']
+            try:
+                resultado = importar_archivo_matriculas(
+                    leer_filas(archivo.file, archivo.name), request.user
+                )
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                if resultado.errores:
+                    messages.warning(request, f'Se importaron {resultado.creadas} matrículas; {len(resultado.errores)} filas tienen errores.')
+                else:
+                    messages.success(request, f'Se importaron {resultado.creadas} matrículas exitosamente!')
+        else:
+            messages.error(request, 'Por favor corrige los errores en el formulario.')
+    else:
+        form = ImportarMatriculasForm()
+
+    context = {
+        'form': form,
+        'resultado': resultado,
+        'titulo': 'Importar Matrículas'
+    }
+    return render(request, 'matriculas/importar_matriculas.html', context)
+
 @login_required
 def editar_matricula(request, matricula_id):
     """Edita una matrícula existente"""
@@ -96,9 +158,14 @@ def editar_matricula(request, matricula_id):
     if request.method == 'POST':
         form = MatriculaForm(request.POST, instance=matricula)
         if form.is_valid():
-            matricula_editada = form.save()
-            messages.success(request, f'Matrícula actualizada exitosamente!')
-            return redirect('matriculas:detalle_matricula', matricula_id=matricula.id)
+            try:
+                guardar_matricula(form.save(commit=False))
+            except CursoSinCupos as e:
+                form.add_error('curso', str(e))
+                messages.error(request, 'Por favor corrige los errores en el formulario.')
+            else:
+                messages.success(request, f'Matrícula actualizada exitosamente!')
+                return redirect('matriculas:detalle_matricula', matricula_id=matricula.id)
         else:
             messages.error(request, 'Por favor corrige los errores en el formulario.')
     else:
@@ -136,24 +203,110 @@ def procesar_matricula(request, matricula_id):
     
     if matricula.estado == 'P':
         matricula.estado = 'A'
-        matricula.save()
-        messages.success(request, f'Matrícula activada exitosamente!')
+        try:
+            guardar_matricula(matricula)
+        except CursoSinCupos as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'Matrícula activada exitosamente!')
     else:
         messages.warning(request, 'La matrícula ya está activa o no puede ser procesada.')
     
     return redirect('matriculas:detalle_matricula', matricula_id=matricula.id)
 
 @login_required
+@lectura_en_replica
 def historial_matriculas(request):
     """Muestra el historial de matrículas con más filtros"""
-    matriculas = Matricula.objects.select_related('alumno', 'curso').all().order_by('-fecha_matricula')
+    matriculas = Matricula.objects.select_related('alumno', 'curso')
+    pagina = paginar_keyset(matriculas, ORDEN_MATRICULAS, request)
     
     context = {
-        'matriculas': matriculas,
+        'matriculas': pagina,
+        'pagina': pagina,
         'titulo': 'Historial de Matrículas'
     }
     return render(request, 'matriculas/historial_matriculas.html', context)
 
 @login_required
+@lectura_en_replica
 def reporte_matriculas(request):
-    pass
\ No newline at end of file
+    """Reporte de matrículas: estados, ocupación por curso, calificaciones y evolución"""
+    filtros = _filtros_reporte(request)
+    reporte = obtener_reporte(filtros)
+
+    if request.GET.get('formato') == 'csv':
+        return _reporte_matriculas_csv(reporte)
+
+    from cursos.models import Curso
+    context = {
+        'reporte': reporte,
+        'filtros': filtros,
+        'cursos': Curso.objects.only('id', 'codigo', 'nombre').order_by('codigo'),
+        'estados': Matricula.ESTADO_CHOICES,
+        'titulo': 'Reporte de Matrículas',
+    }
+    return render(request, 'matriculas/reporte_matriculas.html', context)
+
+def _filtros_reporte(request):
+    """Filtros del reporte validados; los valores inválidos se ignoran"""
+    filtros = {
+        'estado': request.GET.get('estado', ''),
+        'curso': request.GET.get('curso', ''),
+        'fecha_desde': request.GET.get('fecha_desde', ''),
+        'fecha_hasta': request.GET.get('fecha_hasta', ''),
+    }
+    if not filtros['curso'].isdigit():
+        filtros['curso'] = ''
+    for campo in ['fecha_desde', 'fecha_hasta']:
+        try:
+            if filtros[campo] and not parse_date(filtros[campo]):
+                filtros[campo] = ''
+        except ValueError:
+            filtros[campo] = ''
+    return filtros
+
+@login_required
+@lectura_en_replica
+def exportar_matriculas(request):
+    """Descarga en CSV o XLSX las matrículas con los filtros de la lista o del reporte"""
+    matriculas = filtrar_matriculas(_filtros_reporte(request))
+    query = request.GET.get('q')
+    if query:
+        matriculas = buscar_matriculas(matriculas, query)
+    return respuesta_exportacion(matriculas, COLUMNAS_EXPORTACION, 'matriculas', request.GET.get('formato'))
+
+def _reporte_matriculas_csv(reporte):
+    response = HttpResponse(content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="reporte_matriculas.csv"'
+    response.write('\ufeff')  # BOM para que Excel reconozca UTF-8
+    writer = csv.writer(response)
+
+    writer.writerow(['Matrículas por estado'])
+    writer.writerow(['Estado', 'Total'])
+    for fila in reporte['por_estado']:
+        writer.writerow([fila['nombre'], fila['total']])
+    writer.writerow(['Total', reporte['total']])
+    writer.writerow([])
+
+    writer.writerow(['Ocupación por curso'])
+    writer.writerow(['Código', 'Curso', 'Matrículas', 'Activas', 'Inscritos', 'Cupo máximo', 'Ocupación (%)', 'Promedio'])
+    for fila in reporte['por_curso']:
+        writer.writerow([
+            fila['curso__codigo'], fila['curso__nombre'], fila['total'], fila['activas'],
+            fila['curso__inscritos'], fila['curso__cupo_maximo'], fila['ocupacion'],
+            round(fila['promedio'], 2) if fila['promedio'] is not None else '',
+        ])
+    writer.writerow([])
+
+    writer.writerow(['Distribución de calificaciones'])
+    writer.writerow(['Rango', 'Total'])
+    for fila in reporte['calificaciones']['rangos']:
+        writer.writerow([fila['rango'], fila['total']])
+    writer.writerow([])
+
+    writer.writerow(['Matrículas por mes'])
+    writer.writerow(['Mes', 'Total'])
+    for fila in reporte['por_mes']:
+        writer.writerow([fila['mes'].strftime('%Y-%m'), fila['total']])
+    return response
\ No newline at end of file
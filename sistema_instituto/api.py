@@ -0,0 +1,250 @@
+"""
+API JSON de solo lectura para integraciones.
+
+Cada app declara un Recurso (modelo, campos publicables y filtros) en su
+módulo api.py y expone dos vistas: la lista y el detalle.
+
+    GET /alumnos/api/?campos=id,dni,apellidos&estado=A&por_pagina=200
+    GET /alumnos/api/?despues=1234          (página siguiente: ids mayores a 1234)
+    GET /alumnos/api/15/?campos=dni,email
+
+- Solo se leen las columnas pedidas en ?campos= (values_list); sin el
+  parámetro se usan los campos por defecto del recurso.
+- Las páginas se recorren por id (keyset): pedir la página 1000 cuesta lo
+  mismo que la primera. "siguiente" trae la URL de la próxima página.
+- La lista responde en columnas, sin repetir los nombres en cada fila:
+  {"campos": ["id", "dni"], "datos": [[1, "12345678"], ...], "siguiente": "..."}
+- ETag y Last-Modified salen de los pares (id, updated_at) de la página,
+  que se consultan primero: si el cliente envía If-None-Match y nada cambió
+  se responde 304 con una sola consulta liviana y sin leer las filas. Las
+  listas no envían Last-Modified: borrar una fila no cambia el updated_at
+  más reciente de la página, y un cliente que solo mandara If-Modified-Since
+  recibiría un 304 con la fila borrada; el ETag sí cambia.
+
+Feed de cambios para sincronizar (GET /alumnos/api/cambios/?desde=<marca>):
+devuelve las filas con updated_at en (desde, marca] ordenadas por
+(updated_at, id) y los ids eliminados en ese lapso (tabla Eliminacion). El
+cliente sigue "siguiente" hasta que sea null y guarda "marca" para la
+próxima vez. La marca queda CAMBIOS_MARGEN_SEGUNDOS por detrás del reloj
+para no saltarse filas de transacciones que aún no confirmaron.
+
+Usa la sesión de Django para autenticar, como el resto del sistema.
+"""
+import datetime
+import hashlib
+from calendar import timegm
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+from functools import wraps
+from .paginacion import obtener_por_pagina
+
+PARAMETROS_JSON = {'separators': (',', ':'), 'ensure_ascii': False}
+MARGEN_CAMBIOS = 60
+
+
+class ErrorApi(Exception):
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def respuesta_error(mensaje, estado):
+    return JsonResponse({'error': mensaje}, status=estado, json_dumps_params=PARAMETROS_JSON)
+
+
+def vista_api(vista):
+    """Solo GET/HEAD, usuario autenticado y errores como JSON en lugar de redirecciones"""
+    @require_safe
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return respuesta_error('Se requiere iniciar sesión.', 401)
+        try:
+            return vista(request, *args, **kwargs)
+        except ErrorApi as error:
+            return respuesta_error(str(error), error.estado)
+    return envoltura
+
+
+def fin_ventana_cambios():
+    """Hasta dónde se puede leer el feed sin perder filas de transacciones en curso"""
+    margen = getattr(settings, 'CAMBIOS_MARGEN_SEGUNDOS', MARGEN_CAMBIOS)
+    return timezone.now() - datetime.timedelta(seconds=margen)
+
+
+def formatear_marca(momento):
+    return momento.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def leer_marca(valor, parametro):
+    if not valor:
+        return None
+    try:
+        momento = parse_datetime(valor)
+    except ValueError:
+        momento = None
+    if momento is None:
+        raise ErrorApi(f'"{parametro}" debe ser una fecha y hora ISO 8601.')
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
+
+
+class Recurso:
+    def __init__(self, modelo, campos, por_defecto, filtros=None):
+        self.modelo = modelo
+        # nombre público -> ruta ORM (permite 'curso__codigo' sin exponer el modelo)
+        self.campos = campos
+        self.por_defecto = por_defecto
+        # parámetro GET -> lookup ORM
+        self.filtros = filtros or {}
+
+    def listar(self, request):
+        campos = self._campos(request)
+        queryset = self._filtrar(request)
+        por_pagina = obtener_por_pagina(request)
+        despues = request.GET.get('despues')
+        if despues:
+            if not despues.isdigit():
+                raise ErrorApi('"despues" debe ser un id.')
+            queryset = queryset.filter(pk__gt=int(despues))
+
+        claves = list(queryset.order_by('pk').values_list('pk', 'updated_at')[:por_pagina + 1])
+        hay_mas = len(claves) > por_pagina
+        claves = claves[:por_pagina]
+        no_modificada, etag, ultima = self._condicional(request, (campos, hay_mas), claves, con_fecha=False)
+        if no_modificada:
+            return self._encabezados(no_modificada, etag, ultima)
+
+        datos = []
+        if claves:
+            # La misma página por rango de ids; el filtro se repite por si una fila dejó de cumplirlo
+            datos = list(
+                queryset.filter(pk__gte=claves[0][0], pk__lte=claves[-1][0])
+                .order_by('pk').values_list(*(self.campos[campo] for campo in campos))
+            )
+        siguiente = None
+        if hay_mas:
+            parametros = request.GET.copy()
+            parametros['despues'] = claves[-1][0]
+            siguiente = f'{request.path}?{parametros.urlencode()}'
+        response = JsonResponse(
+            {'campos': campos, 'datos': datos, 'siguiente': siguiente},
+            json_dumps_params=PARAMETROS_JSON,
+        )
+        return self._encabezados(response, etag, ultima)
+
+    def detalle(self, request, pk):
+        campos = self._campos(request)
+        rutas = [self.campos[campo] for campo in campos]
+        fila = self.modelo.objects.filter(pk=pk).values_list('updated_at', *rutas).first()
+        if fila is None:
+            raise ErrorApi('No existe.', 404)
+        no_modificada, etag, ultima = self._condicional(request, campos, [(pk, fila[0])])
+        if no_modificada:
+            return self._encabezados(no_modificada, etag, ultima)
+        response = JsonResponse(dict(zip(campos, fila[1:])), json_dumps_params=PARAMETROS_JSON)
+        return self._encabezados(response, etag, ultima)
+
+    def cambios(self, request):
+        campos = self._campos(request)
+        por_pagina = obtener_por_pagina(request)
+        desde = leer_marca(request.GET.get('desde'), 'desde')
+        # Las páginas siguientes traen el mismo "hasta" para que la ventana no se mueva
+        hasta = min(filter(None, [leer_marca(request.GET.get('hasta'), 'hasta'), fin_ventana_cambios()]))
+        if desde and desde > hasta:
+            hasta = desde
+        despues = request.GET.get('despues')
+        if despues:
+            marca, _, pk = despues.rpartition(',')
+            if not marca or not pk.isdigit():
+                raise ErrorApi('"despues" no es válido.')
+            despues = (leer_marca(marca, 'despues'), int(pk))
+
+        filas = self.leer_cambios(campos, desde, hasta, despues, por_pagina + 1)
+        hay_mas = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        siguiente = None
+        if hay_mas:
+            parametros = request.GET.copy()
+            parametros['hasta'] = formatear_marca(hasta)
+            parametros['despues'] = f'{formatear_marca(filas[-1][0])},{filas[-1][1]}'
+            siguiente = f'{request.path}?{parametros.urlencode()}'
+        return JsonResponse({
+            'campos': campos,
+            'datos': [fila[2:] for fila in filas],
+            # Las bajas van completas en la primera página de la ventana
+            'eliminados': [] if despues else list(self.eliminados(desde, hasta)),
+            'marca': formatear_marca(hasta),
+            'siguiente': siguiente,
+        }, json_dumps_params=PARAMETROS_JSON)
+
+    def leer_cambios(self, campos, desde, hasta, despues=None, limite=None):
+        """Filas (updated_at, id, *campos) modificadas en (desde, hasta], a partir del cursor (updated_at, id)"""
+        queryset = self.modelo.objects.filter(updated_at__lte=hasta)
+        if desde:
+            queryset = queryset.filter(updated_at__gt=desde)
+        if despues:
+            momento, pk = despues
+            queryset = queryset.filter(Q(updated_at__gt=momento) | Q(updated_at=momento, pk__gt=pk))
+        queryset = queryset.order_by('updated_at', 'pk').values_list(
+            'updated_at', 'pk', *(self.campos[campo] for campo in campos)
+        )
+        return list(queryset[:limite] if limite else queryset)
+
+    def eliminados(self, desde, hasta):
+        from auth_app.models import Eliminacion
+
+        queryset = Eliminacion.objects.filter(modelo=self.modelo._meta.label_lower, eliminado_en__lte=hasta)
+        if desde:
+            queryset = queryset.filter(eliminado_en__gt=desde)
+        return queryset.order_by('eliminado_en').values_list('objeto_id', flat=True)
+
+    def _campos(self, request):
+        pedidos = request.GET.get('campos')
+        if not pedidos:
+            return self.por_defecto
+        campos = list(dict.fromkeys(campo.strip() for campo in pedidos.split(',') if campo.strip()))
+        desconocidos = [campo for campo in campos if campo not in self.campos]
+        if desconocidos:
+            raise ErrorApi(f'Campos desconocidos: {", ".join(desconocidos)}. '
+                           f'Disponibles: {", ".join(self.campos)}.')
+        return campos or self.por_defecto
+
+    def _filtrar(self, request):
+        queryset = self.modelo.objects.all()
+        for parametro, lookup in self.filtros.items():
+            valor = request.GET.get(parametro)
+            if not valor:
+                continue
+            campo = self.modelo._meta.get_field(lookup.split('__')[0])
+            try:
+                valor = campo.to_python(valor)
+            except ValidationError:
+                raise ErrorApi(f'Valor no válido para "{parametro}".')
+            queryset = queryset.filter(**{lookup: valor})
+        return queryset
+
+    def _condicional(self, request, variante, claves, con_fecha=True):
+        """(respuesta 304 o None, etag, última modificación) para las filas (id, updated_at)"""
+        firma = hashlib.md5(repr((variante, claves)).encode()).hexdigest()
+        # Débil: la página se vuelve a leer después y no es byte a byte la misma garantizada
+        etag = 'W/' + quote_etag(firma)
+        ultima = max((updated_at for _, updated_at in claves), default=None) if con_fecha else None
+        marca = int(timegm(ultima.utctimetuple())) if ultima else None
+        return get_conditional_response(request, etag=etag, last_modified=marca), etag, marca
+
+    def _encabezados(self, response, etag, marca):
+        response['ETag'] = etag
+        if marca is not None:
+            response['Last-Modified'] = http_date(marca)
+        # El cliente puede guardar la respuesta pero debe revalidarla siempre
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
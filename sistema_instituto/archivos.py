@@ -0,0 +1,113 @@
+"""
+Lectura en streaming de archivos tabulares (CSV o XLSX) para las importaciones masivas.
+"""
+import csv
+import datetime
+import io
+from itertools import islice
+
+FORMATOS_FECHA = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y']
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.procesadas = 0
+        self.creadas = 0
+        self.actualizadas = 0
+        self.errores = []
+
+    def agregar_error(self, fila, mensaje):
+        self.errores.append((fila, mensaje))
+
+
+def leer_filas(archivo, nombre=None):
+    """
+    Itera las filas de un archivo CSV o XLSX como tuplas (numero_fila, dict).
+
+    Las claves del diccionario son los encabezados normalizados a minúsculas.
+    El archivo se lee de forma incremental, sin cargarlo completo en memoria.
+    """
+    nombre = (nombre or getattr(archivo, 'name', '') or '').lower()
+    if nombre.endswith('.xlsx'):
+        return _leer_xlsx(archivo)
+    return _leer_csv(archivo)
+
+
+def en_lotes(iterable, tamano):
+    """Agrupa un iterable en listas de como máximo `tamano` elementos"""
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+def parsear_fecha(valor, campo):
+    """Convierte una celda (texto, date o datetime) a date; None si está vacía"""
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, datetime.datetime):
+        return valor.date()
+    if isinstance(valor, datetime.date):
+        return valor
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.datetime.strptime(str(valor).strip(), formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Fecha no válida en {campo}: '{valor}'.")
+
+
+def _normalizar_encabezado(valor):
+    return str(valor or '').strip().lower()
+
+
+def _leer_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    # Excel en español suele exportar con ';' como separador
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+
+    lector = csv.reader(texto, dialecto)
+    encabezados = [_normalizar_encabezado(c) for c in next(lector, [])]
+    try:
+        for numero, valores in enumerate(lector, start=2):
+            if any(v.strip() for v in valores):
+                yield numero, dict(zip(encabezados, (v.strip() for v in valores)))
+    finally:
+        # No cerrar el archivo subyacente al liberar el envoltorio de texto
+        texto.detach()
+
+
+def _leer_xlsx(archivo):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Para importar archivos XLSX se necesita instalar openpyxl.")
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [_normalizar_encabezado(c) for c in next(filas, ())]
+        for numero, valores in enumerate(filas, start=2):
+            if any(v not in (None, '') for v in valores):
+                yield numero, {clave: _valor_celda(valor) for clave, valor in zip(encabezados, valores)}
+    finally:
+        libro.close()
+
+
+def _valor_celda(valor):
+    """
+    Texto recortado y números como texto, igual que en un CSV: Excel guarda un
+    DNI o teléfono escrito sin apóstrofo como número (12345678 o 12345678.0).
+    Las fechas se dejan como date/datetime para parsear_fecha.
+    """
+    if isinstance(valor, str):
+        return valor.strip()
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return str(valor)
+    return valor
@@ -0,0 +1,225 @@
+"""
+Auditoría de patrones de consulta: qué columnas filtran (WHERE) y ordenan
+(ORDER BY) las consultas que realmente emiten las vistas, cómo las resuelve
+el motor (EXPLAIN) y qué índice compuesto las cubriría.
+
+Se usa desde "manage.py auditar_consultas", que visita las vistas y agrupa
+lo capturado aquí por forma de consulta. El análisis del SQL es deliberadamente
+simple: está pensado para el SQL que genera el ORM (columnas calificadas como
+"tabla"."columna") y solo mira la tabla principal de cada consulta.
+
+Regla para recomendar un índice: primero las columnas comparadas por
+igualdad, después las del ORDER BY (si van todas en el mismo sentido) o, si
+no hay orden, la primera comparada por rango. El id final se omite porque
+SQLite (rowid) e InnoDB (clave primaria) ya lo agregan a cada índice. Las
+columnas cuyo valor en la consulta abarca más de FRACCION_MAXIMA de la tabla
+no se usan (estado='A' en alumnos: un índice que empieza por ahí solo
+agrega lecturas y hace que el motor ordene en lugar de recorrer en orden).
+"""
+import re
+from django.db import connections
+
+RE_TABLA = re.compile(r'\bFROM\s+[`"](\w+)[`"]', re.IGNORECASE)
+RE_COLUMNA = re.compile(r'[`"](\w+)[`"]\.[`"](\w+)[`"]')
+RE_COMPARACION = re.compile(
+    r'[`"](\w+)[`"]\.[`"](\w+)[`"]\s*(=|<>|!=|>=|<=|<|>|IN\b|NOT IN\b|LIKE\b|IS\b|BETWEEN\b)',
+    re.IGNORECASE,
+)
+RE_FIN_WHERE = re.compile(r'\s(GROUP BY|ORDER BY|LIMIT|HAVING)\s', re.IGNORECASE)
+RE_FIN_ORDER = re.compile(r'\s(LIMIT|OFFSET|FOR UPDATE)\s', re.IGNORECASE)
+RE_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+IGUALDAD = {'=', 'IN', 'IS'}
+# Tipos de acceso de EXPLAIN en MySQL que leen solo las filas encontradas por un índice
+ACCESO_MYSQL = {'const', 'eq_ref', 'ref', 'ref_or_null', 'range'}
+NO_INDEXABLE = {'LIKE', '<>', '!=', 'NOT IN'}
+# Operadores cuyo valor es un único parámetro y se puede contar con un COUNT(*)
+COMPARABLES = {'=', '<', '>', '<=', '>='}
+FRACCION_MAXIMA = 0.3
+
+
+class Forma:
+    """WHERE y ORDER BY de una consulta sobre su tabla principal"""
+
+    def __init__(self, tabla, igualdad, rango, no_indexables, orden, predicados=()):
+        self.tabla = tabla
+        self.igualdad = igualdad
+        self.rango = rango
+        self.no_indexables = no_indexables
+        # [(columna, descendente)]
+        self.orden = orden
+        # [(columna, operador, posición del parámetro)] de las comparaciones simples
+        self.predicados = list(predicados)
+
+    def clave(self):
+        return (self.tabla, tuple(self.igualdad), tuple(self.rango), tuple(self.no_indexables), tuple(self.orden))
+
+    def describir(self):
+        partes = []
+        condiciones = ([f'{c}=' for c in self.igualdad] + [f'{c}<>' for c in self.rango]
+                       + [f'{c}~' for c in self.no_indexables])
+        if condiciones:
+            partes.append('WHERE ' + ', '.join(condiciones))
+        if self.orden:
+            partes.append('ORDER BY ' + ', '.join(c + (' DESC' if d else '') for c, d in self.orden))
+        return ' '.join(partes) or '(sin filtros ni orden)'
+
+    def filtra_u_ordena(self):
+        return bool(self.igualdad or self.rango or self.orden)
+
+    def indice_recomendado(self, poco_selectivas=()):
+        """Columnas del índice compuesto que resolvería la consulta, o None"""
+        if 'id' in self.igualdad:
+            # Búsqueda por clave primaria: a lo sumo unas pocas filas
+            return None
+        columnas = [c for c in self.igualdad if c not in poco_selectivas]
+        orden = [(c, d) for c, d in self.orden if c not in self.igualdad]
+        rango = [c for c in self.rango if c not in poco_selectivas]
+        if orden and len({d for _, d in orden}) == 1:
+            columnas += [c for c, _ in orden]
+        elif rango:
+            columnas.append(rango[0])
+        if columnas and columnas[-1] == 'id':
+            columnas.pop()
+        return columnas or None
+
+
+def forma_consulta(sql):
+    """Forma de la consulta (Forma) o None si no es un SELECT con tabla"""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    encontrada = RE_TABLA.search(sql)
+    if encontrada is None:
+        return None
+    tabla = encontrada.group(1)
+
+    where = ''
+    inicio = sql.upper().find(' WHERE ', encontrada.end())
+    if inicio != -1:
+        fin = RE_FIN_WHERE.search(sql, inicio)
+        where = sql[inicio:fin.start() if fin else len(sql)]
+    operadores = {}
+    predicados = []
+    for comparacion in RE_COMPARACION.finditer(sql, inicio, inicio + len(where)) if where else ():
+        tabla_columna, columna, operador = comparacion.groups()
+        if tabla_columna != tabla:
+            continue
+        operador = ' '.join(operador.upper().split())
+        operadores.setdefault(columna, set()).add(operador)
+        if operador in COMPARABLES and sql[comparacion.end():].lstrip().startswith('%s'):
+            predicados.append((columna, operador, sql[:comparacion.start()].count('%s')))
+
+    igualdad, rango, no_indexables = [], [], []
+    for columna, usados in operadores.items():
+        if usados & NO_INDEXABLE:
+            no_indexables.append(columna)
+        elif usados <= IGUALDAD:
+            igualdad.append(columna)
+        else:
+            # En un cursor keyset la misma columna aparece con = y con < / >
+            rango.append(columna)
+
+    orden = []
+    inicio = sql.upper().rfind(' ORDER BY ')
+    if inicio != -1:
+        fin = RE_FIN_ORDER.search(sql, inicio)
+        for termino in sql[inicio + 10:fin.start() if fin else len(sql)].split(','):
+            columna = RE_COLUMNA.search(termino)
+            if columna is None or columna.group(1) != tabla:
+                # Ordenar por otra tabla o por una expresión: ningún índice de esta tabla sirve
+                orden = []
+                break
+            orden.append((columna.group(2), termino.strip().upper().endswith('DESC')))
+    # Una columna comparada varias veces (cursor keyset) no se puede medir con un solo COUNT
+    predicados = [p for p in predicados if len(operadores[p[0]]) == 1
+                  and sum(1 for otro in predicados if otro[0] == p[0]) == 1]
+    return Forma(tabla, igualdad, rango, no_indexables, orden, predicados)
+
+
+def normalizar_sql(sql):
+    """SQL sin valores literales, para agrupar consultas que solo difieren en ellos"""
+    return RE_LITERAL.sub('?', ' '.join(sql.split()))
+
+
+def explicar(sql, params, tabla, filtrada=True, using='default'):
+    """
+    (plan, problemas) de la consulta según el motor.
+
+    problemas puede incluir 'recorrido completo' (lee toda la tabla principal),
+    'orden temporal' (ordena en memoria o en disco en lugar de leer en orden
+    de índice) y 'orden tras búsqueda' (ordena solo las filas que encontró un
+    índice: aceptable si son pocas). Si la consulta no filtra la tabla
+    principal (filtrada=False) una búsqueda por índice solo puede venir de un
+    JOIN y recorre igual todas las filas. Con un motor no soportado devuelve ([], None).
+    """
+    connection = connections[using]
+    problemas = []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = [fila[3] for fila in cursor.fetchall()]
+            busqueda = filtrada and any(re.match(rf'SEARCH {tabla}\b', detalle) for detalle in plan)
+            for detalle in plan:
+                if re.match(rf'SCAN {tabla}\b(?!.*\bINDEX\b)', detalle):
+                    problemas.append('recorrido completo')
+                if 'TEMP B-TREE' in detalle:
+                    problemas.append('orden tras búsqueda' if busqueda else 'orden temporal')
+        elif connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            nombres = [columna[0] for columna in cursor.description]
+            filas = [dict(zip(nombres, fila)) for fila in cursor.fetchall()]
+            plan = [f'{f["table"]}: type={f["type"]} key={f["key"]} rows={f["rows"]} {f["Extra"] or ""}'.strip()
+                    for f in filas]
+            busqueda = filtrada and any(f['table'] == tabla and f['type'] in ACCESO_MYSQL for f in filas)
+            for fila in filas:
+                if fila['table'] == tabla and fila['type'] == 'ALL':
+                    problemas.append('recorrido completo')
+                if 'filesort' in (fila['Extra'] or ''):
+                    problemas.append('orden tras búsqueda' if busqueda else 'orden temporal')
+        else:
+            return [], None
+    return plan, sorted(set(problemas))
+
+
+def contar_filas(tabla, using='default'):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(tabla)}')
+        return cursor.fetchone()[0]
+
+
+def poco_selectivas(forma, params, total, using='default'):
+    """Columnas cuya condición en la consulta abarca más de FRACCION_MAXIMA de las filas"""
+    if not total:
+        return set()
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columnas = set()
+    with connection.cursor() as cursor:
+        for columna, operador, posicion in forma.predicados:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {quote(forma.tabla)} WHERE {quote(columna)} {operador} %s',
+                [params[posicion]],
+            )
+            if cursor.fetchone()[0] / total > FRACCION_MAXIMA:
+                columnas.add(columna)
+    return columnas
+
+
+def indices_existentes(tabla, using='default'):
+    """Listas de columnas de cada índice (incluidas claves únicas y primaria) de la tabla"""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        restricciones = connection.introspection.get_constraints(cursor, tabla)
+    return [datos['columns'] for datos in restricciones.values()
+            if (datos['index'] or datos['unique'] or datos['primary_key']) and datos['columns']]
+
+
+def cubierto(columnas, existentes):
+    """True si algún índice existente empieza por las columnas pedidas"""
+    return any(list(indice[:len(columnas)]) == list(columnas) for indice in existentes)
+
+
+def consolidar(indices):
+    """Quita los índices que son prefijo de otro de la lista: el más largo también los resuelve"""
+    indices = sorted(set(map(tuple, indices)))
+    return [indice for indice in indices if not cubierto(indice, [otro for otro in indices if otro != indice])]
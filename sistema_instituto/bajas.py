@@ -0,0 +1,71 @@
+"""
+Señal `borrado`: una por cada delete(), con todas las filas que borró
+(también las de las cascadas), para que contadores, tombstones, cupos y
+cachés se actualicen con unas pocas consultas y no con varias por fila.
+
+Django envía el pre_delete de todas las filas antes de borrar y después el
+post_delete de cada una, todo dentro de la transacción del delete(). El lote
+se arma con los pre_delete y se entrega con el último post_delete, todavía
+dentro de esa transacción.
+
+Solo se siguen los modelos pasados a seguir(): escuchar pre_delete o
+post_delete de un modelo impide que Django lo borre en cascada con un único
+DELETE, así que no se escucha a todos.
+"""
+from collections import defaultdict
+from contextvars import ContextVar
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import Signal
+
+# Argumentos: eliminados ({modelo: [instancias]}) y using (alias de la base)
+borrado = Signal()
+
+
+class Lote:
+    def __init__(self, origen, using):
+        self.origen = origen
+        self.using = using
+        # (modelo, pk) -> instancia; pendientes espera su post_delete
+        self.pendientes = {}
+        self.eliminados = {}
+
+    def entregar(self):
+        eliminados = defaultdict(list)
+        for (modelo, _), instancia in self.eliminados.items():
+            eliminados[modelo].append(instancia)
+        borrado.send(sender=None, eliminados=dict(eliminados), using=self.using)
+
+
+_LOTE = ContextVar('lote_bajas', default=None)
+
+
+def seguir(*modelos):
+    """Agrupa los borrados de estos modelos en la señal borrado (se puede llamar más de una vez)"""
+    for modelo in modelos:
+        etiqueta = modelo._meta.label_lower
+        pre_delete.connect(_antes_de_borrar, sender=modelo, dispatch_uid=f'bajas_pre_{etiqueta}')
+        post_delete.connect(_despues_de_borrar, sender=modelo, dispatch_uid=f'bajas_post_{etiqueta}')
+
+
+def _antes_de_borrar(sender, instance, using, origin=None, **kwargs):
+    lote = _LOTE.get()
+    # Un lote de otro delete(), o de uno que falló después de empezar a borrar, se descarta
+    if lote is None or lote.origen is not origin or lote.eliminados:
+        lote = Lote(origin, using)
+        _LOTE.set(lote)
+    lote.pendientes[(sender, instance.pk)] = instance
+
+
+def _despues_de_borrar(sender, instance, using, **kwargs):
+    lote = _LOTE.get()
+    clave = (sender, instance.pk)
+    if lote is None or clave not in lote.pendientes:
+        # Sin su pre_delete: se entrega sola
+        lote = Lote(None, using)
+        lote.eliminados[clave] = instance
+        lote.entregar()
+        return
+    lote.eliminados[clave] = lote.pendientes.pop(clave)
+    if not lote.pendientes:
+        _LOTE.set(None)
+        lote.entregar()
@@ -0,0 +1,141 @@
+"""
+Pool de conexiones para los backends de MySQL y SQLite.
+
+Django solo trae pool propio para PostgreSQL. Para el resto ofrece conexiones
+persistentes (CONN_MAX_AGE), que se guardan una por hilo: sirven con WSGI y
+un número fijo de hilos, pero bajo ASGI o con hilos que se crean y destruyen
+cada conexión termina cerrándose y abriéndose de nuevo.
+
+Con ENGINE = 'sistema_instituto.bd.mysql' (o 'sistema_instituto.bd.sqlite3')
+cerrar la conexión al final de la petición la devuelve a un pool del proceso
+en lugar de cerrarla, y la próxima petición de cualquier hilo la reutiliza
+tras comprobar que sigue viva. Se usa con CONN_MAX_AGE = 0: la vida de la
+conexión la maneja el pool, no el hilo.
+
+Claves opcionales en DATABASES['default']:
+    POOL_MAXIMO = 10          # conexiones libres que se conservan; las demás se cierran
+    POOL_INACTIVIDAD = 300    # segundos sin uso tras los que una conexión libre se descarta
+                              # (debe ser menor que wait_timeout de MySQL)
+"""
+import os
+import threading
+import time
+from collections import deque
+
+POOL_MAXIMO = 10
+POOL_INACTIVIDAD = 300
+
+# Motor de Django -> mismo motor con pool, para elegirlo desde settings o benchmarks
+MOTORES_CON_POOL = {
+    'django.db.backends.mysql': 'sistema_instituto.bd.mysql',
+    'django.db.backends.sqlite3': 'sistema_instituto.bd.sqlite3',
+}
+
+
+class PoolConexiones:
+    """Conexiones libres del proceso para un alias; seguro entre hilos"""
+
+    def __init__(self, maximo, inactividad):
+        self.maximo = maximo
+        self.inactividad = inactividad
+        self.libres = deque()
+        self.candado = threading.Lock()
+        self.pid = os.getpid()
+
+    def tomar(self):
+        """Una conexión libre reciente, o None; las vencidas se devuelven aparte para cerrarlas"""
+        vencidas = []
+        limite = time.monotonic() - self.inactividad
+        with self.candado:
+            while self.libres:
+                conexion, devuelta = self.libres.pop()
+                if devuelta >= limite:
+                    return conexion, vencidas
+                vencidas.append(conexion)
+        return None, vencidas
+
+    def devolver(self, conexion):
+        """True si la conexión quedó en el pool; False si está lleno y hay que cerrarla"""
+        with self.candado:
+            if len(self.libres) >= self.maximo:
+                return False
+            self.libres.append((conexion, time.monotonic()))
+            return True
+
+    def vaciar(self):
+        with self.candado:
+            libres, self.libres = list(self.libres), deque()
+        for conexion, _ in libres:
+            _cerrar(conexion)
+
+
+_POOLS = {}
+_CANDADO_POOLS = threading.Lock()
+
+
+def obtener_pool(alias, settings_dict):
+    with _CANDADO_POOLS:
+        pool = _POOLS.get(alias)
+        # Tras un fork (p. ej. gunicorn --preload) las conexiones del padre no se comparten
+        if pool is None or pool.pid != os.getpid():
+            pool = _POOLS[alias] = PoolConexiones(
+                settings_dict.get('POOL_MAXIMO', POOL_MAXIMO),
+                settings_dict.get('POOL_INACTIVIDAD', POOL_INACTIVIDAD),
+            )
+        return pool
+
+
+def vaciar_pools():
+    with _CANDADO_POOLS:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.vaciar()
+
+
+def _cerrar(conexion):
+    try:
+        conexion.close()
+    except Exception:
+        pass
+
+
+class ConexionesReutilizables:
+    """Mezcla para DatabaseWrapper: toma conexiones del pool y las devuelve al cerrar"""
+
+    def get_new_connection(self, conn_params):
+        pool = obtener_pool(self.alias, self.settings_dict)
+        while True:
+            conexion, vencidas = pool.tomar()
+            for vencida in vencidas:
+                _cerrar(vencida)
+            if conexion is None:
+                return super().get_new_connection(conn_params)
+            if self._sigue_viva(conexion):
+                return conexion
+            _cerrar(conexion)
+
+    def _sigue_viva(self, conexion):
+        try:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Una conexión con errores o cerrada a mitad de una transacción no se reutiliza
+        if self.errors_occurred or self.in_atomic_block:
+            return super()._close()
+        try:
+            # Descarta cualquier transacción abierta antes de prestarla a otra petición
+            self.connection.rollback()
+        except self.Database.Error:
+            return super()._close()
+        if not obtener_pool(self.alias, self.settings_dict).devolver(self.connection):
+            return super()._close()
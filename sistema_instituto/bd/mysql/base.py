@@ -0,0 +1,6 @@
+from django.db.backends.mysql import base
+from .. import ConexionesReutilizables
+
+
+class DatabaseWrapper(ConexionesReutilizables, base.DatabaseWrapper):
+    pass
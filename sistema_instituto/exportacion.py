@@ -0,0 +1,190 @@
+"""
+Exportación en streaming de querysets a CSV o XLSX.
+
+Las filas se leen con values_list en lotes por clave primaria (cada lote es
+una consulta "pk > último ORDER BY pk LIMIT n"): con MySQL, .iterator() no
+usa cursores del lado del servidor y mysqlclient cargaría todo el resultado
+en memoria. Cada lote se escribe y se envía antes de leer el siguiente, así
+que la descarga empieza de inmediato y la memoria no depende del total.
+
+El XLSX se arma a mano (un único worksheet con celdas inlineStr dentro de
+un zip escrito en secuencia) porque openpyxl necesita terminar el archivo
+antes de poder enviarlo.
+
+Bajo ASGI Django consume los iteradores síncronos completos antes de
+responder; el streaming real requiere servir con WSGI.
+"""
+import csv
+import datetime
+import io
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+TAMANO_LOTE = 2000
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+# Caracteres que Excel interpreta como inicio de fórmula
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+CONTROL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class Columna:
+    def __init__(self, encabezado, campo, etiquetas=None):
+        self.encabezado = encabezado
+        self.campo = campo
+        # Para campos con choices: valor guardado -> texto que se muestra
+        self.etiquetas = dict(etiquetas) if etiquetas else None
+
+    def valor(self, dato):
+        if self.etiquetas is not None:
+            return self.etiquetas.get(dato, dato)
+        return dato
+
+
+def respuesta_exportacion(queryset, columnas, nombre, formato='csv'):
+    """StreamingHttpResponse con las columnas indicadas de cada fila del queryset"""
+    if formato not in FORMATOS:
+        formato = 'csv'
+    filas = filas_por_lotes(queryset, columnas)
+    encabezados = [columna.encabezado for columna in columnas]
+    contenido = _csv(encabezados, filas) if formato == 'csv' else _xlsx(encabezados, filas)
+
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    fecha = timezone.localdate().isoformat()
+    response['Content-Disposition'] = f'attachment; filename="{nombre}_{fecha}.{formato}"'
+    return response
+
+
+def filas_por_lotes(queryset, columnas, tamano=TAMANO_LOTE):
+    """Lotes (listas) de filas ya convertidas, recorriendo el queryset por clave primaria"""
+    consulta = queryset.order_by('pk').values_list('pk', *(columna.campo for columna in columnas))
+    ultimo = None
+    while True:
+        lote = list((consulta if ultimo is None else consulta.filter(pk__gt=ultimo))[:tamano])
+        if not lote:
+            return
+        yield [[columna.valor(dato) for columna, dato in zip(columnas, fila[1:])] for fila in lote]
+        if len(lote) < tamano:
+            return
+        ultimo = lote[-1][0]
+
+
+def _csv(encabezados, lotes):
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    salida.write('\ufeff')  # BOM para que Excel reconozca UTF-8
+    escritor.writerow(encabezados)
+    for lote in lotes:
+        escritor.writerows([[_texto_csv(dato) for dato in fila] for fila in lote])
+        yield salida.getvalue()
+        salida.seek(0)
+        salida.truncate()
+    yield salida.getvalue()
+
+
+def _texto_csv(dato):
+    if dato is None:
+        return ''
+    if isinstance(dato, str) and dato.startswith(INICIO_FORMULA):
+        return "'" + dato
+    return dato
+
+
+class _Salida:
+    """Destino no posicionable para ZipFile: acumula lo escrito hasta que se retira"""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        datos = b''.join(self.partes)
+        self.partes = []
+        return datos
+
+
+PARTES_XLSX = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Datos" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+INICIO_HOJA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+FIN_HOJA = '</sheetData></worksheet>'
+
+
+def _xlsx(encabezados, lotes):
+    salida = _Salida()
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as libro:
+        for nombre, contenido in PARTES_XLSX.items():
+            libro.writestr(nombre, contenido)
+        with libro.open('xl/worksheets/sheet1.xml', 'w') as hoja:
+            hoja.write((INICIO_HOJA + _fila_xml(encabezados)).encode())
+            for lote in lotes:
+                hoja.write(''.join(_fila_xml(fila) for fila in lote).encode())
+                yield salida.retirar()
+            hoja.write(FIN_HOJA.encode())
+    yield salida.retirar()
+
+
+def _fila_xml(fila):
+    return '<row>' + ''.join(_celda_xml(dato) for dato in fila) + '</row>'
+
+
+def _celda_xml(dato):
+    if dato is None or dato == '':
+        return '<c/>'
+    if isinstance(dato, bool):
+        return f'<c t="b"><v>{int(dato)}</v></c>'
+    if isinstance(dato, (int, float, Decimal)):
+        return f'<c><v>{dato}</v></c>'
+    if isinstance(dato, (datetime.date, datetime.datetime)):
+        # Sin hoja de estilos las fechas numéricas se verían como números de serie
+        dato = dato.isoformat()
+    texto = escape(CONTROL_XML.sub('', str(dato)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
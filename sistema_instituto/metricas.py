@@ -0,0 +1,268 @@
+"""
+Métricas por vista: tiempo total, cantidad y tiempo de consultas SQL y
+consultas repetidas (el síntoma de un N+1).
+
+Es opcional: se activa agregando 'sistema_instituto.metricas.MetricasMiddleware'
+a MIDDLEWARE. Cada petición se mide hasta que se cierra su respuesta, así las
+consultas que hacen los cuerpos en streaming (exportaciones, SSE del chatbot)
+se cuentan en su vista. Los datos se acumulan en la memoria de cada proceso en
+histogramas de cubetas fijas (memoria constante sin importar cuántas
+peticiones se midan), se consultan como JSON en /metricas/ (solo staff) y
+se escriben en el log 'sistema_instituto.metricas' cada
+METRICAS_INTERVALO_LOG segundos.
+
+Configuración opcional en settings:
+    METRICAS_INTERVALO_LOG = 300     # segundos entre volcados al log; 0 los desactiva
+    METRICAS_UMBRAL_REPETIDAS = 5    # repeticiones de una misma consulta que se marcan
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_LOG = 300
+UMBRAL_REPETIDAS = 5
+LARGO_SQL = 300
+
+# Límites superiores de las cubetas; la última cubeta no tiene límite
+CUBETAS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+CUBETAS_CONSULTAS = [0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610, 1000]
+
+
+class Histograma:
+    """Conteos por cubeta; los percentiles se estiman con el límite de la cubeta"""
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)
+        self.total = 0
+        self.suma = 0
+        self.maximo = 0
+
+    def agregar(self, valor):
+        self.conteos[bisect.bisect_left(self.limites, valor)] += 1
+        self.total += 1
+        self.suma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def percentil(self, p):
+        if not self.total:
+            return None
+        objetivo = p / 100 * self.total
+        acumulado = 0
+        for indice, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                # La cubeta abierta del final solo se acota por el máximo visto
+                limite = self.limites[indice] if indice < len(self.limites) else self.maximo
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def resumen(self, decimales=1):
+        if not self.total:
+            return {}
+        return {
+            'p50': round(self.percentil(50), decimales),
+            'p95': round(self.percentil(95), decimales),
+            'p99': round(self.percentil(99), decimales),
+            'max': round(self.maximo, decimales),
+            'promedio': round(self.suma / self.total, decimales),
+        }
+
+
+class MetricaVista:
+    def __init__(self):
+        self.solicitudes = 0
+        self.errores = 0
+        self.tiempo = Histograma(CUBETAS_MS)
+        self.consultas = Histograma(CUBETAS_CONSULTAS)
+        self.tiempo_sql = Histograma(CUBETAS_MS)
+        self.con_repetidas = 0
+        self.duplicadas = 0
+        self.peor_repetida = (0, '')
+
+    def agregar(self, duracion_ms, registro, estado):
+        self.solicitudes += 1
+        if estado >= 500:
+            self.errores += 1
+        self.tiempo.agregar(duracion_ms)
+        self.consultas.agregar(registro.cantidad)
+        self.tiempo_sql.agregar(registro.tiempo * 1000)
+        self.duplicadas += registro.duplicadas()
+        veces, sql = registro.mas_repetida()
+        if veces >= umbral_repetidas():
+            self.con_repetidas += 1
+        if veces > self.peor_repetida[0]:
+            self.peor_repetida = (veces, sql[:LARGO_SQL])
+
+    def resumen(self):
+        return {
+            'solicitudes': self.solicitudes,
+            'errores': self.errores,
+            'tiempo_ms': self.tiempo.resumen(),
+            'consultas': self.consultas.resumen(),
+            'tiempo_sql_ms': self.tiempo_sql.resumen(),
+            'consultas_duplicadas': self.duplicadas,
+            'solicitudes_con_repetidas': self.con_repetidas,
+            'consulta_mas_repetida': {'veces': self.peor_repetida[0], 'sql': self.peor_repetida[1]},
+        }
+
+
+class RegistroConsultas:
+    """execute_wrapper que cuenta y cronometra las consultas de una petición"""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.tiempo = 0.0
+        self.exactas = Counter()
+        self.plantillas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo += time.perf_counter() - inicio
+            self.cantidad += 1
+            self.plantillas[sql] += 1
+            self.exactas[(sql, None if many else repr(params))] += 1
+
+    def duplicadas(self):
+        """Consultas idénticas (mismo SQL y parámetros) ejecutadas de más"""
+        return sum(veces - 1 for veces in self.exactas.values())
+
+    def mas_repetida(self):
+        """(veces, sql) de la consulta con más ejecuciones, con cualquier parámetro"""
+        if not self.plantillas:
+            return 0, ''
+        sql, veces = self.plantillas.most_common(1)[0]
+        return veces, sql
+
+
+_METRICAS = {}
+_CANDADO = threading.Lock()
+_INICIO = timezone.now()
+_ULTIMO_VOLCADO = time.monotonic()
+
+
+def umbral_repetidas():
+    return getattr(settings, 'METRICAS_UMBRAL_REPETIDAS', UMBRAL_REPETIDAS)
+
+
+class MetricasMiddleware:
+    # Bajo ASGI no obliga a pasar las vistas asíncronas (chatbot) por un hilo
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = Medicion(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            medicion.terminar()
+            raise
+        return medicion.esperar_cierre(response)
+
+    async def __acall__(self, request):
+        medicion = Medicion(request)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            medicion.terminar()
+            raise
+        return medicion.esperar_cierre(response)
+
+
+class Medicion:
+    """Consultas y tiempo de una petición, desde que entra hasta que se cierra su respuesta"""
+
+    def __init__(self, request):
+        self.request = request
+        self.registro = RegistroConsultas()
+        self.inicio = time.perf_counter()
+        self.estado = 500
+        self.pila = ExitStack()
+        for conexion in connections.all():
+            self.pila.enter_context(conexion.execute_wrapper(self.registro))
+
+    def esperar_cierre(self, response):
+        # El servidor llama a close() después de enviar el cuerpo, también el de streaming
+        self.estado = response.status_code
+        response._resource_closers.append(self.terminar)
+        return response
+
+    def terminar(self):
+        if self.pila is None:
+            return
+        self.pila.close()
+        self.pila = None
+        duracion_ms = (time.perf_counter() - self.inicio) * 1000
+        coincidencia = getattr(self.request, 'resolver_match', None)
+        vista = coincidencia.view_name if coincidencia else '(sin vista)'
+        registrar(vista, duracion_ms, self.registro, self.estado)
+
+
+def registrar(vista, duracion_ms, registro, estado=200):
+    global _ULTIMO_VOLCADO
+    with _CANDADO:
+        _METRICAS.setdefault(vista, MetricaVista()).agregar(duracion_ms, registro, estado)
+        intervalo = getattr(settings, 'METRICAS_INTERVALO_LOG', INTERVALO_LOG)
+        volcar = intervalo and time.monotonic() - _ULTIMO_VOLCADO >= intervalo
+        if volcar:
+            _ULTIMO_VOLCADO = time.monotonic()
+    if volcar:
+        volcar_log()
+
+
+def resumen():
+    """Métricas acumuladas por vista, de la más costosa (tiempo total) a la menos"""
+    with _CANDADO:
+        vistas = sorted(_METRICAS.items(), key=lambda item: item[1].tiempo.suma, reverse=True)
+        return {
+            'desde': _INICIO.isoformat(),
+            'vistas': {nombre: metrica.resumen() for nombre, metrica in vistas},
+        }
+
+
+def reiniciar():
+    global _INICIO
+    with _CANDADO:
+        _METRICAS.clear()
+        _INICIO = timezone.now()
+
+
+def volcar_log(limite=20):
+    for nombre, datos in list(resumen()['vistas'].items())[:limite]:
+        logger.info(
+            '%s: %d solicitudes, p50 %sms, p95 %sms, consultas p95 %s, sql p95 %sms, duplicadas %d, con repetidas %d',
+            nombre, datos['solicitudes'], datos['tiempo_ms'].get('p50'), datos['tiempo_ms'].get('p95'),
+            datos['consultas'].get('p95'), datos['tiempo_sql_ms'].get('p95'),
+            datos['consultas_duplicadas'], datos['solicitudes_con_repetidas'],
+        )
+
+
+@staff_member_required
+def vista_metricas(request):
+    """Métricas del proceso que atiende la petición; un POST las devuelve y las pone en cero"""
+    datos = resumen()
+    if request.method == 'POST':
+        reiniciar()
+    datos['activo'] = 'sistema_instituto.metricas.MetricasMiddleware' in settings.MIDDLEWARE
+    return JsonResponse(datos, json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,138 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de OFFSET, cada página se pide con el valor de las columnas de orden
+de la última (o primera) fila de la página anterior, así el costo de cualquier
+página es el mismo sin importar cuántas filas haya antes. El orden debe terminar
+en una columna única (normalmente 'id') para que el cursor sea estable.
+"""
+import base64
+import hashlib
+import json
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from .replicas import en_principal
+
+POR_PAGINA = 25
+MAX_POR_PAGINA = 200
+DURACION_CONTEO = 60
+
+
+class PaginaKeyset:
+    def __init__(self, object_list, por_pagina, cursor_anterior=None, cursor_siguiente=None):
+        self.object_list = object_list
+        self.por_pagina = por_pagina
+        self.cursor_anterior = cursor_anterior
+        self.cursor_siguiente = cursor_siguiente
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginar_keyset(queryset, orden, request):
+    """
+    Devuelve la página pedida con ?despues=<cursor> o ?antes=<cursor>.
+
+    El tamaño de página se toma de ?por_pagina= (acotado a MAX_POR_PAGINA).
+    """
+    por_pagina = obtener_por_pagina(request)
+    campos = [campo.lstrip('-') for campo in orden]
+    despues = _decodificar_cursor(queryset.model, campos, request.GET.get('despues'))
+    antes = _decodificar_cursor(queryset.model, campos, request.GET.get('antes'))
+
+    if antes is not None:
+        # Hacia atrás: se recorre el orden invertido y luego se da vuelta la página
+        invertido = [_invertir(campo) for campo in orden]
+        filas = list(queryset.filter(_condicion(invertido, antes)).order_by(*invertido)[:por_pagina + 1])
+        hay_mas = len(filas) > por_pagina
+        filas = filas[:por_pagina][::-1]
+        return PaginaKeyset(
+            filas, por_pagina,
+            cursor_anterior=_codificar_cursor(filas[0], campos) if hay_mas and filas else None,
+            cursor_siguiente=_codificar_cursor(filas[-1], campos) if filas else None,
+        )
+
+    if despues is not None:
+        queryset = queryset.filter(_condicion(orden, despues))
+    filas = list(queryset.order_by(*orden)[:por_pagina + 1])
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    return PaginaKeyset(
+        filas, por_pagina,
+        cursor_anterior=_codificar_cursor(filas[0], campos) if despues is not None and filas else None,
+        cursor_siguiente=_codificar_cursor(filas[-1], campos) if hay_mas else None,
+    )
+
+
+def obtener_por_pagina(request, defecto=POR_PAGINA):
+    try:
+        por_pagina = int(request.GET.get('por_pagina', defecto))
+    except ValueError:
+        return defecto
+    return max(1, min(por_pagina, MAX_POR_PAGINA))
+
+
+def conteo_cacheado(queryset, **agregados):
+    """
+    Resuelve los agregados del queryset en una sola consulta y los cachea unos
+    segundos por combinación de filtros: los totales de los listados pueden
+    estar levemente desfasados a cambio de no recontar la tabla en cada página.
+    """
+    queryset = queryset.order_by()
+    firma = hashlib.md5(f'{queryset.query}|{sorted(agregados)}'.encode()).hexdigest()
+    clave = f'conteo:{queryset.model._meta.label_lower}:{firma}'
+    resultado = cache.get(clave)
+    if resultado is None:
+        with en_principal():
+            resultado = queryset.aggregate(**agregados)
+        cache.set(clave, resultado, DURACION_CONTEO)
+    return resultado
+
+
+def _invertir(campo):
+    return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def _condicion(orden, valores):
+    """(a > x) OR (a = x AND b > y) OR ... respetando la dirección de cada campo"""
+    condicion = Q()
+    iguales = Q()
+    for campo, valor in zip(orden, valores):
+        nombre = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        condicion |= iguales & Q(**{f'{nombre}__{operador}': valor})
+        iguales &= Q(**{nombre: valor})
+    return condicion
+
+
+def _codificar_cursor(objeto, campos):
+    valores = []
+    for campo in campos:
+        valor = getattr(objeto, campo)
+        valores.append(valor.isoformat() if hasattr(valor, 'isoformat') else str(valor))
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(modelo, campos, cursor):
+    if not cursor:
+        return None
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if len(valores) != len(campos):
+            return None
+        return [modelo._meta.get_field(campo).to_python(valor) for campo, valor in zip(campos, valores)]
+    except (ValueError, TypeError, ValidationError):
+        return None
@@ -0,0 +1,172 @@
+"""
+Lecturas en una réplica de la base de datos.
+
+Los reportes, listas, exportaciones, el dashboard y el chatbot solo leen,
+pero comparten la base principal con las escrituras de matrículas. Si
+DATABASES tiene una réplica (alias REPLICA_ALIAS, 'replica' por defecto),
+las vistas marcadas con @lectura_en_replica leen de ella los modelos de
+APPS_REPLICA; el resto de las vistas, las escrituras, las transacciones y
+los modelos de Django (usuarios, sesiones) siguen en la principal.
+
+La réplica llega con retraso, así que cada petición que escribe deja a ese
+cliente una cookie que durante REPLICA_RETRASO segundos lo mantiene en la
+principal (la redirección tras guardar muestra lo guardado). Los demás
+usuarios siguen leyendo de la réplica y pueden ver, por ese retraso, datos
+de unos instantes antes.
+
+Lo que se guarda en la caché compartida (catálogo de cursos, conteos de las
+listas, reporte de matrículas) se calcula siempre en la principal, dentro de
+en_principal(): si se llenara con lo leído de la réplica justo después de una
+invalidación, los datos viejos quedarían guardados bajo la versión nueva
+hasta la próxima escritura o hasta que venza la entrada.
+
+Configuración (ver settings.py):
+    DATABASES['replica'] = {...}
+    DATABASE_ROUTERS = ['sistema_instituto.replicas.RouterReplica']
+    MIDDLEWARE += ['sistema_instituto.replicas.ReplicaMiddleware']
+    REPLICA_RETRASO = 10    # segundos que se lee de la principal tras escribir
+
+Para probarlo en local con dos archivos SQLite, "manage.py sincronizar_replica"
+copia la base principal sobre la réplica.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ALIAS_REPLICA = 'replica'
+RETRASO = 10
+COOKIE = 'leer_principal'
+# Modelos propios; auth, sesiones y contenttypes se leen siempre de la principal
+APPS_REPLICA = {'alumnos', 'cursos', 'matriculas', 'auth_app'}
+
+
+class EstadoPeticion:
+    """Base de lectura elegida para la petición y si la petición escribió"""
+
+    def __init__(self):
+        self.replica = None
+        self.escribio = False
+
+
+# Se conserva hasta request_finished para que las respuestas en streaming
+# sigan leyendo de la réplica mientras se envían
+_ESTADO = ContextVar('estado_replica', default=None)
+
+
+def alias_replica():
+    alias = getattr(settings, 'REPLICA_ALIAS', ALIAS_REPLICA)
+    return alias if alias in connections.settings else None
+
+
+def retraso():
+    return getattr(settings, 'REPLICA_RETRASO', RETRASO)
+
+
+class RouterReplica:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in APPS_REPLICA:
+            return None
+        estado = _ESTADO.get()
+        if (estado is None or estado.replica is None or estado.escribio
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            # Explícito: un objeto leído de la réplica (p. ej. desde la caché) no arrastra ahí sus relaciones
+            return DEFAULT_DB_ALIAS
+        return estado.replica
+
+    def db_for_write(self, model, **hints):
+        estado = _ESTADO.get()
+        if estado is not None:
+            estado.escribio = True
+        # Explícito: guardar un objeto leído de la réplica lo escribe en la principal
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bases = {DEFAULT_DB_ALIAS, alias_replica()}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación (o sincronizar_replica en local)
+        if db == alias_replica():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    # Bajo ASGI no obliga a pasar las vistas asíncronas (chatbot) por un hilo
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = self._iniciar()
+        return self._terminar(estado, self.get_response(request))
+
+    async def __acall__(self, request):
+        estado = self._iniciar()
+        return self._terminar(estado, await self.get_response(request))
+
+    def _iniciar(self):
+        estado = EstadoPeticion()
+        _ESTADO.set(estado)
+        return estado
+
+    def _terminar(self, estado, response):
+        if estado.escribio:
+            response.set_cookie(COOKIE, '1', max_age=retraso(), httponly=True, samesite='Lax')
+        return response
+
+
+def _terminar_peticion(sender, **kwargs):
+    _ESTADO.set(None)
+
+
+request_finished.connect(_terminar_peticion)
+
+
+def _usar_replica(request):
+    estado = _ESTADO.get()
+    alias = alias_replica()
+    if estado is None or alias is None or COOKIE in request.COOKIES:
+        return
+    estado.replica = alias
+
+
+@contextmanager
+def en_principal():
+    """Dentro del bloque la petición lee de la principal aunque su vista use la réplica"""
+    estado = _ESTADO.get()
+    if estado is None:
+        yield
+        return
+    replica, estado.replica = estado.replica, None
+    try:
+        yield
+    finally:
+        estado.replica = replica
+
+
+def lectura_en_replica(vista):
+    """Hace que la vista (síncrona o asíncrona) lea de la réplica si este cliente no escribió hace poco"""
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            _usar_replica(request)
+            return await vista(request, *args, **kwargs)
+    else:
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            _usar_replica(request)
+            return vista(request, *args, **kwargs)
+    return envoltura
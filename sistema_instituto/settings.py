@@ -1 +1,236 @@
-put your code here!!!
+"""
+Configuración de sistema_instituto.
+
+Todo lo que cambia entre desarrollo y producción se lee de variables de
+entorno; sin ninguna definida se levanta en modo desarrollo con SQLite.
+
+Base de datos (DB_ENGINE = 'sqlite' | 'mysql'):
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_CONN_MAX_AGE        segundos que se conserva la conexión de cada hilo (60; 0 = una por petición)
+    DB_CONN_HEALTH_CHECKS  comprueba una conexión persistente antes de reutilizarla (1)
+    DB_POOL                1 = pool de conexiones por proceso (sistema_instituto.bd); ignora DB_CONN_MAX_AGE
+    DB_POOL_MAXIMO         conexiones libres que conserva el pool (10)
+    DB_REPLICA_NAME, DB_REPLICA_HOST, DB_REPLICA_PORT, DB_REPLICA_USER, DB_REPLICA_PASSWORD
+                           réplica de lectura (alias 'replica'); con alguno definido las vistas
+                           de solo lectura leen de ella (sistema_instituto.replicas). Lo que no
+                           se define se toma de la principal
+    DB_REPLICA_RETRASO     segundos que se sigue leyendo de la principal tras una escritura (10)
+
+Caché (CACHE_BACKEND = 'locmem' | 'bd' | 'redis' | 'memcached' | 'archivo' | 'ninguna'):
+    CACHE_LOCATION         URL de Redis, host:puerto de memcached, carpeta o tabla
+                           ('bd': cache_sistema por defecto; crearla con "manage.py createcachetable")
+    CATALOGO_DURACION_CACHE  segundos que se conserva el catálogo cacheado (3600; 60 con locmem)
+    'locmem' es la memoria de cada proceso: la invalidación de un worker no llega a
+    los demás. Con varios procesos usar 'bd', 'redis' o 'memcached'
+
+Otras: DJANGO_SECRET_KEY, DJANGO_DEBUG, DJANGO_ALLOWED_HOSTS, DJANGO_CSRF_TRUSTED_ORIGINS,
+DJANGO_METRICAS (activa MetricasMiddleware), MEDIA_ROOT, STATIC_ROOT.
+
+"manage.py benchmark_conexiones" compara la latencia con y sin conexiones
+persistentes y con el pool sobre la base de datos configurada.
+"""
+import os
+from pathlib import Path
+from django.contrib.messages import constants as messages
+from sistema_instituto.bd import MOTORES_CON_POOL
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _env(nombre, por_defecto=''):
+    return os.environ.get(nombre, por_defecto)
+
+
+def _env_bool(nombre, por_defecto=False):
+    valor = os.environ.get(nombre)
+    if valor is None:
+        return por_defecto
+    return valor.strip().lower() in ('1', 'true', 'si', 'sí', 'yes', 'on')
+
+
+def _env_lista(nombre, por_defecto=''):
+    return [valor.strip() for valor in _env(nombre, por_defecto).split(',') if valor.strip()]
+
+
+DEBUG = _env_bool('DJANGO_DEBUG', True)
+# Solo para desarrollo: en producción DJANGO_SECRET_KEY es obligatoria
+SECRET_KEY = _env('DJANGO_SECRET_KEY', 'django-insecure-solo-para-desarrollo' if DEBUG else '')
+ALLOWED_HOSTS = _env_lista('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1,[::1]')
+CSRF_TRUSTED_ORIGINS = _env_lista('DJANGO_CSRF_TRUSTED_ORIGINS')
+
+
+# Aplicaciones
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'alumnos',
+    'cursos',
+    'matriculas',
+    'auth_app',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+if _env_bool('DJANGO_METRICAS'):
+    # Primero, para que el tiempo medido incluya al resto de los middlewares
+    MIDDLEWARE.insert(0, 'sistema_instituto.metricas.MetricasMiddleware')
+
+ROOT_URLCONF = 'sistema_instituto.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                # {% querystring %} y los filtros de las plantillas leen request.GET
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'sistema_instituto.wsgi.application'
+ASGI_APPLICATION = 'sistema_instituto.asgi.application'
+
+
+# Base de datos
+
+if _env('DB_ENGINE', 'sqlite') == 'mysql':
+    BASE_DATOS = {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': _env('DB_NAME', 'sistema_instituto'),
+        'USER': _env('DB_USER', 'root'),
+        'PASSWORD': _env('DB_PASSWORD'),
+        'HOST': _env('DB_HOST', '127.0.0.1'),
+        'PORT': _env('DB_PORT', '3306'),
+        'OPTIONS': {
+            'charset': 'utf8mb4',
+            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+        },
+    }
+else:
+    BASE_DATOS = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _env('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        'OPTIONS': {
+            # Espera a que se libere el bloqueo de escritura en lugar de fallar enseguida
+            'timeout': 20,
+        },
+    }
+
+if _env_bool('DB_POOL'):
+    BASE_DATOS['ENGINE'] = MOTORES_CON_POOL[BASE_DATOS['ENGINE']]
+    BASE_DATOS['POOL_MAXIMO'] = int(_env('DB_POOL_MAXIMO', '10'))
+    # Cada petición devuelve su conexión al pool al terminar
+    BASE_DATOS['CONN_MAX_AGE'] = 0
+else:
+    BASE_DATOS['CONN_MAX_AGE'] = int(_env('DB_CONN_MAX_AGE', '60'))
+BASE_DATOS['CONN_HEALTH_CHECKS'] = _env_bool('DB_CONN_HEALTH_CHECKS', True)
+
+DATABASES = {'default': BASE_DATOS}
+
+CLAVES_REPLICA = ('NAME', 'HOST', 'PORT', 'USER', 'PASSWORD')
+if any(_env(f'DB_REPLICA_{clave}') for clave in CLAVES_REPLICA):
+    DATABASES['replica'] = {
+        **BASE_DATOS,
+        **{clave: _env(f'DB_REPLICA_{clave}') for clave in CLAVES_REPLICA if _env(f'DB_REPLICA_{clave}')},
+        # Las pruebas leen de la principal en lugar de crear otra base
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['sistema_instituto.replicas.RouterReplica']
+    MIDDLEWARE.append('sistema_instituto.replicas.ReplicaMiddleware')
+    REPLICA_RETRASO = int(_env('DB_REPLICA_RETRASO', '10'))
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Caché (catálogo de cursos, conteos de listas y reporte de matrículas)
+
+BACKENDS_CACHE = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'bd': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'archivo': 'django.core.cache.backends.filebased.FileBasedCache',
+    'ninguna': 'django.core.cache.backends.dummy.DummyCache',
+}
+CACHE_BACKEND = _env('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': BACKENDS_CACHE[CACHE_BACKEND],
+        'LOCATION': _env('CACHE_LOCATION', 'cache_sistema' if CACHE_BACKEND == 'bd' else ''),
+    }
+}
+# Con locmem cada worker guarda su copia y no ve las invalidaciones de los otros:
+# la duración corta acota cuánto tiempo puede mostrar cupos o cursos viejos
+CATALOGO_DURACION_CACHE = int(_env('CATALOGO_DURACION_CACHE', '60' if CACHE_BACKEND == 'locmem' else '3600'))
+
+
+# Autenticación
+
+AUTH_PASSWORD_VALIDATORS = [
+    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
+]
+
+LOGIN_URL = 'login'
+LOGIN_REDIRECT_URL = 'dashboard'
+LOGOUT_REDIRECT_URL = 'home'
+
+
+# Idioma y zona horaria
+
+LANGUAGE_CODE = 'es-pe'
+TIME_ZONE = 'America/Lima'
+USE_I18N = True
+USE_TZ = True
+
+
+# Archivos estáticos y subidos
+
+STATIC_URL = 'static/'
+STATIC_ROOT = Path(_env('STATIC_ROOT', str(BASE_DIR / 'staticfiles')))
+MEDIA_URL = '/media/'
+# Las fotos se guardan en alumnos/fotos/ (upload_to) dentro de esta carpeta
+MEDIA_ROOT = Path(_env('MEDIA_ROOT', str(BASE_DIR)))
+
+
+# Mensajes con las clases de alerta de Bootstrap
+
+MESSAGE_TAGS = {messages.ERROR: 'danger'}
+
+
+# Registro: las métricas por vista se vuelcan en 'sistema_instituto.metricas';
+# los errores del chatbot y de las miniaturas, en los loggers de cada app
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'sistema_instituto': {'handlers': ['consola'], 'level': _env('DJANGO_LOG_LEVEL', 'INFO')},
+        'alumnos': {'handlers': ['consola'], 'level': _env('DJANGO_LOG_LEVEL', 'INFO')},
+        'cursos': {'handlers': ['consola'], 'level': _env('DJANGO_LOG_LEVEL', 'INFO')},
+    },
+}
@@ -0,0 +1,20 @@
+import re
+import unicodedata
+
+_ESPACIOS = re.compile(r'\s+')
+# Largo máximo de una palabra en las tablas de palabras de búsqueda
+LARGO_PALABRA = 100
+
+
+def normalizar_texto(texto):
+    """Minúsculas, sin tildes ni diéresis y con los espacios colapsados"""
+    texto = str(texto or '')
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto)
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return _ESPACIOS.sub(' ', texto.lower()).strip()
+
+
+def palabras(texto):
+    """Palabras distintas del texto normalizado, para las tablas de búsqueda por prefijo"""
+    return {palabra[:LARGO_PALABRA] for palabra in normalizar_texto(texto).split(' ') if palabra}
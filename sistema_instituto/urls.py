@@ -3,6 +3,7 @@ from django.urls import path, include
 from auth_app import views as auth_views_custom
 from django.conf import settings
 from django.conf.urls.static import static
+from . import metricas
 
 urlpatterns = [
     # Admin
@@ -14,6 +15,7 @@ urlpatterns = [
     path('logout/', auth_views_custom.custom_logout, name='logout'),
     path('register/', auth_views_custom.register, name='register'),
     path('dashboard/', auth_views_custom.dashboard, name='dashboard'),
+    path('metricas/', metricas.vista_metricas, name='metricas'),
     
     # Incluir URLs de las apps
     path('alumnos/', include('alumnos.urls')),